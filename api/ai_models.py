@@ -1,24 +1,96 @@
 import os
+import copy
 import json
 import logging
 import re
-import requests
 from typing import Dict, List, Any, Optional
+from ai_transport import ProviderTransport, iter_sse
+from result_cache import create_cache, cache_mode, make_key, CACHE_USE, CACHE_BYPASS
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Provider response cache: backend ('disk', 'memory' or 'off'), lifetime and size
+AI_CACHE = os.environ.get('SCRAPER_AI_CACHE', 'disk')
+AI_CACHE_TTL = float(os.environ.get('SCRAPER_AI_CACHE_TTL', 7 * 24 * 3600))
+AI_CACHE_SIZE = int(os.environ.get('SCRAPER_AI_CACHE_SIZE', 2000))
+
 class BaseAIGenerator:
     """Base class for AI content generators."""
     
-    def __init__(self):
+    provider_name = "AI"
+    
+    def __init__(self, transport=None, response_cache=None):
         self.api_key = None
+        self.transport = transport if transport is not None else ProviderTransport()
+        
+        # Provider responses, keyed by provider, endpoint and the full request
+        # (model, rendered prompt and sampling parameters)
+        if response_cache is None:
+            response_cache = create_cache(AI_CACHE, 'ai_responses', AI_CACHE_TTL, AI_CACHE_SIZE)
+        self.response_cache = response_cache
+        self.cache_mode = CACHE_USE
     
     def set_api_key(self, api_key):
         """Set the API key for the AI service."""
         self.api_key = api_key
     
+    def with_api_key(self, api_key, cache=None):
+        """
+        Get a copy of this generator bound to an API key.
+        
+        The copy shares the transport (and its pooled connections) and the
+        response cache, so binding a key per request is cheap and concurrent
+        requests never see each other's keys.
+        
+        Args:
+            api_key (str): The API key
+            cache (str): Response cache mode for the copy's calls: 'use' (default),
+                'bypass' or 'refresh'
+            
+        Returns:
+            BaseAIGenerator: The bound generator
+        """
+        client = copy.copy(self)
+        client.api_key = api_key
+        client.cache_mode = cache_mode(cache)
+        return client
+    
+    def _post_json(self, url, payload, headers=None):
+        """
+        Send a request to the provider and return its JSON response.
+        
+        Identical requests are answered from the response cache, whichever
+        API key sent them. The endpoint's query string (which may hold the key)
+        is left out of the cache key.
+        
+        Args:
+            url (str): The provider endpoint
+            payload (dict): The request body
+            headers (dict): The request headers
+            
+        Returns:
+            dict: The provider response
+        """
+        cache_key = None
+        if self.response_cache is not None and self.cache_mode != CACHE_BYPASS:
+            cache_key = make_key(self.provider_name, url.split('?', 1)[0], payload)
+            if self.cache_mode == CACHE_USE:
+                result = self.response_cache.get(cache_key)
+                if result is not None:
+                    logger.debug(f"Response cache hit for {self.provider_name}")
+                    return result
+        
+        response = self.transport.post(url, headers=headers, json=payload)
+        response.raise_for_status()
+        result = response.json()
+        
+        if cache_key is not None:
+            self.response_cache.set(cache_key, result)
+        
+        return result
+    
     def generate_content(self, content, title, language='english', tone='default', **kwargs):
         """
         Generate AI content from scraped content.
@@ -35,6 +107,134 @@ class BaseAIGenerator:
         """
         raise NotImplementedError("Subclasses must implement this method")
     
+    def stream_content(self, content, title, language='english', tone='default', **kwargs):
+        """
+        Generate AI content from scraped content, yielding it as it is produced.
+        
+        Args:
+            content (str): The original content
+            title (str): The title of the article
+            language (str): The language to generate content in
+            tone (str): The writing tone/style
+            **kwargs: Additional parameters
+            
+        Yields:
+            dict: {"type": "token", "text": ...} events as the provider streams the
+                article, then one {"type": "done", ...} event carrying the same
+                payload as generate_content, or {"type": "error", "error": ...}
+                with the content generated so far
+        """
+        if not self.api_key:
+            yield {"type": "error", "error": f"{self.provider_name} API key is required"}
+            return
+        
+        parts = []
+        try:
+            prompt = self._create_prompt(content, title, language, tone, **kwargs)
+            
+            for text in self._stream_completion(prompt):
+                parts.append(text)
+                yield {"type": "token", "text": text}
+            
+            result = self._build_result(''.join(parts), title)
+            
+        except Exception as e:
+            logger.exception(f"Error streaming content with {self.provider_name}: {str(e)}")
+            yield {"type": "error", "error": f"Failed to generate content: {str(e)}", "content": ''.join(parts)}
+            return
+        
+        yield dict(result, type="done")
+    
+    def _stream_completion(self, prompt):
+        """
+        Stream the article completion for a prompt.
+        
+        Args:
+            prompt (str): The prompt
+            
+        Yields:
+            str: Text fragments as they arrive
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+    
+    def _build_result(self, generated_content, title):
+        """
+        Build the generate_content result from the generated article.
+        
+        Args:
+            generated_content (str): The generated HTML
+            title (str): The original title, used if no title can be found
+            
+        Returns:
+            dict: The title, content, word count and suggested tags
+        """
+        return {
+            "title": _extract_title(generated_content, title),
+            "content": generated_content,
+            "word_count": len(generated_content.split()),
+            "suggested_tags": self._extract_keywords(generated_content)
+        }
+    
+    def generate_combined(self, content, title, language='english', tone='default', **kwargs):
+        """
+        Generate the article, its tags and its SEO data in a single provider call.
+        
+        Replaces generate_content (with its keyword extraction call) followed by
+        generate_seo_data, which re-sends the article.
+        
+        Args:
+            content (str): The original content
+            title (str): The title of the article
+            language (str): The language to generate content in
+            tone (str): The writing tone/style
+            **kwargs: Additional parameters
+            
+        Returns:
+            dict: The generate_content fields (title, content, word_count,
+                suggested_tags) plus the generate_seo_data fields (seo_title,
+                tags, categories, meta_description)
+        """
+        if not self.api_key:
+            return {"error": f"{self.provider_name} API key is required"}
+        
+        try:
+            prompt = self._create_combined_prompt(content, title, language, tone, **kwargs)
+            data = _parse_json_object(self._structured_completion(prompt))
+            
+            generated_content = str(data.get("content") or "").strip()
+            if not generated_content:
+                raise ValueError("The response has no article content")
+            
+            generated_title = str(data.get("title") or "").strip() or _extract_title(generated_content, title)
+            tags = _string_list(data.get("tags"))
+            
+            return {
+                "title": generated_title,
+                "content": generated_content,
+                "word_count": len(generated_content.split()),
+                "suggested_tags": tags,
+                "seo_title": str(data.get("seo_title") or "").strip() or generated_title,
+                "tags": tags,
+                "categories": _string_list(data.get("categories")),
+                "meta_description": str(data.get("meta_description") or "").strip()
+            }
+            
+        except Exception as e:
+            logger.exception(f"Error generating combined content with {self.provider_name}: {str(e)}")
+            return {"error": f"Failed to generate content: {str(e)}"}
+    
+    def _structured_completion(self, prompt):
+        """
+        Run a completion whose answer is a JSON object.
+        
+        Args:
+            prompt (str): The prompt
+            
+        Returns:
+            str: The generated text
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+    
     def generate_seo_data(self, content, title):
         """
         Generate SEO data for an article.
@@ -117,6 +317,43 @@ I'll give you the content from a news article, and your task is to:
         
         return prompt
     
+    def _create_combined_prompt(self, content, title, language, tone, **kwargs):
+        """
+        Create a prompt asking for the article and its metadata as one JSON object.
+        
+        Args:
+            content (str): The original content
+            title (str): The title of the article
+            language (str): The language to generate content in
+            tone (str): The writing tone/style
+            **kwargs: Additional parameters
+            
+        Returns:
+            str: The formatted prompt
+        """
+        prompt = self._create_prompt(content, title, language, tone, **kwargs)
+        
+        prompt += """
+
+Then, as an SEO expert, provide for the rewritten article:
+
+1. An SEO-optimized title (max 60 characters)
+2. A list of 5-8 relevant tags
+3. 2-3 recommended categories
+4. A meta description (max 160 characters)
+
+Return everything as a single JSON object, with no other text, using the following structure:
+{
+  "title": "The improved article title",
+  "content": "The complete rewritten article in HTML",
+  "tags": ["tag1", "tag2", "tag3", "tag4", "tag5"],
+  "categories": ["category1", "category2"],
+  "seo_title": "Your optimized title here",
+  "meta_description": "Your meta description here"
+}
+"""
+        return prompt
+    
     def _create_seo_prompt(self, content, title):
         """
         Create a prompt for generating SEO data.
@@ -154,8 +391,10 @@ Return your analysis as a JSON object with the following structure:
 class OpenAIGenerator(BaseAIGenerator):
     """Generate content using OpenAI's API."""
     
-    def __init__(self):
-        super().__init__()
+    provider_name = "OpenAI"
+    
+    def __init__(self, transport=None, response_cache=None):
+        super().__init__(transport, response_cache)
         self.api_url = "https://api.openai.com/v1/chat/completions"
     
     def generate_content(self, content, title, language='english', tone='default', **kwargs):
@@ -171,47 +410,39 @@ class OpenAIGenerator(BaseAIGenerator):
                 "Content-Type": "application/json"
             }
             
-            data = {
-                "model": "gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-                "messages": [
-                    {"role": "system", "content": "You are an expert content writer that specializes in rewriting news articles."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 4000
-            }
-            
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, self._content_request(prompt), headers)
             generated_content = result["choices"][0]["message"]["content"]
             
-            # Extract title from the generated content
-            title_match = re.search(r"<h1[^>]*>(.*?)<\/h1>", generated_content, re.DOTALL)
-            if title_match:
-                generated_title = title_match.group(1).strip()
-            else:
-                # Try to find the first line as title
-                lines = generated_content.split('\n')
-                for line in lines:
-                    if line.strip() and not line.startswith("<"):
-                        generated_title = line.strip()
-                        break
-                else:
-                    generated_title = title
-            
-            return {
-                "title": generated_title,
-                "content": generated_content,
-                "word_count": len(generated_content.split()),
-                "suggested_tags": self._extract_keywords(generated_content)
-            }
+            return self._build_result(generated_content, title)
             
         except Exception as e:
             logger.exception(f"Error generating content with OpenAI: {str(e)}")
             return {"error": f"Failed to generate content: {str(e)}"}
     
+    def _content_request(self, prompt):
+        """Build the chat completion request for an article rewrite."""
+        return {
+            "model": "gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+            "messages": [
+                {"role": "system", "content": "You are an expert content writer that specializes in rewriting news articles."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 4000
+        }
+    
+    def _stream_completion(self, prompt):
+        """Stream an article rewrite from OpenAI."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = dict(self._content_request(prompt), stream=True)
+        with self.transport.post(self.api_url, headers=headers, json=data, stream=True) as response:
+            response.raise_for_status()
+            yield from _chat_completion_deltas(response)
+    
     def generate_seo_data(self, content, title):
         """Generate SEO data using OpenAI."""
         if not self.api_key:
@@ -236,10 +467,7 @@ class OpenAIGenerator(BaseAIGenerator):
                 "max_tokens": 1000
             }
             
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, data, headers)
             seo_data = json.loads(result["choices"][0]["message"]["content"])
             
             return seo_data
@@ -270,10 +498,7 @@ class OpenAIGenerator(BaseAIGenerator):
                 "max_tokens": 200
             }
             
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, data, headers)
             keywords_data = json.loads(result["choices"][0]["message"]["content"])
             
             if isinstance(keywords_data, dict) and "tags" in keywords_data:
@@ -286,13 +511,26 @@ class OpenAIGenerator(BaseAIGenerator):
         except Exception as e:
             logger.exception(f"Error extracting keywords with OpenAI: {str(e)}")
             return []
+    
+    def _structured_completion(self, prompt):
+        """Run a JSON-mode completion with OpenAI."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = dict(self._content_request(prompt), response_format={"type": "json_object"}, max_tokens=4096)
+        result = self._post_json(self.api_url, data, headers)
+        return result["choices"][0]["message"]["content"]
 
 
 class GeminiGenerator(BaseAIGenerator):
     """Generate content using Google's Gemini API."""
     
-    def __init__(self):
-        super().__init__()
+    provider_name = "Gemini"
+    
+    def __init__(self, transport=None, response_cache=None):
+        super().__init__(transport, response_cache)
         self.api_url = "https://generativelanguage.googleapis.com/v1"
     
     def generate_content(self, content, title, language='english', tone='default', **kwargs):
@@ -305,50 +543,42 @@ class GeminiGenerator(BaseAIGenerator):
             
             url = f"{self.api_url}/models/gemini-pro:generateContent?key={self.api_key}"
             
-            data = {
-                "contents": [
-                    {
-                        "role": "user",
-                        "parts": [{"text": prompt}]
-                    }
-                ],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "maxOutputTokens": 4000
-                }
-            }
-            
-            response = requests.post(url, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(url, self._content_request(prompt))
             generated_content = result["candidates"][0]["content"]["parts"][0]["text"]
             
-            # Extract title from the generated content
-            title_match = re.search(r"<h1[^>]*>(.*?)<\/h1>", generated_content, re.DOTALL)
-            if title_match:
-                generated_title = title_match.group(1).strip()
-            else:
-                # Try to find the first line as title
-                lines = generated_content.split('\n')
-                for line in lines:
-                    if line.strip() and not line.startswith("<"):
-                        generated_title = line.strip()
-                        break
-                else:
-                    generated_title = title
-            
-            return {
-                "title": generated_title,
-                "content": generated_content,
-                "word_count": len(generated_content.split()),
-                "suggested_tags": self._extract_keywords(generated_content)
-            }
+            return self._build_result(generated_content, title)
             
         except Exception as e:
             logger.exception(f"Error generating content with Gemini: {str(e)}")
             return {"error": f"Failed to generate content: {str(e)}"}
     
+    def _content_request(self, prompt):
+        """Build the generateContent request for an article rewrite."""
+        return {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [{"text": prompt}]
+                }
+            ],
+            "generationConfig": {
+                "temperature": 0.7,
+                "maxOutputTokens": 4000
+            }
+        }
+    
+    def _stream_completion(self, prompt):
+        """Stream an article rewrite from Gemini."""
+        url = f"{self.api_url}/models/gemini-pro:streamGenerateContent?alt=sse&key={self.api_key}"
+        
+        with self.transport.post(url, json=self._content_request(prompt), stream=True) as response:
+            response.raise_for_status()
+            for _, data in iter_sse(response):
+                for candidate in json.loads(data).get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+    
     def generate_seo_data(self, content, title):
         """Generate SEO data using Gemini."""
         if not self.api_key:
@@ -372,10 +602,7 @@ class GeminiGenerator(BaseAIGenerator):
                 }
             }
             
-            response = requests.post(url, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(url, data)
             generated_text = result["candidates"][0]["content"]["parts"][0]["text"]
             
             # Extract JSON from the response (Gemini might wrap the JSON in ```json blocks)
@@ -416,10 +643,7 @@ class GeminiGenerator(BaseAIGenerator):
                 }
             }
             
-            response = requests.post(url, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(url, data)
             generated_text = result["candidates"][0]["content"]["parts"][0]["text"]
             
             # Extract JSON from the response
@@ -448,13 +672,24 @@ class GeminiGenerator(BaseAIGenerator):
         except Exception as e:
             logger.exception(f"Error extracting keywords with Gemini: {str(e)}")
             return []
+    
+    def _structured_completion(self, prompt):
+        """Run a completion with Gemini (gemini-pro has no JSON mode; the answer is parsed leniently)."""
+        url = f"{self.api_url}/models/gemini-pro:generateContent?key={self.api_key}"
+        
+        data = self._content_request(prompt)
+        data["generationConfig"]["maxOutputTokens"] = 4096
+        result = self._post_json(url, data)
+        return result["candidates"][0]["content"]["parts"][0]["text"]
 
 
 class ClaudeGenerator(BaseAIGenerator):
     """Generate content using Anthropic's Claude API."""
     
-    def __init__(self):
-        super().__init__()
+    provider_name = "Claude"
+    
+    def __init__(self, transport=None, response_cache=None):
+        super().__init__(transport, response_cache)
         self.api_url = "https://api.anthropic.com/v1/messages"
     
     def generate_content(self, content, title, language='english', tone='default', **kwargs):
@@ -471,46 +706,47 @@ class ClaudeGenerator(BaseAIGenerator):
                 "content-type": "application/json"
             }
             
-            data = {
-                "model": "claude-3-opus-20240229",
-                "max_tokens": 4000,
-                "temperature": 0.7,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ]
-            }
-            
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, self._content_request(prompt), headers)
             generated_content = result["content"][0]["text"]
             
-            # Extract title from the generated content
-            title_match = re.search(r"<h1[^>]*>(.*?)<\/h1>", generated_content, re.DOTALL)
-            if title_match:
-                generated_title = title_match.group(1).strip()
-            else:
-                # Try to find the first line as title
-                lines = generated_content.split('\n')
-                for line in lines:
-                    if line.strip() and not line.startswith("<"):
-                        generated_title = line.strip()
-                        break
-                else:
-                    generated_title = title
-            
-            return {
-                "title": generated_title,
-                "content": generated_content,
-                "word_count": len(generated_content.split()),
-                "suggested_tags": self._extract_keywords(generated_content)
-            }
+            return self._build_result(generated_content, title)
             
         except Exception as e:
             logger.exception(f"Error generating content with Claude: {str(e)}")
             return {"error": f"Failed to generate content: {str(e)}"}
     
+    def _content_request(self, prompt):
+        """Build the messages request for an article rewrite."""
+        return {
+            "model": "claude-3-opus-20240229",
+            "max_tokens": 4000,
+            "temperature": 0.7,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        }
+    
+    def _stream_completion(self, prompt):
+        """Stream an article rewrite from Claude."""
+        headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        
+        data = dict(self._content_request(prompt), stream=True)
+        with self.transport.post(self.api_url, headers=headers, json=data, stream=True) as response:
+            response.raise_for_status()
+            for event, data in iter_sse(response):
+                if event == "message_stop":
+                    break
+                if event == "error":
+                    raise ValueError(json.loads(data).get("error", {}).get("message", data))
+                if event == "content_block_delta":
+                    delta = json.loads(data).get("delta", {})
+                    if delta.get("text"):
+                        yield delta["text"]
+    
     def generate_seo_data(self, content, title):
         """Generate SEO data using Claude."""
         if not self.api_key:
@@ -534,10 +770,7 @@ class ClaudeGenerator(BaseAIGenerator):
                 ]
             }
             
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, data, headers)
             generated_text = result["content"][0]["text"]
             
             # Extract JSON from the response
@@ -578,10 +811,7 @@ class ClaudeGenerator(BaseAIGenerator):
                 ]
             }
             
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, data, headers)
             generated_text = result["content"][0]["text"]
             
             # Extract JSON from the response
@@ -610,13 +840,29 @@ class ClaudeGenerator(BaseAIGenerator):
         except Exception as e:
             logger.exception(f"Error extracting keywords with Claude: {str(e)}")
             return []
+    
+    def _structured_completion(self, prompt):
+        """Run a completion with Claude, prefilling the answer so it starts as a JSON object."""
+        headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        
+        data = self._content_request(prompt)
+        data["max_tokens"] = 4096
+        data["messages"].append({"role": "assistant", "content": "{"})
+        result = self._post_json(self.api_url, data, headers)
+        return "{" + result["content"][0]["text"]
 
 
 class DeepSeekGenerator(BaseAIGenerator):
     """Generate content using DeepSeek AI API."""
     
-    def __init__(self):
-        super().__init__()
+    provider_name = "DeepSeek"
+    
+    def __init__(self, transport=None, response_cache=None):
+        super().__init__(transport, response_cache)
         self.api_url = "https://api.deepseek.com/v1/chat/completions"
     
     def generate_content(self, content, title, language='english', tone='default', **kwargs):
@@ -632,47 +878,39 @@ class DeepSeekGenerator(BaseAIGenerator):
                 "Content-Type": "application/json"
             }
             
-            data = {
-                "model": "deepseek-chat",
-                "messages": [
-                    {"role": "system", "content": "You are an expert content writer that specializes in rewriting news articles."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 4000
-            }
-            
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, self._content_request(prompt), headers)
             generated_content = result["choices"][0]["message"]["content"]
             
-            # Extract title from the generated content
-            title_match = re.search(r"<h1[^>]*>(.*?)<\/h1>", generated_content, re.DOTALL)
-            if title_match:
-                generated_title = title_match.group(1).strip()
-            else:
-                # Try to find the first line as title
-                lines = generated_content.split('\n')
-                for line in lines:
-                    if line.strip() and not line.startswith("<"):
-                        generated_title = line.strip()
-                        break
-                else:
-                    generated_title = title
-            
-            return {
-                "title": generated_title,
-                "content": generated_content,
-                "word_count": len(generated_content.split()),
-                "suggested_tags": self._extract_keywords(generated_content)
-            }
+            return self._build_result(generated_content, title)
             
         except Exception as e:
             logger.exception(f"Error generating content with DeepSeek: {str(e)}")
             return {"error": f"Failed to generate content: {str(e)}"}
     
+    def _content_request(self, prompt):
+        """Build the chat completion request for an article rewrite."""
+        return {
+            "model": "deepseek-chat",
+            "messages": [
+                {"role": "system", "content": "You are an expert content writer that specializes in rewriting news articles."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 4000
+        }
+    
+    def _stream_completion(self, prompt):
+        """Stream an article rewrite from DeepSeek (OpenAI-compatible streaming)."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = dict(self._content_request(prompt), stream=True)
+        with self.transport.post(self.api_url, headers=headers, json=data, stream=True) as response:
+            response.raise_for_status()
+            yield from _chat_completion_deltas(response)
+    
     def generate_seo_data(self, content, title):
         """Generate SEO data using DeepSeek."""
         if not self.api_key:
@@ -696,10 +934,7 @@ class DeepSeekGenerator(BaseAIGenerator):
                 "max_tokens": 1000
             }
             
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, data, headers)
             generated_text = result["choices"][0]["message"]["content"]
             
             # Extract JSON from the response
@@ -740,10 +975,7 @@ class DeepSeekGenerator(BaseAIGenerator):
                 "max_tokens": 200
             }
             
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._post_json(self.api_url, data, headers)
             generated_text = result["choices"][0]["message"]["content"]
             
             # Extract JSON from the response
@@ -772,19 +1004,127 @@ class DeepSeekGenerator(BaseAIGenerator):
         except Exception as e:
             logger.exception(f"Error extracting keywords with DeepSeek: {str(e)}")
             return []
+    
+    def _structured_completion(self, prompt):
+        """Run a JSON-mode completion with DeepSeek."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = dict(self._content_request(prompt), response_format={"type": "json_object"}, max_tokens=4096)
+        result = self._post_json(self.api_url, data, headers)
+        return result["choices"][0]["message"]["content"]
+
+
+def _chat_completion_deltas(response):
+    """
+    Read the text deltas from an OpenAI-style streamed chat completion.
+    
+    Args:
+        response (requests.Response): The streaming response
+        
+    Yields:
+        str: Text fragments as they arrive
+    """
+    for _, data in iter_sse(response):
+        if data == "[DONE]":
+            break
+        choices = json.loads(data).get("choices") or [{}]
+        text = (choices[0].get("delta") or {}).get("content")
+        if text:
+            yield text
+
+
+def _extract_title(generated_content, title):
+    """
+    Find the title of a generated article.
+    
+    Args:
+        generated_content (str): The generated HTML
+        title (str): The original title, used if no title can be found
+        
+    Returns:
+        str: The title
+    """
+    # Extract title from the generated content
+    title_match = re.search(r"<h1[^>]*>(.*?)<\/h1>", generated_content, re.DOTALL)
+    if title_match:
+        return title_match.group(1).strip()
+    
+    # Try to find the first line as title
+    for line in generated_content.split('\n'):
+        if line.strip() and not line.startswith("<"):
+            return line.strip()
+    
+    return title
+
+
+def _parse_json_object(text):
+    """
+    Find the JSON object in a model's answer.
+    
+    Accepts bare JSON, JSON in a ```json block and JSON surrounded by prose,
+    and tolerates raw newlines inside strings.
+    
+    Args:
+        text (str): The generated text
+        
+    Returns:
+        dict: The parsed object
+        
+    Raises:
+        ValueError: If the text holds no JSON object
+    """
+    decoder = json.JSONDecoder(strict=False)
+    
+    candidates = []
+    fence_match = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", text)
+    if fence_match:
+        candidates.append(fence_match.group(1))
+    candidates.append(text)
+    
+    for candidate in candidates:
+        start = candidate.find("{")
+        if start == -1:
+            continue
+        try:
+            value, _ = decoder.raw_decode(candidate, start)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+    
+    raise ValueError("The response is not a valid JSON object")
+
+
+def _string_list(value):
+    """Coerce a generated list (or comma-separated string) to a list of non-empty strings."""
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
 
 
 class DallEImageGenerator:
     """Generate images using OpenAI's DALL-E API."""
     
-    def __init__(self):
+    def __init__(self, transport=None):
         self.api_key = None
         self.api_url = "https://api.openai.com/v1/images/generations"
+        self.transport = transport if transport is not None else ProviderTransport()
     
     def set_api_key(self, api_key):
         """Set the API key for the DALL-E service."""
         self.api_key = api_key
     
+    def with_api_key(self, api_key):
+        """Get a copy of this generator bound to an API key, sharing its transport."""
+        client = copy.copy(self)
+        client.api_key = api_key
+        return client
+    
     def generate_image(self, prompt, style="digital-art"):
         """
         Generate an image using DALL-E.
@@ -816,7 +1156,7 @@ class DallEImageGenerator:
                 "quality": "standard"
             }
             
-            response = requests.post(self.api_url, headers=headers, json=data)
+            response = self.transport.post(self.api_url, headers=headers, json=data)
             response.raise_for_status()
             
             result = response.json()
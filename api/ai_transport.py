@@ -0,0 +1,120 @@
+import os
+import logging
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections kept per provider host
+AI_POOL_SIZE = int(os.environ.get('SCRAPER_AI_POOL_SIZE', 10))
+
+# Connect and read timeouts for provider calls (seconds); generation can take a while to start
+AI_CONNECT_TIMEOUT = float(os.environ.get('SCRAPER_AI_CONNECT_TIMEOUT', 10))
+AI_READ_TIMEOUT = float(os.environ.get('SCRAPER_AI_READ_TIMEOUT', 180))
+
+# Retries for connections that fail before the request is sent (safe for POST)
+AI_CONNECT_RETRIES = int(os.environ.get('SCRAPER_AI_CONNECT_RETRIES', 2))
+
+
+class ProviderTransport:
+    """
+    Shared HTTP transport for the AI providers.
+
+    Keeps one pooled keep-alive session per provider host, so consecutive calls
+    (a rewrite, then its keyword extraction) reuse a warm TLS connection
+    instead of handshaking again, and puts explicit connect and read timeouts
+    on every call so a hung provider can't hold a worker forever.
+    """
+
+    def __init__(self, pool_size=AI_POOL_SIZE, connect_timeout=AI_CONNECT_TIMEOUT,
+                 read_timeout=AI_READ_TIMEOUT, connect_retries=AI_CONNECT_RETRIES):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.connect_retries = connect_retries
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, url):
+        """
+        Get the pooled session for a URL's host.
+
+        Args:
+            url (str): The provider endpoint
+
+        Returns:
+            requests.Session: The session
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._sessions[host] = self._create_session()
+            return session
+
+    def _create_session(self):
+        retry = Retry(total=self.connect_retries, connect=self.connect_retries, read=0, redirect=0,
+                      status=0, other=0, backoff_factor=0.5)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def post(self, url, timeout=None, **kwargs):
+        """
+        POST to a provider.
+
+        Args:
+            url (str): The provider endpoint
+            timeout (float|tuple): Overrides the (connect, read) timeout
+            **kwargs: Passed on to requests (headers, json, stream, ...)
+
+        Returns:
+            requests.Response: The response
+        """
+        return self.session(url).post(url, timeout=timeout or self.timeout, **kwargs)
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def iter_sse(response):
+    """
+    Read a Server-Sent Events stream.
+
+    Args:
+        response (requests.Response): A streaming response
+
+    Yields:
+        tuple: (event name or None, data string) for each event
+    """
+    event = None
+    data = []
+
+    # SSE is always UTF-8, whatever the Content-Type says
+    response.encoding = 'utf-8'
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if data:
+                yield event, '\n'.join(data)
+            event = None
+            data = []
+        elif line.startswith(':'):
+            continue
+        elif line.startswith('event:'):
+            event = line[6:].strip()
+        elif line.startswith('data:'):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(' ') else value)
+
+    if data:
+        yield event, '\n'.join(data)
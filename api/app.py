@@ -1,5 +1,7 @@
 import os
-from flask import Flask, request, jsonify
+import json
+import time
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import logging
 
@@ -9,33 +11,57 @@ logging.basicConfig(level=logging.DEBUG,
 logger = logging.getLogger(__name__)
 
 # Import our modules
-from scraper import WebScraper, RssScraper
+from scraper import WebScraper, RssScraper, SitemapScraper
+from feed_poller import FeedPoller
 from ai_models import (
     OpenAIGenerator, 
     GeminiGenerator, 
     ClaudeGenerator, 
     DeepSeekGenerator, 
-    DallEImageGenerator
+    DallEImageGenerator,
+    AI_CACHE,
+    AI_CACHE_TTL,
+    AI_CACHE_SIZE
 )
+from ai_transport import ProviderTransport
+from result_cache import create_cache
 
 # Create Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Maximum number of URLs accepted by a single batch request
+MAX_BATCH_ITEMS = int(os.environ.get('SCRAPER_MAX_BATCH_ITEMS', 50))
+
+# Maximum number of feeds accepted by a single feed batch request
+MAX_BATCH_FEEDS = int(os.environ.get('SCRAPER_MAX_BATCH_FEEDS', 200))
+
+# Maximum number of links accepted by a single seen-items request
+MAX_SEEN_LINKS = int(os.environ.get('SCRAPER_MAX_SEEN_LINKS', 1000))
+
+# Run the background feed poller in the development server ('on' or 'off'). Under
+# gunicorn, run it as its own process instead: python feed_poller.py
+POLLER_ENABLED = os.environ.get('SCRAPER_POLLER', 'off').lower() in ('on', 'true', '1')
+
 # Initialize components
 web_scraper = WebScraper()
-rss_scraper = RssScraper()
+rss_scraper = RssScraper(web_scraper=web_scraper)
+sitemap_scraper = SitemapScraper(limiter=rss_scraper.limiter, seen_index=rss_scraper.seen)
+feed_poller = FeedPoller(rss_scraper)
 
-# Initialize AI generators
+# Initialize AI generators, sharing one pooled transport and response cache. These are
+# templates: requests bind their API key with with_api_key() instead of mutating them
+ai_transport = ProviderTransport()
+ai_response_cache = create_cache(AI_CACHE, 'ai_responses', AI_CACHE_TTL, AI_CACHE_SIZE)
 ai_generators = {
-    'openai': OpenAIGenerator(),
-    'gemini': GeminiGenerator(),
-    'claude': ClaudeGenerator(),
-    'deepseek': DeepSeekGenerator()
+    'openai': OpenAIGenerator(ai_transport, ai_response_cache),
+    'gemini': GeminiGenerator(ai_transport, ai_response_cache),
+    'claude': ClaudeGenerator(ai_transport, ai_response_cache),
+    'deepseek': DeepSeekGenerator(ai_transport, ai_response_cache)
 }
 
 # Initialize Image generator
-image_generator = DallEImageGenerator()
+image_generator = DallEImageGenerator(ai_transport)
 
 @app.route('/status', methods=['GET'])
 def status():
@@ -58,6 +84,7 @@ def scrape_article():
         selectors = data.get('selectors', {})
         fetch_images = data.get('fetch_images', True)
         fetch_social_embeds = data.get('fetch_social_embeds', True)
+        cache = data.get('cache')  # 'use' (default), 'bypass' or 'refresh'
         
         logger.debug(f"Scraping URL: {url}")
         
@@ -65,7 +92,8 @@ def scrape_article():
             url, 
             selectors, 
             fetch_images=fetch_images, 
-            fetch_social_embeds=fetch_social_embeds
+            fetch_social_embeds=fetch_social_embeds,
+            cache=cache
         )
         
         return jsonify(result)
@@ -74,6 +102,43 @@ def scrape_article():
         logger.exception("Error in scrape_article endpoint")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/scrape/batch', methods=['POST'])
+def scrape_batch():
+    """Scrape several articles concurrently"""
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('items'):
+            return jsonify({'error': 'Items are required'}), 400
+        
+        # Accept plain URL strings as well as item objects
+        items = [{'url': item} if isinstance(item, str) else item for item in data['items']]
+        
+        if len(items) > MAX_BATCH_ITEMS:
+            return jsonify({'error': f'Too many items, maximum is {MAX_BATCH_ITEMS}'}), 400
+        
+        logger.debug(f"Scraping batch of {len(items)} URLs")
+        
+        started = time.monotonic()
+        results = web_scraper.scrape_batch(items, max_workers=data.get('max_workers'))
+        
+        return jsonify({
+            'results': results,
+            'elapsed': round(time.monotonic() - started, 3)
+        })
+    
+    except Exception as e:
+        logger.exception("Error in scrape_batch endpoint")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/scrape/cache/stats', methods=['GET'])
+def scrape_cache_stats():
+    """Report extraction result cache usage"""
+    if web_scraper.result_cache is None:
+        return jsonify({'enabled': False})
+    
+    return jsonify(dict(web_scraper.result_cache.stats(), enabled=True))
+
 @app.route('/scrape/rss', methods=['POST'])
 def scrape_rss():
     """Scrape articles from an RSS feed"""
@@ -86,10 +151,34 @@ def scrape_rss():
         feed_url = data['feed_url']
         limit = data.get('limit', 10)
         keywords = data.get('keywords', '')
+        max_scan = data.get('max_scan')
+        exclude_keywords = data.get('exclude_keywords', '')
+        whole_word = data.get('whole_word', True)
+        only_new = data.get('only_new', False)
+        seen_scope = data.get('seen_scope', '')
+        record_seen = data.get('record_seen', True)
+        incremental = data.get('incremental', False)
+        since = data.get('since')
+        resolve_links = data.get('resolve_links', False)
+        fetch_full = data.get('fetch_full', False)
+        full_timeout = data.get('full_timeout')
         
         logger.debug(f"Scraping RSS feed: {feed_url}")
         
-        result = rss_scraper.scrape_feed(feed_url, limit, keywords)
+        result = rss_scraper.scrape_feed(
+            feed_url, limit, keywords,
+            max_scan=max_scan,
+            exclude_keywords=exclude_keywords,
+            whole_word=whole_word,
+            only_new=only_new,
+            seen_scope=seen_scope,
+            record_seen=record_seen,
+            incremental=incremental,
+            since=since,
+            resolve_links=resolve_links,
+            fetch_full=fetch_full,
+            full_timeout=full_timeout
+        )
         
         return jsonify(result)
     
@@ -97,6 +186,151 @@ def scrape_rss():
         logger.exception("Error in scrape_rss endpoint")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/scrape/rss/batch', methods=['POST'])
+def scrape_rss_batch():
+    """Scrape several RSS feeds concurrently"""
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('feeds'):
+            return jsonify({'error': 'Feeds are required'}), 400
+        
+        # Accept plain feed URL strings as well as feed objects
+        feeds = [{'feed_url': feed} if isinstance(feed, str) else feed for feed in data['feeds']]
+        
+        if len(feeds) > MAX_BATCH_FEEDS:
+            return jsonify({'error': f'Too many feeds, maximum is {MAX_BATCH_FEEDS}'}), 400
+        
+        # Results are keyed by id, so ids must be unique
+        ids = [str(feed['id']) for feed in feeds if isinstance(feed, dict) and feed.get('id')]
+        if len(ids) != len(set(ids)):
+            return jsonify({'error': 'Feed ids must be unique'}), 400
+        
+        # A request-wide timeout applies to feeds that don't set their own
+        if data.get('timeout'):
+            feeds = [dict({'timeout': data['timeout']}, **feed) if isinstance(feed, dict) else feed for feed in feeds]
+        
+        logger.debug(f"Scraping batch of {len(feeds)} RSS feeds")
+        
+        # The deadline bounds the whole batch; feeds not fetched by then come back with an error
+        started = time.monotonic()
+        results = rss_scraper.scrape_feeds(feeds, max_workers=data.get('max_workers'), deadline=data.get('deadline'))
+        
+        return jsonify({
+            'feeds': results,
+            'elapsed': round(time.monotonic() - started, 3)
+        })
+    
+    except Exception as e:
+        logger.exception("Error in scrape_rss_batch endpoint")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/scrape/rss/seen', methods=['POST'])
+def confirm_rss_seen():
+    """Record feed items fetched with record_seen=false as seen"""
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('links'), list):
+            return jsonify({'error': 'Links are required'}), 400
+        
+        if len(data['links']) > MAX_SEEN_LINKS:
+            return jsonify({'error': f'Too many links, maximum is {MAX_SEEN_LINKS}'}), 400
+        
+        if not all(isinstance(link, str) and link.strip() for link in data['links']):
+            return jsonify({'error': 'Links must be non-empty strings'}), 400
+        
+        if not isinstance(data.get('seen_scope', ''), str):
+            return jsonify({'error': 'Seen scope must be a string'}), 400
+        
+        recorded = rss_scraper.confirm_seen(data['links'], data.get('seen_scope', ''))
+        
+        return jsonify({'recorded': recorded})
+    
+    except Exception as e:
+        logger.exception("Error in confirm_rss_seen endpoint")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/scrape/sitemap', methods=['POST'])
+def scrape_sitemap():
+    """Get the newest articles listed in a sitemap or news sitemap"""
+    try:
+        data = request.get_json()
+        
+        if not data or 'sitemap_url' not in data:
+            return jsonify({'error': 'Sitemap URL is required'}), 400
+        
+        sitemap_url = data['sitemap_url']
+        
+        logger.debug(f"Scraping sitemap: {sitemap_url}")
+        
+        result = sitemap_scraper.scrape_sitemap(
+            sitemap_url,
+            data.get('limit', 10),
+            since=data.get('since'),
+            keywords=data.get('keywords', ''),
+            exclude_keywords=data.get('exclude_keywords', ''),
+            whole_word=data.get('whole_word', True),
+            only_new=data.get('only_new', False),
+            seen_scope=data.get('seen_scope', ''),
+            timeout=data.get('timeout'),
+            max_files=data.get('max_files')
+        )
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        logger.exception("Error in scrape_sitemap endpoint")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/scrape/rss/subscriptions', methods=['POST'])
+def set_rss_subscriptions():
+    """Set the feeds the background poller watches for a subscriber"""
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('subscriber'):
+            return jsonify({'error': 'Subscriber is required'}), 400
+        
+        # Accept plain feed URL strings as well as feed objects
+        feeds = [{'feed_url': feed} if isinstance(feed, str) else feed for feed in data.get('feeds', [])]
+        
+        if len(feeds) > MAX_BATCH_FEEDS:
+            return jsonify({'error': f'Too many feeds, maximum is {MAX_BATCH_FEEDS}'}), 400
+        
+        try:
+            count = feed_poller.subscribe(data['subscriber'], feeds)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({'subscriber': data['subscriber'], 'feeds': count})
+    
+    except Exception as e:
+        logger.exception("Error in set_rss_subscriptions endpoint")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/scrape/rss/queue/drain', methods=['POST'])
+def drain_rss_queue():
+    """Take the new items the background poller queued for a subscriber"""
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('subscriber'):
+            return jsonify({'error': 'Subscriber is required'}), 400
+        
+        items = feed_poller.drain(data['subscriber'], data.get('max_items', 100))
+        
+        return jsonify({'items': items})
+    
+    except Exception as e:
+        logger.exception("Error in drain_rss_queue endpoint")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/scrape/rss/poller', methods=['GET'])
+def rss_poller_status():
+    """Report the background poller's schedule and queues"""
+    return jsonify(feed_poller.status())
+
 @app.route('/scrape/rss/test', methods=['POST'])
 def test_rss_feed():
     """Test an RSS feed by fetching a few items"""
@@ -119,6 +353,17 @@ def test_rss_feed():
         logger.exception("Error in test_rss_feed endpoint")
         return jsonify({'error': str(e)}), 500
 
+def generation_params(data):
+    """Read the optional article generation parameters from a request"""
+    return {
+        'min_word_count': data.get('min_word_count', 500),
+        'keyword_density': data.get('keyword_density', 2.5),
+        'auto_headings': data.get('auto_headings', True),
+        'use_lists': data.get('use_lists', True),
+        'add_faq': data.get('add_faq', True),
+        'add_conclusion': data.get('add_conclusion', True),
+    }
+
 @app.route('/ai/generate', methods=['POST'])
 def generate_content():
     """Generate AI content from scraped content"""
@@ -137,16 +382,10 @@ def generate_content():
         api_key = data['api_key']
         language = data.get('language', 'english')
         tone = data.get('tone', 'default')
+        cache = data.get('cache')  # 'use' (default), 'bypass' or 'refresh'
         
         # Additional parameters
-        params = {
-            'min_word_count': data.get('min_word_count', 500),
-            'keyword_density': data.get('keyword_density', 2.5),
-            'auto_headings': data.get('auto_headings', True),
-            'use_lists': data.get('use_lists', True),
-            'add_faq': data.get('add_faq', True),
-            'add_conclusion': data.get('add_conclusion', True),
-        }
+        params = generation_params(data)
         
         logger.debug(f"Generating content using {model} model")
         
@@ -154,8 +393,11 @@ def generate_content():
         if model not in ai_generators:
             return jsonify({'error': f'Unknown AI model: {model}'}), 400
         
-        generator = ai_generators[model]
-        generator.set_api_key(api_key)
+        # Bind the key to a per-request copy; the shared generators are never mutated
+        try:
+            generator = ai_generators[model].with_api_key(api_key, cache)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         result = generator.generate_content(content, title, language, tone, **params)
         
@@ -165,6 +407,98 @@ def generate_content():
         logger.exception("Error in generate_content endpoint")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/ai/generate_combined', methods=['POST'])
+def generate_combined():
+    """Generate AI content, tags and SEO data with a single provider call"""
+    try:
+        data = request.get_json()
+        
+        required_fields = ['content', 'title', 'model', 'api_key']
+        missing_fields = [field for field in required_fields if field not in (data or {})]
+        
+        if missing_fields:
+            return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
+        
+        model = data['model']
+        if model not in ai_generators:
+            return jsonify({'error': f'Unknown AI model: {model}'}), 400
+        
+        logger.debug(f"Generating combined content using {model} model")
+        
+        try:
+            generator = ai_generators[model].with_api_key(data['api_key'], data.get('cache'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        result = generator.generate_combined(
+            data['content'], data['title'],
+            data.get('language', 'english'), data.get('tone', 'default'),
+            **generation_params(data)
+        )
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        logger.exception("Error in generate_combined endpoint")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/ai/generate/stream', methods=['POST'])
+def generate_content_stream():
+    """Generate AI content, streaming it as Server-Sent Events or NDJSON"""
+    try:
+        data = request.get_json()
+        
+        required_fields = ['content', 'title', 'model', 'api_key']
+        missing_fields = [field for field in required_fields if field not in (data or {})]
+        
+        if missing_fields:
+            return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
+        
+        model = data['model']
+        if model not in ai_generators:
+            return jsonify({'error': f'Unknown AI model: {model}'}), 400
+        
+        # 'sse' (default) or 'ndjson'
+        stream_format = data.get('format', 'sse').lower()
+        if stream_format not in ('sse', 'ndjson'):
+            return jsonify({'error': f'Unknown stream format: {stream_format}. Use sse or ndjson.'}), 400
+        
+        logger.debug(f"Streaming content using {model} model")
+        
+        generator = ai_generators[model].with_api_key(data['api_key'])
+        events = generator.stream_content(
+            data['content'], data['title'],
+            data.get('language', 'english'), data.get('tone', 'default'),
+            **generation_params(data)
+        )
+        
+        def encode():
+            for event in events:
+                payload = json.dumps({key: value for key, value in event.items() if key != 'type'})
+                if stream_format == 'sse':
+                    yield f"event: {event['type']}\ndata: {payload}\n\n"
+                else:
+                    yield json.dumps(event) + '\n'
+        
+        mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+        return Response(
+            stream_with_context(encode()),
+            mimetype=mimetype,
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    except Exception as e:
+        logger.exception("Error in generate_content_stream endpoint")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/ai/cache/stats', methods=['GET'])
+def ai_cache_stats():
+    """Report AI provider response cache usage"""
+    if ai_response_cache is None:
+        return jsonify({'enabled': False})
+    
+    return jsonify(dict(ai_response_cache.stats(), enabled=True))
+
 @app.route('/ai/generate_image', methods=['POST'])
 def generate_image():
     """Generate an image using AI"""
@@ -188,8 +522,7 @@ def generate_image():
         if model.lower() != 'dall-e':
             return jsonify({'error': f'Unsupported image model: {model}. Only DALL-E is currently supported.'}), 400
         
-        image_generator.set_api_key(api_key)
-        result = image_generator.generate_image(prompt, style)
+        result = image_generator.with_api_key(api_key).generate_image(prompt, style)
         
         return jsonify(result)
     
@@ -213,6 +546,7 @@ def generate_seo():
         title = data['title']
         model = data['model']
         api_key = data['api_key']
+        cache = data.get('cache')  # 'use' (default), 'bypass' or 'refresh'
         
         logger.debug(f"Generating SEO data using {model} model")
         
@@ -220,8 +554,11 @@ def generate_seo():
         if model not in ai_generators:
             return jsonify({'error': f'Unknown AI model: {model}'}), 400
         
-        generator = ai_generators[model]
-        generator.set_api_key(api_key)
+        # Bind the key to a per-request copy; the shared generators are never mutated
+        try:
+            generator = ai_generators[model].with_api_key(api_key, cache)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         result = generator.generate_seo_data(content, title)
         
@@ -232,4 +569,6 @@ def generate_seo():
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    if POLLER_ENABLED:
+        feed_poller.start()
     app.run(host='0.0.0.0', port=5000, debug=True)
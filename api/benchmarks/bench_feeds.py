@@ -0,0 +1,169 @@
+"""
+Feed parsing benchmark: streaming fast path vs feedparser.
+
+Builds synthetic RSS 2.0 and Atom aggregator feeds (500 entries by default, with
+HTML descriptions, media:content and authors), parses each with feed_parser's
+streaming fast path (normalizing every entry) and with feedparser, and reports
+latency, peak Python memory and any field where the two parsers disagree.
+
+Usage:
+    python benchmarks/bench_feeds.py [--entries N] [--repeat N] [--output results.json]
+
+Results are written as JSON to stdout (or to --output).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import logging
+logging.disable(logging.WARNING)
+
+import feedparser
+from feed_parser import _iter_fast, normalize_entry
+from bench_scraper import summarize
+
+FEED_URL = 'https://news.example.com/feed/'
+
+# Fields compared between the two parsers
+COMPARED_FIELDS = ('title', 'link', 'description', 'published', 'author', 'published_parsed', 'media_content')
+
+
+def build_rss(entries):
+    """Build an RSS 2.0 aggregator feed with the given number of items."""
+    items = ''.join(
+        f'<item><title>Story {i}: सरकार ने नई योजना की घोषणा की</title>'
+        f'<link>/2024/01/story-{i}/</link><guid isPermaLink="false">story-{i}</guid>'
+        f'<description><![CDATA[<p>Summary of story {i} with <a href="https://example.com/{i}">a link</a>.</p>'
+        f'<script>track({i})</script>]]></description>'
+        f'<pubDate>Mon, 01 Jan 2024 {i % 24:02d}:00:00 +0530</pubDate>'
+        f'<dc:creator>Reporter {i % 7}</dc:creator>'
+        f'<media:content url="https://cdn.example.com/{i}.jpg" medium="image" width="1200"/></item>'
+        for i in range(entries)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/" xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        '<channel><title>Aggregator</title><link>https://news.example.com/</link>'
+        '<description>All the news</description><lastBuildDate>Mon, 01 Jan 2024 12:00:00 +0000</lastBuildDate>'
+        f'{items}</channel></rss>'
+    ).encode('utf-8')
+
+
+def build_atom(entries):
+    """Build an Atom aggregator feed with the given number of entries."""
+    items = ''.join(
+        f'<entry><title>Story {i}</title><link rel="alternate" href="/2024/01/story-{i}/"/>'
+        f'<id>urn:story:{i}</id><published>2024-01-01T{i % 24:02d}:00:00+05:30</published>'
+        f'<updated>2024-01-02T00:00:00Z</updated><author><name>Reporter {i % 7}</name></author>'
+        f'<summary type="html">&lt;p&gt;Summary of story {i}&lt;/p&gt;</summary></entry>'
+        for i in range(entries)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+        '<title>Aggregator</title><link href="https://news.example.com/"/>'
+        f'<updated>2024-01-02T00:00:00Z</updated>{items}</feed>'
+    ).encode('utf-8')
+
+
+def run_feedparser(body):
+    feed = feedparser.parse(body, response_headers={'content-location': FEED_URL})
+    return feed.feed, feed.entries
+
+
+def run_fast(body):
+    feed_info = {}
+    return feed_info, [normalize_entry(entry) for entry in _iter_fast(body, FEED_URL, feed_info)]
+
+
+def measure(func, body, repeat):
+    """
+    Time a parser and measure its peak Python memory.
+
+    Args:
+        func (callable): The parser, called with the feed body
+        body (bytes): The feed document
+        repeat (int): Number of timed runs
+
+    Returns:
+        tuple: (result of the last run, latency summary, peak memory in KB)
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(body)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    result = func(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, summarize(samples), round(peak / 1024, 1)
+
+
+def compare(fast_entries, slow_entries):
+    """
+    List the fields where the two parsers disagree.
+
+    Returns:
+        list: Up to 10 mismatches, as 'index:field' strings
+    """
+    mismatches = []
+    if len(fast_entries) != len(slow_entries):
+        mismatches.append(f'entries: {len(fast_entries)} != {len(slow_entries)}')
+    for index, (fast, slow) in enumerate(zip(fast_entries, slow_entries)):
+        for field in COMPARED_FIELDS:
+            if (fast.get(field) or None) != (slow.get(field) or None):
+                mismatches.append(f'{index}:{field}')
+    return mismatches[:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the streaming feed parser against feedparser')
+    parser.add_argument('--entries', type=int, default=500, help='entries per feed (default: 500)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per parser (default: 5)')
+    parser.add_argument('--output', help='write results to this file instead of stdout')
+    args = parser.parse_args()
+
+    feeds = {}
+    for kind, build in (('rss', build_rss), ('atom', build_atom)):
+        body = build(args.entries)
+        (_, fast_entries), fast_latency, fast_peak = measure(run_fast, body, max(1, args.repeat))
+        (_, slow_entries), slow_latency, slow_peak = measure(run_feedparser, body, max(1, args.repeat))
+
+        feeds[kind] = {
+            'bytes': len(body),
+            'fast': {'latency': fast_latency, 'peak_python_kb': fast_peak},
+            'feedparser': {'latency': slow_latency, 'peak_python_kb': slow_peak},
+            'speedup': round(slow_latency['median_ms'] / fast_latency['median_ms'], 1),
+            'mismatches': compare(fast_entries, slow_entries)
+        }
+
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'feedparser': feedparser.__version__,
+            'platform': platform.platform()
+        },
+        'entries': args.entries,
+        'repeat': args.repeat,
+        'feeds': feeds
+    }
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+Offline benchmark and extraction regression suite for WebScraper.
+
+Runs every page in benchmarks/corpus through the extraction pipeline and reports,
+per page, the latency of each stage (parse, JSON-LD/OpenGraph, selector
+extraction, trafilatura fallback, images, embeds, full pipeline), peak Python
+memory and accuracy against the expectations in corpus/expected.json.
+
+Each corpus page is tagged with its source. "synthetic" pages are trimmed
+reproductions of the layouts we scrape most: WordPress themes in English and
+Hindi, an AMP article, a long Hindi live blog, an embed-heavy page, a layout
+the default selectors miss (so the trafilatura fallback runs) and a page with
+a complete NewsArticle JSON-LD block. They were written alongside the
+selectors, so they mostly catch crashes and lost fields. "recorded" pages are
+real publisher pages saved with record_page.py, with expectations taken from
+reading the page; their accuracy is what tracks real-world extraction, and it
+is reported separately.
+
+Accuracy is only meaningful relative to an earlier run: pass that run's output
+as --baseline and any page scoring lower than it did fails the suite.
+
+Usage:
+    python benchmarks/bench_scraper.py [--repeat N] [--output results.json] [--fail-under 0.9]
+        [--baseline previous.json]
+
+Results are written as JSON to stdout (or to --output).
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import statistics
+import tracemalloc
+from urllib.parse import urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import logging
+logging.disable(logging.WARNING)
+
+import lxml
+import trafilatura
+from scraper import detect_encoding, parse_html, extract_page
+from page_visitor import PageVisitor
+from structured_data import extract_structured_data
+from extraction_profiles import ProfileRegistry
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(text):
+    """Strip tags and collapse whitespace."""
+    return SPACE_RE.sub(' ', TAG_RE.sub(' ', text or '')).strip()
+
+
+def summarize(samples):
+    """
+    Summarize latency samples.
+    
+    Args:
+        samples (list): Latencies in milliseconds
+        
+    Returns:
+        dict: Latency statistics in milliseconds
+    """
+    samples = sorted(samples)
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.mean(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'min_ms': round(samples[0], 3)
+    }
+
+
+def timed(func, repeat):
+    """
+    Run a function repeatedly and summarize its latency.
+    
+    Args:
+        func (callable): The function to time (called without arguments)
+        repeat (int): Number of timed runs
+        
+    Returns:
+        dict: Latency statistics in milliseconds
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def score_accuracy(result, expected):
+    """
+    Compare an extraction result with the page's expectations.
+    
+    Every check scores between 0 and 1; only checks present in the expectations run.
+    
+    Args:
+        result (dict): The extract_page result
+        expected (dict): The page's expectations
+        
+    Returns:
+        dict: Score per check, plus the overall mean under 'score'
+    """
+    scores = {}
+    content = normalize(result.get('content'))
+    
+    if 'title' in expected:
+        scores['title'] = float(normalize(result.get('title')) == expected['title'])
+    
+    for field in ('author', 'date'):
+        if field in expected:
+            accepted = expected[field] if isinstance(expected[field], list) else [expected[field]]
+            scores[field] = float(normalize(result.get(field)) in accepted)
+    
+    if expected.get('content_contains'):
+        found = [snippet for snippet in expected['content_contains'] if snippet in content]
+        scores['content_recall'] = len(found) / len(expected['content_contains'])
+    
+    if expected.get('content_excludes'):
+        leaked = [snippet for snippet in expected['content_excludes'] if snippet in content]
+        scores['content_precision'] = 1 - len(leaked) / len(expected['content_excludes'])
+    
+    if expected.get('images'):
+        urls = {source for image in result.get('images', []) for source in image.get('sources', [image['url']])}
+        found = [url for url in expected['images'] if url in urls]
+        scores['images'] = len(found) / len(expected['images'])
+    
+    if expected.get('embeds'):
+        counts = {}
+        for embed in result.get('social_embeds', []):
+            counts[embed['type']] = counts.get(embed['type'], 0) + 1
+        matched = sum(1 for embed_type, count in expected['embeds'].items() if counts.get(embed_type, 0) == count)
+        scores['embeds'] = matched / len(expected['embeds'])
+    
+    scores['score'] = round(statistics.mean(scores.values()), 4) if scores else 1.0
+    return scores
+
+
+def bench_page(name, expected, registry, repeat):
+    """
+    Benchmark and score one corpus page.
+    
+    Args:
+        name (str): The corpus file name
+        expected (dict): The page's expectations (including its 'url')
+        registry (ProfileRegistry): The extraction profiles
+        repeat (int): Number of timed runs per stage
+        
+    Returns:
+        dict: Page results
+    """
+    with open(os.path.join(CORPUS_DIR, name), 'rb') as f:
+        body = f.read()
+    
+    url = expected['url']
+    headers = {'Content-Type': expected.get('content_type', 'text/html')}
+    encoding = detect_encoding(headers, body)
+    profile = registry.for_host(urlparse(url).hostname)
+    tree = parse_html(body, encoding)
+    
+    stages = {
+        'parse': timed(lambda: parse_html(body, encoding), repeat),
+        'structured_data': timed(lambda: extract_structured_data(tree), repeat),
+        'selectors': timed(lambda: [profile.extract(tree, field) for field in ('title', 'content', 'author', 'date')], repeat),
+        'images': timed(lambda: PageVisitor(url, collect_embeds=False).visit(tree), repeat),
+        'embeds': timed(lambda: PageVisitor(url, collect_images=False).visit(tree), repeat),
+        'media_single_pass': timed(lambda: PageVisitor(url).visit(tree), repeat),
+    }
+    
+    # trafilatura cleans the tree in place, so every run gets a fresh copy; the copy isn't timed
+    trafilatura_samples = []
+    for _ in range(repeat):
+        fresh = parse_html(body, encoding)
+        started = time.perf_counter()
+        trafilatura.bare_extraction(fresh, url=url, include_images=True, include_links=True)
+        trafilatura_samples.append((time.perf_counter() - started) * 1000)
+    stages['trafilatura'] = summarize(trafilatura_samples)
+    
+    stages['total'] = timed(lambda: extract_page(body, encoding, url, profile), repeat)
+    
+    # Peak Python heap for one full extraction (libxml2's own allocations aren't traced)
+    tracemalloc.start()
+    result = extract_page(body, encoding, url, profile)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        'page': name,
+        'source': expected.get('source', 'synthetic'),
+        'bytes': len(body),
+        'encoding': encoding,
+        'profile': profile.name,
+        'stages': stages,
+        'peak_python_kb': round(peak / 1024, 1),
+        'accuracy': score_accuracy(result, expected)
+    }
+
+
+def mean_accuracy(pages):
+    """Mean accuracy score of some pages, None if there are none."""
+    return round(statistics.mean(page['accuracy']['score'] for page in pages), 4) if pages else None
+
+
+def find_regressions(pages, baseline_path):
+    """
+    Compare page scores with an earlier run.
+    
+    Args:
+        pages (list): This run's page results
+        baseline_path (str): The earlier run's results file
+        
+    Returns:
+        list: The pages scoring lower than in the baseline, with both scores
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {page['page']: page['accuracy'] for page in json.load(f).get('pages', [])}
+    
+    regressions = []
+    for page in pages:
+        before = baseline.get(page['page'])
+        if before is not None and page['accuracy']['score'] < before['score']:
+            checks = [check for check, score in page['accuracy'].items()
+                      if check != 'score' and score < before.get(check, 0)]
+            regressions.append({
+                'page': page['page'],
+                'score': page['accuracy']['score'],
+                'baseline_score': before['score'],
+                'checks': checks
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark WebScraper extraction on the offline corpus')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per stage (default: 20)')
+    parser.add_argument('--page', action='append', help='only run the given corpus page(s)')
+    parser.add_argument('--output', help='write results to this file instead of stdout')
+    parser.add_argument('--fail-under', type=float,
+                        help='exit with status 1 if mean accuracy (of the recorded pages, if any) is below this')
+    parser.add_argument('--baseline', help='an earlier run\'s results; exit with status 1 if any page scores lower')
+    args = parser.parse_args()
+    
+    with open(os.path.join(CORPUS_DIR, 'expected.json'), encoding='utf-8') as f:
+        expectations = json.load(f)
+    
+    registry = ProfileRegistry.from_file()
+    pages = [bench_page(name, expected, registry, max(1, args.repeat))
+             for name, expected in sorted(expectations.items())
+             if not args.page or name in args.page]
+    
+    recorded = [page for page in pages if page['source'] == 'recorded']
+    regressions = find_regressions(pages, args.baseline) if args.baseline else []
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'lxml': lxml.__version__,
+            'trafilatura': trafilatura.__version__,
+            'platform': platform.platform()
+        },
+        'repeat': args.repeat,
+        'pages': pages,
+        'summary': {
+            'mean_accuracy': mean_accuracy(pages) or 0.0,
+            'mean_accuracy_recorded': mean_accuracy(recorded),
+            'mean_accuracy_synthetic': mean_accuracy([page for page in pages if page['source'] != 'recorded']),
+            'recorded_pages': len(recorded),
+            'regressions': regressions,
+            'total_median_ms': round(sum(page['stages']['total']['median_ms'] for page in pages), 3),
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        }
+    }
+    
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    
+    gated = mean_accuracy(recorded or pages) or 0.0
+    if regressions or (args.fail_under is not None and gated < args.fail_under):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
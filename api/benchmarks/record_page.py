@@ -0,0 +1,95 @@
+"""
+Record a live publisher page into the extraction benchmark corpus.
+
+The page is downloaded once, the way WebScraper fetches it, and saved byte for
+byte to benchmarks/corpus, with its Content-Type, so it is parsed offline
+exactly as it was served. Its entry in corpus/expected.json takes the expected
+fields from the command line: they must come from reading the page, not from
+the scraper's own output, or the suite would only check the scraper against
+itself.
+
+Usage:
+    python benchmarks/record_page.py URL NAME --title "Headline" --contains "A sentence from the body" \
+        [--author NAME] [--date DATE] [--excludes "Footer text"] [--image URL] [--embed twitter=1]
+
+Run bench_scraper.py afterwards and keep its output as the new --baseline.
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import date
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import logging
+logging.disable(logging.WARNING)
+
+from scraper import create_session, fetch_bounded, DEFAULT_MAX_BYTES, DEFAULT_FETCH_DEADLINE, HTML_CONTENT_TYPES
+
+
+def parse_embeds(values):
+    """Turn "type=count" arguments into the expected embed counts."""
+    embeds = {}
+    for value in values or []:
+        embed_type, _, count = value.partition('=')
+        embeds[embed_type.strip()] = int(count or 1)
+    return embeds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record a publisher page into the benchmark corpus')
+    parser.add_argument('url', help='the article URL')
+    parser.add_argument('name', help='corpus file name, e.g. publisher_layout.html')
+    parser.add_argument('--title', required=True, help='the headline as shown on the page')
+    parser.add_argument('--contains', action='append', required=True, help='a sentence from the article body')
+    parser.add_argument('--excludes', action='append', help='text that must not end up in the content')
+    parser.add_argument('--author', action='append', help='an accepted author value')
+    parser.add_argument('--date', action='append', help='an accepted date value')
+    parser.add_argument('--image', action='append', help='an image URL the article shows')
+    parser.add_argument('--embed', action='append', help='expected embeds as type=count')
+    parser.add_argument('--force', action='store_true', help='replace an existing corpus page')
+    args = parser.parse_args()
+    
+    path = os.path.join(CORPUS_DIR, args.name)
+    if os.path.exists(path) and not args.force:
+        parser.error(f"{args.name} is already in the corpus (use --force to replace it)")
+    
+    response, body = fetch_bounded(create_session(1), args.url, None, DEFAULT_MAX_BYTES, DEFAULT_FETCH_DEADLINE,
+                                   HTML_CONTENT_TYPES)
+    
+    with open(path, 'wb') as f:
+        f.write(body)
+    
+    expected_path = os.path.join(CORPUS_DIR, 'expected.json')
+    with open(expected_path, encoding='utf-8') as f:
+        expectations = json.load(f)
+    
+    expected = {
+        'url': response.url,
+        'source': 'recorded',
+        'recorded': date.today().isoformat(),
+        'content_type': response.headers.get('Content-Type', 'text/html'),
+        'title': args.title,
+        'content_contains': args.contains
+    }
+    optional = {
+        'author': args.author,
+        'date': args.date,
+        'content_excludes': args.excludes,
+        'images': args.image,
+        'embeds': parse_embeds(args.embed)
+    }
+    expected.update({key: value for key, value in optional.items() if value})
+    expectations[args.name] = expected
+    
+    with open(expected_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(expectations, indent=2, ensure_ascii=False) + '\n')
+    
+    print(f"Recorded {response.url} as {args.name} ({len(body)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from cssselect import SelectorError
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Profile file, overridable through the environment
+PROFILES_FILE = os.environ.get(
+    'SCRAPER_PROFILES_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extraction_profiles.json')
+)
+
+# Selectors used when no publisher profile matches the hostname
+DEFAULT_SELECTORS = {
+    'title': 'h1, .entry-title, .article-title',
+    'content': '.entry-content, article, .post-content',
+    'author': '.author, .byline',
+    'date': '.published, .post-date, time'
+}
+
+# Fields returned as HTML rather than plain text
+HTML_FIELDS = ('content',)
+
+# Maximum number of compiled profiles kept for request-supplied selectors
+MAX_ADHOC_PROFILES = 64
+
+XPATH_PREFIX = 'xpath:'
+
+
+def compile_selector(selector):
+    """
+    Compile a single selector.
+    
+    Selectors prefixed with "xpath:" are compiled as XPath, anything else as CSS.
+    
+    Args:
+        selector (str): The selector
+        
+    Returns:
+        callable: A compiled selector that takes a tree and returns a list of matches
+    """
+    selector = selector.strip()
+    if selector.startswith(XPATH_PREFIX):
+        return etree.XPath(selector[len(XPATH_PREFIX):].strip())
+    return CSSSelector(selector, translator='html')
+
+
+def compile_selectors(selectors):
+    """
+    Compile a list (or comma-separated string) of selectors, skipping invalid ones.
+    
+    Args:
+        selectors (list|str): The selectors
+        
+    Returns:
+        list: The compiled selectors, in priority order
+    """
+    if isinstance(selectors, str):
+        selectors = selectors.split(',')
+    
+    compiled = []
+    for selector in selectors or []:
+        if not selector or not selector.strip():
+            continue
+        try:
+            compiled.append(compile_selector(selector))
+        except (SelectorError, etree.XPathSyntaxError) as e:
+            logger.warning(f"Skipping invalid selector {selector!r}: {str(e)}")
+    
+    return compiled
+
+
+def _selector_lists(selectors):
+    """Normalize selectors (lists or comma-separated strings) for comparison."""
+    normalized = {}
+    for field, value in (selectors or {}).items():
+        if isinstance(value, str):
+            value = value.split(',')
+        value = tuple(selector.strip() for selector in value or [] if selector and selector.strip())
+        if value:
+            normalized[field] = value
+    return normalized
+
+
+class ExtractionProfile:
+    """
+    Precompiled selectors for one publisher layout.
+    
+    For each field the profile remembers which selector matched last time and
+    tries it first on the next page. That only pays off when every page shares
+    one layout, so profiles serving many publishers (the default) don't learn.
+    """
+    
+    def __init__(self, name, selectors, domains=None, html_fields=HTML_FIELDS, learn=True):
+        self.name = name
+        self.domains = [domain.lower() for domain in (domains or [])]
+        self.html_fields = set(html_fields)
+        self.learn = learn
+        self.selectors = {field: compile_selectors(value) for field, value in (selectors or {}).items()}
+        self.last_matched = {}
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a profile from its JSON representation.
+        
+        Args:
+            data (dict): 'name', 'domains', 'selectors' and optional 'html_fields'
+            
+        Returns:
+            ExtractionProfile: The compiled profile
+        """
+        return cls(
+            data.get('name', ''),
+            data.get('selectors', {}),
+            domains=data.get('domains', []),
+            html_fields=data.get('html_fields', HTML_FIELDS)
+        )
+    
+    def has_field(self, field):
+        """Whether the profile defines selectors for a field."""
+        return bool(self.selectors.get(field))
+    
+    def match(self, tree, field):
+        """
+        Run the selectors for a field until one matches.
+        
+        Args:
+            tree (lxml.html.HtmlElement): The parsed document
+            field (str): The field name (title, content, author, date, images)
+            
+        Returns:
+            list: The matched elements (or strings, for XPath text/attribute selectors)
+        """
+        compiled = self.selectors.get(field)
+        if not compiled:
+            return []
+        
+        # Try the selector that matched last time first, otherwise keep priority order
+        last = self.last_matched.get(field, 0) if self.learn else 0
+        order = [last] + [index for index in range(len(compiled)) if index != last]
+        
+        for index in order:
+            matches = compiled[index](tree)
+            if matches:
+                if self.learn:
+                    self.last_matched[field] = index
+                return matches
+        
+        return []
+    
+    def extract(self, tree, field):
+        """
+        Extract a field from the document.
+        
+        Args:
+            tree (lxml.html.HtmlElement): The parsed document
+            field (str): The field name
+            
+        Returns:
+            str: The field HTML (for HTML fields) or text, empty if nothing matched
+        """
+        matches = self.match(tree, field)
+        if not matches:
+            return ""
+        
+        first = matches[0]
+        if isinstance(first, str):
+            return first.strip()
+        if field in self.html_fields:
+            return lxml_html.tostring(first, encoding='unicode', with_tail=False)
+        return first.text_content().strip()
+
+
+class ProfileRegistry:
+    """
+    Registry of extraction profiles, selected by hostname.
+    """
+    
+    def __init__(self, profiles=None, default=None):
+        self.default = default or ExtractionProfile('default', DEFAULT_SELECTORS, learn=False)
+        self._by_domain = {}
+        self._adhoc = OrderedDict()
+        self._lock = threading.Lock()
+        
+        for profile in profiles or []:
+            self.add(profile)
+    
+    @classmethod
+    def from_file(cls, path=None):
+        """
+        Load profiles from a JSON file.
+        
+        The file holds a list of profiles (or an object with a "profiles" list).
+        A profile named "default" without domains replaces the built-in defaults.
+        
+        Args:
+            path (str): The profile file, PROFILES_FILE if not given
+            
+        Returns:
+            ProfileRegistry: The registry
+        """
+        path = path or PROFILES_FILE
+        if not os.path.exists(path):
+            logger.debug(f"No extraction profile file at {path}, using default selectors")
+            return cls()
+        
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if isinstance(data, dict):
+            data = data.get('profiles', [])
+        
+        default = None
+        profiles = []
+        for entry in data:
+            profile = ExtractionProfile.from_dict(entry)
+            if profile.name == 'default' and not profile.domains:
+                profile.learn = False
+                default = profile
+            else:
+                profiles.append(profile)
+        
+        logger.debug(f"Loaded {len(profiles)} extraction profiles from {path}")
+        return cls(profiles, default)
+    
+    def add(self, profile):
+        """Register a profile for each of its domains."""
+        for domain in profile.domains:
+            self._by_domain[domain] = profile
+    
+    def for_host(self, hostname):
+        """
+        Find the profile for a hostname.
+        
+        A profile registered for "example.com" also serves "www.example.com"
+        and any other subdomain.
+        
+        Args:
+            hostname (str): The hostname
+            
+        Returns:
+            ExtractionProfile: The matching profile or the default one
+        """
+        labels = (hostname or '').lower().split('.')
+        for start in range(len(labels) - 1):
+            profile = self._by_domain.get('.'.join(labels[start:]))
+            if profile:
+                return profile
+        return self.default
+    
+    def for_request(self, hostname, selectors=None):
+        """
+        Find the profile for a scrape request.
+        
+        Request-supplied selectors are used unless they are just the default
+        selectors (which clients send for publishers they have nothing saved
+        for); then the publisher's profile is used, as without selectors.
+        
+        Args:
+            hostname (str): The page's hostname
+            selectors (dict): Request-supplied selector strings per field, if any
+            
+        Returns:
+            ExtractionProfile: The profile
+        """
+        if selectors and _selector_lists(selectors) != _selector_lists(DEFAULT_SELECTORS):
+            return self.for_selectors(selectors)
+        return self.for_host(hostname)
+    
+    def for_selectors(self, selectors):
+        """
+        Get a compiled profile for request-supplied selectors.
+        
+        Compiled profiles are cached, so a selector set is compiled only once.
+        The same selectors may come from any number of publishers, so these
+        profiles don't learn.
+        
+        Args:
+            selectors (dict): Selector strings per field
+            
+        Returns:
+            ExtractionProfile: The compiled profile
+        """
+        key = json.dumps(selectors, sort_keys=True)
+        with self._lock:
+            profile = self._adhoc.get(key)
+            if profile:
+                self._adhoc.move_to_end(key)
+                return profile
+        
+        profile = ExtractionProfile('custom', selectors, learn=False)
+        
+        with self._lock:
+            self._adhoc[key] = profile
+            while len(self._adhoc) > MAX_ADHOC_PROFILES:
+                self._adhoc.popitem(last=False)
+        
+        return profile
+
@@ -0,0 +1,478 @@
+import os
+import json
+import time
+import sqlite3
+import calendar
+import logging
+import threading
+from statistics import median
+from http_cache import CACHE_DIR
+from keyword_matcher import get_matcher
+from seen_index import SeenIndex
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Poll interval bounds and the interval for feeds we know nothing about yet, in seconds
+POLL_MIN_INTERVAL = float(os.environ.get('SCRAPER_POLL_MIN_INTERVAL', 120))
+POLL_MAX_INTERVAL = float(os.environ.get('SCRAPER_POLL_MAX_INTERVAL', 6 * 3600))
+POLL_DEFAULT_INTERVAL = float(os.environ.get('SCRAPER_POLL_DEFAULT_INTERVAL', 900))
+
+# Maximum number of queued items kept per subscriber; the oldest are dropped beyond it
+QUEUE_MAX_ITEMS = int(os.environ.get('SCRAPER_QUEUE_MAX_ITEMS', 1000))
+
+# Maximum number of items queued per subscriber from a feed's first poll, so new
+# feeds bring their latest stories rather than their whole backlog
+FIRST_POLL_MAX_ITEMS = int(os.environ.get('SCRAPER_POLL_FIRST_ITEMS', 5))
+
+# How long a claimed feed stays reserved for the process polling it
+POLL_LEASE = 300
+
+# Number of recent publish times kept per feed for learning its cadence
+CADENCE_SAMPLES = 20
+
+# Seen-index scope prefix of the poller itself; each feed's items are fetched once and fanned out
+POLLER_SCOPE = '__poller__'
+
+
+def next_interval(timestamps, current, found_new, failed=False,
+                  min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL):
+    """
+    Work out when to poll a feed next.
+    
+    A feed is polled about twice per typical gap between its stories (the median
+    gap between recent publish times). A poll that finds nothing new backs off
+    from the current interval, and failures back off faster.
+    
+    Args:
+        timestamps (list): Recent publish times (epoch seconds), oldest first
+        current (float): The current interval
+        found_new (bool): Whether the last poll found new items
+        failed (bool): Whether the last poll failed
+        min_interval (float): Lower bound
+        max_interval (float): Upper bound
+        
+    Returns:
+        float: The next interval in seconds
+    """
+    if failed:
+        interval = current * 2
+    elif found_new:
+        gaps = [later - earlier for earlier, later in zip(timestamps, timestamps[1:]) if later > earlier]
+        interval = median(gaps) / 2 if gaps else current / 2
+    else:
+        interval = current * 1.5
+    
+    return max(min_interval, min(max_interval, interval))
+
+
+def _item_timestamp(item):
+    try:
+        return calendar.timegm(time.strptime(item.get('date', ''), '%Y-%m-%d %H:%M:%S'))
+    except ValueError:
+        return None
+
+
+class FeedPoller:
+    """
+    Background poller that keeps subscribed feeds fresh and queues their new items.
+    
+    Every feed URL is polled once no matter how many subscribers share it, at an
+    interval learned from the feed's own publish cadence. New items are filtered
+    per subscriber and queued until the subscriber drains them. Subscribers share
+    the scraper's seen-item index (scoped by subscriber), so a story carried by
+    several feeds is queued once, and never again through only_new requests
+    made with the same scope.
+    
+    State lives in SQLite, so several API processes can share one poller
+    database: due feeds are claimed with a lease, and only the process holding
+    it polls the feed. The API workers only subscribe and drain; polling runs
+    in one process started with `python feed_poller.py` (or in the development
+    server with SCRAPER_POLLER=on).
+    """
+    
+    def __init__(self, rss_scraper, path=None, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                 default_interval=POLL_DEFAULT_INTERVAL, queue_max=QUEUE_MAX_ITEMS,
+                 first_poll_max=FIRST_POLL_MAX_ITEMS):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'poller.db')
+        
+        self.rss_scraper = rss_scraper
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.queue_max = queue_max
+        self.first_poll_max = first_poll_max
+        
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS subscriptions ('
+            'subscriber TEXT, feed_url TEXT, options TEXT, PRIMARY KEY (subscriber, feed_url))'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS feeds ('
+            'feed_url TEXT PRIMARY KEY, next_poll REAL, interval REAL, last_poll REAL, '
+            'last_new REAL, timestamps TEXT, polls INTEGER DEFAULT 0, fetched_items INTEGER DEFAULT 0, last_error TEXT, '
+            'mark TEXT)'
+        )
+        self._add_column('feeds', 'mark', 'TEXT')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS queue ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, subscriber TEXT, feed_url TEXT, item TEXT, queued REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS queue_subscriber ON queue (subscriber, id)')
+    
+    def _add_column(self, table, column, definition):
+        """Add a column that databases created by earlier versions lack."""
+        columns = [row[1] for row in self._conn.execute(f'PRAGMA table_info({table})')]
+        if column not in columns:
+            self._conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    def subscribe(self, subscriber, feeds):
+        """
+        Set a subscriber's feeds, replacing its previous subscriptions.
+        
+        A feed nobody subscribed to before is polled right away, but its first
+        poll queues at most `first_poll_max` items per subscriber. A feed that is
+        already polled only brings items published after the subscriber joined.
+        
+        Args:
+            subscriber (str): The subscriber, e.g. the site URL
+            feeds (list): Dicts with 'feed_url' and optional 'limit' (items queued per poll),
+                'keywords', 'exclude_keywords' and 'whole_word'
+            
+        Returns:
+            int: The number of subscribed feeds
+        """
+        rows = {}
+        for feed in feeds:
+            feed_url = feed.get('feed_url')
+            if not feed_url:
+                raise ValueError('Feed URL is required')
+            options = {key: feed[key] for key in ('limit', 'keywords', 'exclude_keywords', 'whole_word') if key in feed}
+            rows[feed_url] = json.dumps(options)
+        
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('DELETE FROM subscriptions WHERE subscriber = ?', (subscriber,))
+                self._conn.executemany(
+                    'INSERT INTO subscriptions (subscriber, feed_url, options) VALUES (?, ?, ?)',
+                    [(subscriber, feed_url, options) for feed_url, options in rows.items()]
+                )
+                # New feeds are due right away
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO feeds (feed_url, next_poll, interval, timestamps) VALUES (?, ?, ?, ?)',
+                    [(feed_url, now, self.default_interval, '[]') for feed_url in rows]
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        
+        self._wake.set()
+        return len(rows)
+    
+    def drain(self, subscriber, max_items=100):
+        """
+        Take queued items off a subscriber's queue.
+        
+        Args:
+            subscriber (str): The subscriber
+            max_items (int): Maximum number of items to return
+            
+        Returns:
+            list: Dicts with 'feed_url', 'queued' and 'item', oldest first
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute(
+                    'SELECT id, feed_url, item, queued FROM queue WHERE subscriber = ? ORDER BY id LIMIT ?',
+                    (subscriber, int(max_items))
+                ).fetchall()
+                if rows:
+                    self._conn.execute(
+                        'DELETE FROM queue WHERE subscriber = ? AND id <= ?', (subscriber, rows[-1][0])
+                    )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        
+        return [{'feed_url': feed_url, 'queued': queued, 'item': json.loads(item)} for _, feed_url, item, queued in rows]
+    
+    def status(self):
+        """
+        Report the poll schedule and queue sizes.
+        
+        Returns:
+            dict: Per-feed schedule and statistics, and queued items per subscriber
+        """
+        with self._lock:
+            feeds = self._conn.execute(
+                'SELECT f.feed_url, f.next_poll, f.interval, f.last_poll, f.last_new, f.polls, f.fetched_items, '
+                'f.last_error, COUNT(s.subscriber) FROM feeds f JOIN subscriptions s ON s.feed_url = f.feed_url '
+                'GROUP BY f.feed_url ORDER BY f.next_poll'
+            ).fetchall()
+            queues = self._conn.execute('SELECT subscriber, COUNT(*) FROM queue GROUP BY subscriber').fetchall()
+        
+        return {
+            'running': self.running,
+            'feeds': [
+                {
+                    'feed_url': row[0],
+                    'next_poll': row[1],
+                    'interval': round(row[2], 1),
+                    'last_poll': row[3],
+                    'last_new': row[4],
+                    'polls': row[5],
+                    'fetched_items': row[6],
+                    'last_error': row[7],
+                    'subscribers': row[8]
+                }
+                for row in feeds
+            ],
+            'queued': dict(queues)
+        }
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """Start polling in a daemon thread."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self.run, name='feed-poller', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Stop the polling thread."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def run(self):
+        """Poll due feeds until stop() is called."""
+        while not self._stopping.is_set():
+            try:
+                self.poll_due()
+            except Exception as e:
+                logger.exception(f"Feed poller iteration failed: {str(e)}")
+            
+            self._wake.clear()
+            self._wake.wait(self._seconds_until_next_poll())
+    
+    def _seconds_until_next_poll(self):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT MIN(next_poll) FROM feeds WHERE feed_url IN (SELECT feed_url FROM subscriptions)'
+            ).fetchone()
+        if not row or row[0] is None:
+            return self.max_interval
+        return max(1.0, min(self.max_interval, row[0] - time.time()))
+    
+    def poll_due(self):
+        """
+        Poll every subscribed feed that is due, concurrently.
+        
+        Returns:
+            int: The number of feeds polled
+        """
+        marks = self._claim_due()
+        if not marks:
+            return 0
+        
+        logger.debug(f"Polling {len(marks)} due feeds")
+        # Items are recorded as fetched, and the feed's mark moves, only once they're queued
+        # (see _enqueue). An empty 'since' keeps scrape_feed from using a mark of its own
+        results = self.rss_scraper.scrape_feeds([
+            {
+                'feed_url': feed_url,
+                'limit': self.rss_scraper.max_scan,
+                'only_new': True,
+                'record_seen': False,
+                'incremental': True,
+                'since': mark or '',
+                'resolve_links': True,
+                'seen_scope': f'{POLLER_SCOPE}|{feed_url}'
+            }
+            for feed_url, mark in marks.items()
+        ])
+        
+        for feed_url, mark in marks.items():
+            result = results.get(feed_url, {'error': 'No result'})
+            error = result.get('error')
+            items = [] if error else result.get('items', [])
+            if not error:
+                self._enqueue(feed_url, items, result.get('mark'), first_poll=mark is None)
+                self.rss_scraper.confirm_seen(
+                    [link for item in items for link in (item.get('link'), item.get('canonical_link'))],
+                    f'{POLLER_SCOPE}|{feed_url}'
+                )
+            self._reschedule(feed_url, items, error)
+        
+        return len(marks)
+    
+    def _claim_due(self):
+        """
+        Reserve the due feeds for this process, so no other process polls them meanwhile.
+        
+        Returns:
+            dict: The high-water mark of each due feed, None if it was never polled
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                marks = {feed_url: json.loads(mark) if mark else None for feed_url, mark in self._conn.execute(
+                    'SELECT feed_url, mark FROM feeds WHERE next_poll <= ? '
+                    'AND feed_url IN (SELECT feed_url FROM subscriptions) ORDER BY next_poll',
+                    (now,)
+                ).fetchall()}
+                self._conn.executemany(
+                    'UPDATE feeds SET next_poll = ? WHERE feed_url = ?',
+                    [(now + POLL_LEASE, feed_url) for feed_url in marks]
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return marks
+    
+    def _enqueue(self, feed_url, items, mark=None, first_poll=False):
+        """
+        Queue new items for every subscriber of a feed, applying each one's filters and limit.
+        
+        The queue rows and the feed's new high-water mark are committed together,
+        and the items are recorded as seen (per subscriber) only after that, so a
+        failed insert or a crash in between can't lose them.
+        
+        Args:
+            feed_url (str): The polled feed
+            items (list): The feed's new items, newest first
+            mark (dict): The feed's new high-water mark
+            first_poll (bool): Whether this is the feed's first poll; subscribers then
+                get at most `first_poll_max` items
+            
+        Returns:
+            int: The number of queued items
+        """
+        with self._lock:
+            subscriptions = self._conn.execute(
+                'SELECT subscriber, options FROM subscriptions WHERE feed_url = ?', (feed_url,)
+            ).fetchall()
+        
+        seen = self.rss_scraper.seen
+        now = time.time()
+        queued = []
+        for subscriber, options in subscriptions:
+            options = json.loads(options)
+            matcher = get_matcher(options.get('keywords'), options.get('exclude_keywords'),
+                                  options.get('whole_word', True))
+            
+            # Filter, skip what the subscriber already got from another feed, then keep up to the limit
+            matching = [
+                (item, SeenIndex.item_keys(item.get('canonical_link') or item.get('link'), scope=subscriber))
+                for item in items
+                if matcher.match(item.get('title'), item.get('description'))[0]
+            ]
+            was_seen = seen.contains_many([keys for _, keys in matching])
+            matching = [entry for entry, skip in zip(matching, was_seen) if not skip]
+            
+            limit = int(options['limit']) if options.get('limit') else None
+            if first_poll:
+                limit = min(limit, self.first_poll_max) if limit else self.first_poll_max
+            if limit:
+                matching = matching[:limit]
+            
+            queued.extend((subscriber, item, keys) for item, keys in matching)
+        
+        ids = []
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                for subscriber, item, _ in queued:
+                    ids.append(self._conn.execute(
+                        'INSERT INTO queue (subscriber, feed_url, item, queued) VALUES (?, ?, ?, ?)',
+                        (subscriber, feed_url, json.dumps(item), now)
+                    ).lastrowid)
+                # Keep each queue bounded, dropping the oldest items
+                for subscriber in {row[0] for row in queued}:
+                    self._conn.execute(
+                        'DELETE FROM queue WHERE subscriber = ? AND id NOT IN '
+                        '(SELECT id FROM queue WHERE subscriber = ? ORDER BY id DESC LIMIT ?)',
+                        (subscriber, subscriber, self.queue_max)
+                    )
+                if mark:
+                    self._conn.execute('UPDATE feeds SET mark = ? WHERE feed_url = ?', (json.dumps(mark), feed_url))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        
+        if not queued:
+            return 0
+        
+        # An only_new request with the subscriber's scope may have taken an item meanwhile: unqueue it
+        claimed = seen.claim([keys for _, _, keys in queued])
+        taken = [row_id for row_id, new in zip(ids, claimed) if not new]
+        if taken:
+            with self._lock:
+                self._conn.execute(f'DELETE FROM queue WHERE id IN ({",".join("?" * len(taken))})', taken)
+        
+        return len(queued) - len(taken)
+    
+    def _reschedule(self, feed_url, items, error=None):
+        """Learn from a poll's result and schedule the feed's next poll."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT interval, timestamps FROM feeds WHERE feed_url = ?', (feed_url,)
+            ).fetchone()
+            if not row:
+                return
+            
+            timestamps = json.loads(row[1] or '[]')
+            timestamps.extend(ts for ts in (_item_timestamp(item) for item in items) if ts is not None)
+            timestamps = sorted(set(timestamps))[-CADENCE_SAMPLES:]
+            
+            interval = next_interval(timestamps, row[0] or self.default_interval, bool(items), bool(error),
+                                     self.min_interval, self.max_interval)
+            
+            self._conn.execute(
+                'UPDATE feeds SET next_poll = ?, interval = ?, last_poll = ?, timestamps = ?, last_error = ?, '
+                'polls = polls + 1, fetched_items = fetched_items + ?, '
+                'last_new = CASE WHEN ? > 0 THEN ? ELSE last_new END WHERE feed_url = ?',
+                (now + interval, interval, now, json.dumps(timestamps), error, len(items),
+                 len(items), now, feed_url)
+            )
+        
+        if error:
+            logger.warning(f"Polling {feed_url} failed, retrying in {interval:.0f}s: {error}")
+        else:
+            logger.debug(f"Polled {feed_url}: {len(items)} new items, next poll in {interval:.0f}s")
+
+
+if __name__ == '__main__':
+    # Run the poller as its own process, next to the API workers sharing its database
+    from scraper import RssScraper
+    
+    poller = FeedPoller(RssScraper())
+    logger.info(f"Polling subscribed feeds from {poller.path}")
+    try:
+        poller.run()
+    except KeyboardInterrupt:
+        poller.stop()
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Directory for on-disk caches, overridable through the environment
+CACHE_DIR = os.environ.get('SCRAPER_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+
+# Entries not refreshed within this many seconds are pruned (default: 7 days)
+VALIDATOR_MAX_AGE = int(os.environ.get('SCRAPER_VALIDATOR_MAX_AGE', 7 * 24 * 3600))
+
+# How often a running process prunes the store, in seconds (default: hourly)
+VALIDATOR_PRUNE_INTERVAL = int(os.environ.get('SCRAPER_VALIDATOR_PRUNE_INTERVAL', 3600))
+
+
+class ValidatorStore:
+    """
+    Persistent store of HTTP validators (ETag / Last-Modified) per URL.
+
+    Alongside the validators it keeps the result that was extracted from the
+    response, so a 304 Not Modified can be answered without re-parsing.
+    """
+
+    def __init__(self, path=None, max_age=VALIDATOR_MAX_AGE, prune_interval=VALIDATOR_PRUNE_INTERVAL):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'validators.db')
+
+        self.path = path
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self._next_prune = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS validators ('
+            'key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, result TEXT, updated REAL)'
+        )
+        self._conn.commit()
+        self.prune()
+
+    @staticmethod
+    def make_key(url, *params):
+        """
+        Build a store key for a URL and the parameters that shape its result.
+
+        Args:
+            url (str): The fetched URL
+            *params: Extraction parameters (must be JSON serializable)
+
+        Returns:
+            str: The store key
+        """
+        if not params:
+            return url
+        return url + '|' + json.dumps(params, sort_keys=True, default=str)
+
+    def get(self, key):
+        """
+        Look up the validators and cached result for a key.
+
+        Args:
+            key (str): The store key
+
+        Returns:
+            dict: The entry ('etag', 'last_modified', 'result') or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, result FROM validators WHERE key = ?', (key,)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        try:
+            result = json.loads(row[2])
+        except (TypeError, ValueError):
+            return None
+
+        return {'etag': row[0], 'last_modified': row[1], 'result': result}
+
+    def put(self, key, response, result):
+        """
+        Remember the validators of a response and the result extracted from it.
+
+        Nothing is stored when the response carries no validators. Stale entries
+        are pruned along the way, at most once per prune_interval.
+
+        Args:
+            key (str): The store key
+            response (requests.Response): The 200 response
+            result (dict): The extracted result
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO validators (key, etag, last_modified, result, updated) VALUES (?, ?, ?, ?, ?)',
+                (key, etag, last_modified, json.dumps(result), time.time())
+            )
+            self._conn.commit()
+
+        if time.time() >= self._next_prune:
+            self.prune()
+
+    def touch(self, key):
+        """Mark an entry as still valid after a 304 response."""
+        with self._lock:
+            self._conn.execute('UPDATE validators SET updated = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+    def prune(self):
+        """Drop entries that have not been refreshed within max_age."""
+        with self._lock:
+            self._next_prune = time.time() + self.prune_interval
+            self._conn.execute('DELETE FROM validators WHERE updated < ?', (time.time() - self.max_age,))
+            self._conn.commit()
+
+
+def conditional_headers(entry):
+    """
+    Build conditional request headers from a stored entry.
+
+    Args:
+        entry (dict): The entry returned by ValidatorStore.get, or None
+
+    Returns:
+        dict: If-None-Match / If-Modified-Since headers
+    """
+    headers = {}
+    if not entry:
+        return headers
+
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    return headers
@@ -0,0 +1,172 @@
+import re
+import html
+import logging
+import unicodedata
+from functools import lru_cache
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Characters that continue a word. Python's \w misses combining marks, so Devanagari
+# vowel signs and viramas (and the other Indic blocks, minus the danda punctuation)
+# are added to keep "भारत" from matching inside "भारतीय".
+WORD_CHARS = r'\w\u0300-\u036f\u0900-\u0963\u0966-\u0dff\u200c\u200d'
+
+TAG_RE = re.compile(r'<[^>]+>')
+
+# Maximum number of compiled keyword sets kept
+MAX_MATCHERS = 128
+
+
+def fold(text):
+    """
+    Normalize text for case-insensitive comparison (NFC, then Unicode case folding).
+
+    Args:
+        text (str): The text
+
+    Returns:
+        str: The folded text
+    """
+    return unicodedata.normalize('NFC', text).casefold()
+
+
+def parse_keywords(value):
+    """
+    Split a comma-separated keyword string (or list) into unique keywords.
+
+    Args:
+        value (str|list): The keywords
+
+    Returns:
+        tuple: The keywords, in their original spelling and order
+    """
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(',')
+
+    keywords = []
+    seen = set()
+    for keyword in value:
+        keyword = ' '.join(str(keyword).split())
+        if keyword and fold(keyword) not in seen:
+            seen.add(fold(keyword))
+            keywords.append(keyword)
+
+    return tuple(keywords)
+
+
+def _trie_pattern(words):
+    """Build a regex alternation of the words, sharing common prefixes."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [
+        (r'\s+' if char == ' ' else re.escape(char)) + _node_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+
+    pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # A keyword ends here: the longer keywords are optional (and tried first)
+        return f'(?:{pattern})?' if len(branches) == 1 else pattern + '?'
+    return pattern
+
+
+class KeywordMatcher:
+    """
+    Matches many keywords against text in a single regex pass.
+
+    Include and exclude keywords are compiled into one prefix-sharing regex over
+    case-folded text, so the cost grows with the text rather than with the
+    number of keywords. Where keywords overlap, the longest match wins.
+    """
+
+    def __init__(self, keywords=(), exclude=(), whole_word=True):
+        self.keywords = parse_keywords(keywords)
+        self.exclude = parse_keywords(exclude)
+        self.whole_word = whole_word
+
+        # Folded spelling -> (original keyword, is_exclude); excludes win over includes
+        self._lookup = {fold(keyword): (keyword, False) for keyword in self.keywords}
+        self._lookup.update({fold(keyword): (keyword, True) for keyword in self.exclude})
+
+        self._regex = None
+        if self._lookup:
+            pattern = _trie_pattern(self._lookup)
+            if whole_word:
+                pattern = f'(?<![{WORD_CHARS}])(?:{pattern})(?![{WORD_CHARS}])'
+            self._regex = re.compile(pattern)
+
+    def scan(self, *texts):
+        """
+        Find the keywords that occur in the texts.
+
+        Args:
+            *texts (str): Plain text or HTML (tags are ignored)
+
+        Returns:
+            tuple: (matched include keywords, matched exclude keywords), as sets
+        """
+        included = set()
+        excluded = set()
+        if self._regex is None:
+            return included, excluded
+
+        text = fold(' \n '.join(html.unescape(TAG_RE.sub(' ', text or '')) for text in texts))
+        for found in self._regex.findall(text):
+            keyword, is_exclude = self._lookup[' '.join(found.split())]
+            (excluded if is_exclude else included).add(keyword)
+
+        return included, excluded
+
+    def match(self, *texts):
+        """
+        Decide whether the texts pass the filter.
+
+        Text passes when no exclude keyword occurs and, if include keywords are
+        set, at least one of them does.
+
+        Args:
+            *texts (str): Plain text or HTML
+
+        Returns:
+            tuple: (passed, matched include keywords, matched exclude keywords)
+        """
+        included, excluded = self.scan(*texts)
+        passed = not excluded and (bool(included) or not self.keywords)
+        return passed, included, excluded
+
+
+def get_matcher(keywords, exclude=None, whole_word=True):
+    """
+    Get a compiled matcher for a keyword set.
+
+    Matchers are cached, so a keyword set is compiled only once.
+
+    Args:
+        keywords (str|list): Include keywords (comma-separated string or list)
+        exclude (str|list): Exclude keywords
+        whole_word (bool): Match whole words only
+
+    Returns:
+        KeywordMatcher: The matcher
+    """
+    return _compiled_matcher(parse_keywords(keywords), parse_keywords(exclude), bool(whole_word))
+
+
+@lru_cache(maxsize=MAX_MATCHERS)
+def _compiled_matcher(keywords, exclude, whole_word):
+    logger.debug(f"Compiling matcher for {len(keywords)} keywords and {len(exclude)} exclusions")
+    return KeywordMatcher(keywords, exclude, whole_word)
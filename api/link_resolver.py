@@ -0,0 +1,171 @@
+import os
+import time
+import logging
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+import requests
+from result_cache import create_cache
+from url_utils import canonicalize_url
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Resolved links cache: backend ('disk', 'memory' or 'off'), lifetime and size
+LINK_CACHE = os.environ.get('SCRAPER_LINK_CACHE', 'disk')
+LINK_CACHE_TTL = float(os.environ.get('SCRAPER_LINK_CACHE_TTL', 7 * 24 * 3600))
+LINK_CACHE_SIZE = int(os.environ.get('SCRAPER_LINK_CACHE_SIZE', 50000))
+
+# Maximum redirect hops followed, and total time spent resolving one link (seconds)
+MAX_REDIRECTS = int(os.environ.get('SCRAPER_MAX_REDIRECTS', 10))
+RESOLVE_TIMEOUT = float(os.environ.get('SCRAPER_RESOLVE_TIMEOUT', 10))
+
+# Maximum number of links resolved at once, when no fetch limiter caps it
+RESOLVE_WORKERS = int(os.environ.get('SCRAPER_RESOLVE_WORKERS', 16))
+
+# HEAD responses that mean "ask again with GET" rather than "this is the page"
+HEAD_UNSUPPORTED = {400, 403, 404, 405, 406, 429, 501}
+
+
+class LinkResolver:
+    """
+    Resolves aggregator and shortener links to the publisher's canonical URL.
+    
+    Redirects are followed hop by hop with HEAD requests (falling back to a
+    one-byte ranged GET for servers that reject HEAD), and every hop is cached
+    with the final URL, so a link is resolved over the network only once per
+    cache lifetime. Only HTTP redirects are followed; links that forward with
+    JavaScript resolve to themselves.
+    
+    With a fetch limiter, requests take the limiter's host slots (waiting no
+    longer than the time left for the link), and no more links are resolved
+    at once than the limiter lets through.
+    """
+    
+    def __init__(self, session=None, limiter=None, cache=None, max_redirects=MAX_REDIRECTS,
+                 timeout=RESOLVE_TIMEOUT, max_workers=None):
+        self.session = session if session is not None else requests.Session()
+        self.limiter = limiter
+        if cache is None:
+            cache = create_cache(LINK_CACHE, 'links', LINK_CACHE_TTL, LINK_CACHE_SIZE)
+        self.cache = cache
+        self.max_redirects = max_redirects
+        self.timeout = timeout
+        if max_workers is None:
+            max_workers = limiter.max_concurrency if limiter is not None else RESOLVE_WORKERS
+        self.max_workers = max_workers
+    
+    def resolve(self, url, timeout=None):
+        """
+        Resolve a link to its canonical URL.
+        
+        Args:
+            url (str): The link
+            timeout (float): Maximum time for this link in seconds, capped by the
+                resolver's own timeout
+            
+        Returns:
+            str: The canonical URL (the canonicalized link itself if it doesn't
+                redirect or can't be resolved)
+        """
+        if not url or urlsplit(url).scheme.lower() not in ('http', 'https'):
+            return url
+        
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+        
+        try:
+            hops = self._follow(url, timeout)
+        except Exception as e:
+            # Network errors, redirect loops, or no fetch slot in time
+            logger.debug(f"Could not resolve {url}: {str(e)}")
+            return canonicalize_url(url)
+        
+        canonical = canonicalize_url(hops[-1])
+        if self.cache is not None:
+            for hop in hops:
+                self.cache.set(hop, canonical)
+        return canonical
+    
+    def resolve_many(self, urls, timeout=None):
+        """
+        Resolve several links concurrently.
+        
+        Args:
+            urls (list): The links (duplicates are resolved once)
+            timeout (float): Maximum time for all of them in seconds; links not
+                resolved by then map to their canonicalized selves
+            
+        Returns:
+            dict: Canonical URL by link
+        """
+        unique = list(dict.fromkeys(url for url in urls if url))
+        if not unique:
+            return {}
+        
+        ends = time.monotonic() + timeout if timeout is not None else None
+        
+        def resolve(url):
+            if ends is None:
+                return self.resolve(url)
+            remaining = ends - time.monotonic()
+            if remaining <= 0:
+                return canonicalize_url(url)
+            return self.resolve(url, remaining)
+        
+        workers = max(1, min(len(unique), self.max_workers))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(unique, executor.map(resolve, unique)))
+    
+    def _follow(self, url, timeout=None):
+        """
+        Follow a link's redirects.
+        
+        Args:
+            url (str): The link
+            timeout (float): Maximum time in seconds, capped by the resolver's own timeout
+            
+        Returns:
+            list: Every URL visited, ending with the final one
+        """
+        timeout = min(self.timeout, timeout) if timeout is not None else self.timeout
+        deadline = time.monotonic() + timeout
+        hops = [url]
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ValueError(f"Resolving took longer than {round(timeout, 1)} seconds")
+            
+            location = self._location(hops[-1], remaining)
+            if not location:
+                return hops
+            
+            target = urljoin(hops[-1], location)
+            if target in hops:
+                raise ValueError("Redirect loop")
+            if len(hops) > self.max_redirects:
+                raise ValueError(f"More than {self.max_redirects} redirects")
+            hops.append(target)
+    
+    def _location(self, url, timeout):
+        """Request a URL without following redirects and return its redirect target, if any."""
+        started = time.monotonic()
+        with self.limiter.slot(url, timeout) if self.limiter is not None else nullcontext():
+            # The wait for the slot counts against the timeout
+            timeout = max(0.001, timeout - (time.monotonic() - started))
+            response = self.session.head(url, allow_redirects=False, timeout=timeout)
+            response.close()
+            
+            if response.status_code in HEAD_UNSUPPORTED:
+                response = self.session.get(
+                    url, headers={'Range': 'bytes=0-0'}, allow_redirects=False, timeout=timeout, stream=True
+                )
+                response.close()
+        
+        if response.is_redirect:
+            return response.headers.get('Location')
+        return None
@@ -1,4 +1,6 @@
-from app import app
+from app import app, feed_poller, POLLER_ENABLED
 
 if __name__ == "__main__":
+    if POLLER_ENABLED:
+        feed_poller.start()
     app.run(host="0.0.0.0", port=5000, debug=True)
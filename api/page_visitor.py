@@ -0,0 +1,260 @@
+import re
+import logging
+from urllib.parse import urljoin
+from lxml import etree
+from lxml import html as lxml_html
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Registered embed detectors: (embed type, tags or None for any tag, detector function)
+EMBED_DETECTORS = []
+
+# Attributes that lazy-loading scripts use instead of src / srcset
+LAZY_SRC_ATTRIBUTES = ('data-src', 'data-lazy-src', 'data-original')
+LAZY_SRCSET_ATTRIBUTES = ('srcset', 'data-srcset', 'data-lazy-srcset')
+
+PLACEHOLDER_SUFFIXES = ('placeholder.jpg', 'placeholder.png')
+
+SRCSET_DESCRIPTOR_RE = re.compile(r'^(\d+(?:\.\d+)?)[wx]$')
+
+
+def register_embed_detector(embed_type, tags=None):
+    """
+    Register a function that recognises an embed.
+
+    The function receives an element and returns True if the element is the root
+    of an embed of the given type. Restricting it to a set of tags keeps it off
+    the hot path for every other element.
+
+    Args:
+        embed_type (str): The embed type reported in results (e.g. 'twitter')
+        tags (iterable): Tag names the detector applies to, or None for all tags
+
+    Returns:
+        callable: Decorator that registers the function
+    """
+    def decorator(func):
+        EMBED_DETECTORS.append((embed_type, frozenset(tags) if tags else None, func))
+        return func
+    return decorator
+
+
+def _has_class(element, name):
+    return name in (element.get('class') or '').split()
+
+
+@register_embed_detector('twitter')
+def _detect_twitter(element):
+    return _has_class(element, 'twitter-tweet') or element.get('data-tweet-id') is not None
+
+
+@register_embed_detector('instagram')
+def _detect_instagram(element):
+    return _has_class(element, 'instagram-media') or element.get('data-instgrm-permalink') is not None
+
+
+@register_embed_detector('youtube', tags=('iframe',))
+def _detect_youtube(element):
+    src = element.get('src') or ''
+    return 'youtube.com' in src or 'youtu.be' in src
+
+
+@register_embed_detector('facebook')
+def _detect_facebook(element):
+    if element.tag == 'iframe':
+        return 'facebook.com/plugins' in (element.get('src') or '')
+    return _has_class(element, 'fb-post') or _has_class(element, 'fb-video')
+
+
+@register_embed_detector('tiktok', tags=('blockquote',))
+def _detect_tiktok(element):
+    return _has_class(element, 'tiktok-embed')
+
+
+def parse_srcset(srcset):
+    """
+    Parse a srcset attribute into candidate URLs, largest first.
+
+    Args:
+        srcset (str): The srcset value
+
+    Returns:
+        list: Candidate URLs ordered by descending width/density
+    """
+    candidates = []
+    for part in (srcset or '').split(','):
+        fields = part.strip().split()
+        if not fields:
+            continue
+        size = 0.0
+        if len(fields) > 1:
+            match = SRCSET_DESCRIPTOR_RE.match(fields[1])
+            if match:
+                size = float(match.group(1))
+        candidates.append((size, fields[0]))
+
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+    return [url for _, url in candidates]
+
+
+class PageVisitor:
+    """
+    Collects images, figure captions and social embeds in a single traversal.
+
+    The tree is walked once with start/end events, which keeps track of the
+    enclosing <figure>, <picture>, image container and embed without any
+    per-image lookups.
+    """
+
+    def __init__(self, base_url, collect_images=True, collect_embeds=True, image_containers=None):
+        """
+        Args:
+            base_url (str): The base URL for resolving relative URLs
+            collect_images (bool): Whether to collect images
+            collect_embeds (bool): Whether to collect social media embeds
+            image_containers (list): Elements to limit image collection to, or None for the whole page
+        """
+        self.base_url = base_url
+        self.collect_images = collect_images
+        self.collect_embeds = collect_embeds
+        self.image_containers = set(image_containers) if image_containers is not None else None
+
+        # Index detectors by tag so each element only runs the relevant ones
+        self._any_tag_detectors = []
+        self._tag_detectors = {}
+        for embed_type, tags, detector in EMBED_DETECTORS:
+            if tags is None:
+                self._any_tag_detectors.append((embed_type, detector))
+            else:
+                for tag in tags:
+                    self._tag_detectors.setdefault(tag, []).append((embed_type, detector))
+
+    def visit(self, tree):
+        """
+        Walk the document once.
+
+        Args:
+            tree (lxml.html.HtmlElement): The parsed document
+
+        Returns:
+            tuple: (images, embeds) lists
+        """
+        images = []
+        embeds = []
+
+        containers = self.image_containers
+        inside_container = 1 if containers is None else 0
+        figures = []   # stack of {'images': [...], 'caption': str}
+        pictures = []  # stack of source URL lists
+        open_embed = None
+
+        for event, element in etree.iterwalk(tree, events=('start', 'end')):
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue
+
+            if event == 'start':
+                if containers is not None and element in containers:
+                    inside_container += 1
+
+                # Embeds: only the outermost matching element is reported
+                if self.collect_embeds and open_embed is None:
+                    embed_type = self._detect_embed(element, tag)
+                    if embed_type:
+                        open_embed = element
+                        embeds.append({
+                            'type': embed_type,
+                            'html': lxml_html.tostring(element, encoding='unicode', with_tail=False)
+                        })
+
+                if not self.collect_images:
+                    continue
+
+                if tag == 'figure':
+                    figures.append({'images': [], 'caption': ''})
+                elif tag == 'figcaption':
+                    if figures and not figures[-1]['caption']:
+                        figures[-1]['caption'] = element.text_content().strip()
+                elif tag == 'picture':
+                    pictures.append([])
+                elif tag == 'source':
+                    if pictures:
+                        pictures[-1].extend(parse_srcset(element.get('srcset') or element.get('data-srcset')))
+                elif tag == 'img' and inside_container:
+                    image = self._build_image(element, pictures[-1] if pictures else [])
+                    if image:
+                        images.append(image)
+                        if figures:
+                            figures[-1]['images'].append(image)
+
+            else:
+                if containers is not None and element in containers:
+                    inside_container -= 1
+
+                if element is open_embed:
+                    open_embed = None
+
+                if tag == 'figure' and figures:
+                    figure = figures.pop()
+                    for image in figure['images']:
+                        image['caption'] = figure['caption']
+                elif tag == 'picture' and pictures:
+                    pictures.pop()
+
+        return images, embeds
+
+    def _detect_embed(self, element, tag):
+        for embed_type, detector in self._tag_detectors.get(tag, ()):
+            if detector(element):
+                return embed_type
+        for embed_type, detector in self._any_tag_detectors:
+            if detector(element):
+                return embed_type
+        return None
+
+    def _build_image(self, img, picture_sources):
+        """
+        Build the image entry for an <img> element.
+
+        Args:
+            img (lxml.html.HtmlElement): The image element
+            picture_sources (list): Candidate URLs from an enclosing <picture>
+
+        Returns:
+            dict: Image information (url, alt text, caption, sources), or None
+        """
+        src = img.get('src')
+        lazy_src = next((img.get(attribute) for attribute in LAZY_SRC_ATTRIBUTES if img.get(attribute)), None)
+
+        srcset = []
+        for attribute in LAZY_SRCSET_ATTRIBUTES:
+            srcset.extend(parse_srcset(img.get(attribute)))
+
+        # src is a placeholder when it's missing, a known placeholder file or an inline stub
+        # that a lazy-loading script will replace
+        is_placeholder = (
+            not src
+            or src.endswith(PLACEHOLDER_SUFFIXES)
+            or (src.startswith('data:') and (lazy_src or srcset or picture_sources))
+        )
+
+        candidates = ([] if is_placeholder else [src]) + ([lazy_src] if lazy_src else []) + srcset + picture_sources
+        if not candidates:
+            return None
+
+        sources = []
+        for candidate in candidates:
+            # Make relative URLs absolute
+            if not candidate.startswith(('http://', 'https://', 'data:')):
+                candidate = urljoin(self.base_url, candidate)
+            if candidate not in sources:
+                sources.append(candidate)
+
+        return {
+            'url': sources[0],
+            'alt': img.get('alt', ''),
+            'caption': '',
+            'sources': sources
+        }
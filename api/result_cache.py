@@ -0,0 +1,231 @@
+import os
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from http_cache import CACHE_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Per-request cache modes
+CACHE_USE = 'use'          # read and write the cache
+CACHE_BYPASS = 'bypass'    # neither read nor write
+CACHE_REFRESH = 'refresh'  # skip the read, store the fresh result
+CACHE_MODES = (CACHE_USE, CACHE_BYPASS, CACHE_REFRESH)
+
+
+def cache_mode(value):
+    """
+    Normalize a per-request cache control value.
+
+    Accepts the mode names, or a boolean where False means bypass.
+
+    Args:
+        value: The request value (None, bool or str)
+
+    Returns:
+        str: One of CACHE_MODES
+    """
+    if value is None or value is True:
+        return CACHE_USE
+    if value is False:
+        return CACHE_BYPASS
+
+    value = str(value).strip().lower()
+    if value not in CACHE_MODES:
+        raise ValueError(f"Unknown cache mode: {value}. Use one of: {', '.join(CACHE_MODES)}")
+    return value
+
+
+def make_key(*parts):
+    """
+    Build a cache key from JSON-serializable parts.
+
+    Returns:
+        str: A SHA-256 hex digest of the parts
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with per-entry TTL.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, ttl=600, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Look up a value.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            The cached value (a copy), or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value, evicting the least recently used entries beyond max_entries.
+
+        Args:
+            key (str): The cache key
+            value: The value (must be JSON-serializable for disk backends)
+            ttl (float): Time to live in seconds, the cache default if not given
+        """
+        expires = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._entries[key] = (expires, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """
+        Report cache usage.
+
+        Returns:
+            dict: Backend, size, limits and hit/miss/eviction counts
+        """
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class DiskCache(MemoryCache):
+    """
+    SQLite-backed LRU cache with per-entry TTL, shared by every process using the same file.
+    """
+
+    backend = 'disk'
+
+    def __init__(self, path, ttl=600, max_entries=1000):
+        super().__init__(ttl, max_entries)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, expires FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires = now + (ttl if ttl is not None else self.ttl)
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                (key, payload, expires, now)
+            )
+
+            # Drop expired entries first, then the least recently used ones over the limit
+            self._conn.execute('DELETE FROM entries WHERE expires < ?', (now,))
+            excess = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    'DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)',
+                    (excess,)
+                )
+                self.evictions += excess
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+
+def create_cache(backend, name, ttl, max_entries):
+    """
+    Create a cache for the configured backend.
+
+    Args:
+        backend (str): 'memory', 'disk', or 'off' / '' to disable caching
+        name (str): Cache name, used for the disk file name
+        ttl (float): Default time to live in seconds
+        max_entries (int): Maximum number of entries
+
+    Returns:
+        MemoryCache: The cache, or None when caching is disabled
+    """
+    backend = (backend or '').lower()
+    if backend in ('', 'off', 'none'):
+        return None
+    if backend == 'disk':
+        return DiskCache(os.path.join(CACHE_DIR, f'{name}.db'), ttl, max_entries)
+    if backend == 'memory':
+        return MemoryCache(ttl, max_entries)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -1,105 +1,266 @@
 import os
 import re
+import copy
+import html
+import codecs
+import socket
 import json
 import logging
 import trafilatura
-import feedparser
+import time
+import heapq
+import signal
+import calendar
+import threading
+import multiprocessing
 import requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from itertools import islice, count
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 from datetime import datetime
+from http_cache import ValidatorStore, conditional_headers
+from extraction_profiles import ProfileRegistry
+from page_visitor import PageVisitor
+from structured_data import extract_structured_data, text_to_html
+from feed_parser import iter_feed, normalize_entry, entry_timestamp, parse_date
+from sitemap_parser import iter_sitemap
+from keyword_matcher import get_matcher
+from seen_index import SeenIndex
+from link_resolver import LinkResolver
+from result_cache import create_cache, cache_mode, make_key, CACHE_USE, CACHE_BYPASS
+from url_utils import normalize_url, canonicalize_url
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Default concurrency limits, overridable through the environment
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get('SCRAPER_MAX_CONCURRENCY', 8))
+DEFAULT_PER_HOST = int(os.environ.get('SCRAPER_PER_HOST', 2))
+
+# Download limits for page fetches, overridable through the environment
+DEFAULT_MAX_BYTES = int(os.environ.get('SCRAPER_MAX_BYTES', 5 * 1024 * 1024))
+DEFAULT_FETCH_DEADLINE = float(os.environ.get('SCRAPER_FETCH_DEADLINE', 30))
+FETCH_TIMEOUT = (10, 30)  # connect, read (seconds)
+FETCH_CHUNK_SIZE = 16 * 1024
+
+# Download limits for feed fetches, overridable through the environment
+DEFAULT_FEED_MAX_BYTES = int(os.environ.get('SCRAPER_FEED_MAX_BYTES', 10 * 1024 * 1024))
+DEFAULT_FEED_TIMEOUT = float(os.environ.get('SCRAPER_FEED_TIMEOUT', 30))
+
+# Maximum number of feed entries looked at while filling a feed's limit
+DEFAULT_FEED_MAX_SCAN = int(os.environ.get('SCRAPER_FEED_MAX_SCAN', 500))
+
+# Sitemap limits: bytes per sitemap file, files per request and index nesting depth
+DEFAULT_SITEMAP_MAX_BYTES = int(os.environ.get('SCRAPER_SITEMAP_MAX_BYTES', 50 * 1024 * 1024))
+DEFAULT_SITEMAP_MAX_FILES = int(os.environ.get('SCRAPER_SITEMAP_MAX_FILES', 50))
+SITEMAP_MAX_DEPTH = 3
+SITEMAP_SEEN_BATCH = 500
+
+# Extraction execution mode ('thread' or 'process') and process pool limits
+DEFAULT_EXTRACT_MODE = os.environ.get('SCRAPER_EXTRACT_MODE', 'thread')
+DEFAULT_EXTRACT_WORKERS = int(os.environ.get('SCRAPER_EXTRACT_WORKERS', os.cpu_count() or 2))
+DEFAULT_EXTRACT_TIMEOUT = float(os.environ.get('SCRAPER_EXTRACT_TIMEOUT', 20))
+DEFAULT_MAX_RESULT_BYTES = int(os.environ.get('SCRAPER_MAX_RESULT_BYTES', 2 * 1024 * 1024))
+EXTRACT_GRACE_PERIOD = 5  # seconds
+
+# Extraction result cache ('memory', 'disk' or 'off'), overridable through the environment
+DEFAULT_RESULT_CACHE = os.environ.get('SCRAPER_RESULT_CACHE', 'memory')
+DEFAULT_RESULT_CACHE_TTL = float(os.environ.get('SCRAPER_RESULT_CACHE_TTL', 600))
+DEFAULT_RESULT_CACHE_SIZE = int(os.environ.get('SCRAPER_RESULT_CACHE_SIZE', 1000))
+
+# Minimum articleBody length (characters) for structured data to replace content extraction
+MIN_STRUCTURED_BODY = 500
+
+# Content types accepted as HTML pages
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Charset declarations in the Content-Type header and in <meta> tags
+HEADER_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+
+
+class FetchError(Exception):
+    """Raised when a page is rejected before or during download."""
+
+
+class ExtractionError(Exception):
+    """Raised when a page cannot be extracted within the configured limits."""
+
+
+class ExtractionTimeout(ExtractionError):
+    """Raised when extraction exceeds its time budget."""
+
+
+class HostLimiter:
+    """
+    Caps the number of concurrent fetches, both globally and per host.
+    """
+    
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, per_host=DEFAULT_PER_HOST):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self._global = threading.BoundedSemaphore(max_concurrency)
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._hosts.get(host)
+            if semaphore is None:
+                semaphore = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return semaphore
+    
+    @contextmanager
+    def slot(self, url, timeout=None):
+        """
+        Hold a fetch slot for the host of the given URL.
+        
+        The host slot is taken first so that a thread waiting on a busy host
+        does not occupy one of the global slots.
+        
+        Args:
+            url (str): The URL about to be fetched
+            timeout (float): Maximum time to wait for the slot, None to wait as long as it takes
+            
+        Raises:
+            FetchError: If no slot came free within the timeout
+        """
+        started = time.monotonic()
+        host = self._host_semaphore(url)
+        if not host.acquire(timeout=timeout):
+            raise FetchError(f"No fetch slot for {urlparse(url).netloc} within {round(timeout, 1)} seconds")
+        try:
+            remaining = None if timeout is None else max(0, timeout - (time.monotonic() - started))
+            if not self._global.acquire(timeout=remaining):
+                raise FetchError(f"No fetch slot within {round(timeout, 1)} seconds")
+            try:
+                yield
+            finally:
+                self._global.release()
+        finally:
+            host.release()
+
+
 class WebScraper:
     """
     Scraper for extracting content from web pages.
-    Uses trafilatura for main content extraction and BeautifulSoup for targeted extraction.
+    Uses trafilatura for main content extraction and lxml (CSS selectors) for targeted extraction.
     """
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, per_host=DEFAULT_PER_HOST, validator_store=None,
+                 profiles=None, max_bytes=DEFAULT_MAX_BYTES, fetch_deadline=DEFAULT_FETCH_DEADLINE,
+                 extract_mode=DEFAULT_EXTRACT_MODE, extract_workers=DEFAULT_EXTRACT_WORKERS,
+                 extract_timeout=DEFAULT_EXTRACT_TIMEOUT, max_result_bytes=DEFAULT_MAX_RESULT_BYTES,
+                 result_cache=None):
+        self.session = create_session(max_concurrency)
+        self.limiter = HostLimiter(max_concurrency, per_host)
+        self.validators = validator_store if validator_store is not None else ValidatorStore()
+        self.profiles = profiles if profiles is not None else ProfileRegistry.from_file()
+        self.max_bytes = max_bytes
+        self.fetch_deadline = fetch_deadline
+        
+        # Parsing and extraction run on the request thread, or in a process pool
+        # so that CPU-bound trafilatura work doesn't hold this process's GIL
+        self.extract_mode = extract_mode
+        self.extract_workers = extract_workers
+        self.extract_timeout = extract_timeout
+        self.max_result_bytes = max_result_bytes
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        
+        # Extracted results, keyed by normalized URL, selectors and flags
+        if result_cache is None:
+            result_cache = create_cache(DEFAULT_RESULT_CACHE, 'scrape_results',
+                                        DEFAULT_RESULT_CACHE_TTL, DEFAULT_RESULT_CACHE_SIZE)
+        self.result_cache = result_cache
+    
+    def scrape_batch(self, items, max_workers=None):
+        """
+        Scrape several URLs concurrently.
+        
+        Args:
+            items (list): Dicts with a 'url' and optional 'selectors', 'fetch_images',
+                'fetch_social_embeds', 'cache' and 'timeout' (seconds)
+            max_workers (int): Maximum number of worker threads for this batch,
+                capped by the global concurrency limit
+            
+        Returns:
+            list: One result dict per item, in input order
+        """
+        if not items:
+            return []
+        
+        workers = min(len(items), self.limiter.max_concurrency)
+        if max_workers:
+            workers = max(1, min(workers, int(max_workers)))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._scrape_item, items))
+    
+    def _scrape_item(self, item):
+        """
+        Scrape a single batch item.
+        
+        Args:
+            item (dict): The batch item
+            
+        Returns:
+            dict: The scraped content or an error
+        """
+        url = item.get('url') if isinstance(item, dict) else None
+        if not url:
+            return {'error': 'URL is required', 'url': url}
+        
+        return self.scrape(
+            url,
+            item.get('selectors'),
+            fetch_images=item.get('fetch_images', True),
+            fetch_social_embeds=item.get('fetch_social_embeds', True),
+            cache=item.get('cache'),
+            timeout=item.get('timeout')
+        )
     
-    def scrape(self, url, selectors=None, fetch_images=True, fetch_social_embeds=True):
+    def scrape(self, url, selectors=None, fetch_images=True, fetch_social_embeds=True, cache=None, timeout=None):
         """
         Scrape content from a URL.
         
         Args:
             url (str): The URL to scrape
-            selectors (dict): CSS selectors for specific elements (title, content, author, date)
+            selectors (dict): CSS selectors for specific elements (title, content, author, date, images).
+                When empty, the extraction profile registered for the URL's host is used.
             fetch_images (bool): Whether to fetch images
             fetch_social_embeds (bool): Whether to extract social media embeds
+            cache (str): Result cache mode: 'use' (default), 'bypass' or 'refresh'
+            timeout (float): Maximum download time in seconds, the scraper default if not given
             
         Returns:
             dict: The scraped content
         """
         try:
-            # Initialize default selectors if none provided
-            if selectors is None or not selectors:
-                selectors = {
-                    'title': 'h1, .entry-title, .article-title',
-                    'content': '.entry-content, article, .post-content',
-                    'author': '.author, .byline',
-                    'date': '.published, .post-date, time'
-                }
-            
-            # Download the page
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            html = response.text
-            
-            # Create BeautifulSoup object
-            soup = BeautifulSoup(html, 'html.parser')
+            mode = cache_mode(cache)
             
-            # Extract content based on the approach
-            result = {}
-            result['url'] = url
+            # Serve repeated requests for the same article from the result cache
+            result_key = None
+            if self.result_cache is not None and mode != CACHE_BYPASS:
+                result_key = make_key(normalize_url(url), selectors or None, bool(fetch_images), bool(fetch_social_embeds))
+                if mode == CACHE_USE:
+                    result = self.result_cache.get(result_key)
+                    if result is not None:
+                        logger.debug(f"Result cache hit for {url}")
+                        return result
             
-            # Try to extract with selectors first
-            title = self._extract_with_selector(soup, selectors.get('title', ''))
-            content = self._extract_with_selector(soup, selectors.get('content', ''))
-            author = self._extract_with_selector(soup, selectors.get('author', ''))
-            date = self._extract_with_selector(soup, selectors.get('date', ''))
+            result = self._fetch_and_extract(url, selectors, fetch_images, fetch_social_embeds, timeout)
             
-            # If selectors didn't work well, fall back to trafilatura
-            if not content or len(content) < 200:
-                logger.debug("Selector extraction failed or returned limited content, falling back to trafilatura")
-                extracted = trafilatura.extract(html, include_images=fetch_images, include_links=True, output_format='html')
-                
-                if extracted:
-                    # Create a soup from the trafilatura output to extract title and content
-                    traf_soup = BeautifulSoup(extracted, 'html.parser')
-                    
-                    # If we didn't get a title from selectors, try to get it from trafilatura or page title
-                    if not title:
-                        title = traf_soup.find('h1')
-                        if title:
-                            title = title.get_text().strip()
-                        else:
-                            # Last resort: use the page title
-                            title = soup.title.string if soup.title else "No Title Found"
-                    
-                    # Use the trafilatura content
-                    content = str(traf_soup)
-            
-            # Clean and add results
-            result['title'] = title.strip() if title else "No Title Found"
-            result['content'] = content if content else "No Content Found"
-            result['author'] = author.strip() if author else ""
-            result['date'] = date.strip() if date else ""
-            
-            # Extract images if requested
-            if fetch_images:
-                result['images'] = self._extract_images(soup, url)
-            
-            # Extract social media embeds if requested
-            if fetch_social_embeds:
-                result['social_embeds'] = self._extract_social_embeds(soup)
+            if result_key is not None:
+                self.result_cache.set(result_key, result)
             
             return result
             
@@ -110,123 +271,562 @@ class WebScraper:
                 'url': url
             }
     
-    def _extract_with_selector(self, soup, selector):
+    def _fetch_and_extract(self, url, selectors, fetch_images, fetch_social_embeds, timeout=None):
         """
-        Extract content using CSS selectors.
+        Download a page (conditionally, if validators are known) and extract its content.
         
         Args:
-            soup (BeautifulSoup): The BeautifulSoup object
-            selector (str): CSS selector string
+            url (str): The URL to scrape
+            selectors (dict): Request-supplied selectors, if any
+            fetch_images (bool): Whether to fetch images
+            fetch_social_embeds (bool): Whether to extract social media embeds
+            timeout (float): Maximum download time in seconds, if shorter than the default
             
         Returns:
-            str: The extracted content
+            dict: The scraped content
         """
-        if not selector:
-            return ""
+        # Use request-supplied selectors, or the profile for this publisher
+        profile = self.profiles.for_request(urlparse(url).hostname, selectors)
         
-        # Split by comma and try each selector
-        for sel in selector.split(','):
-            sel = sel.strip()
-            elements = soup.select(sel)
-            
-            if elements:
-                # If it's likely a container for content, return its HTML
-                if sel in ['.entry-content', '.article-content', 'article', '.post-content']:
-                    return str(elements[0])
-                # Otherwise return the text
-                return elements[0].get_text().strip()
+        # Send the validators from the previous fetch, if any
+        cache_key = ValidatorStore.make_key(url, selectors or profile.name, fetch_images, fetch_social_embeds)
+        cached = self.validators.get(cache_key)
+        
+        # Download the page
+        response, body = self._fetch(url, conditional_headers(cached), timeout)
+        
+        # Unchanged since the last fetch: reuse the previous result
+        if body is None and cached:
+            logger.debug(f"Not modified, using cached result for {url}")
+            self.validators.touch(cache_key)
+            return cached['result']
+        
+        # A 304 with no stored result to reuse: fetch the page in full
+        if body is None:
+            logger.debug(f"Not modified but nothing cached, fetching {url} again")
+            response, body = self._fetch(url, None, timeout)
+            if body is None:
+                raise FetchError("Got 304 Not Modified for an unconditional request")
         
-        return ""
+        # Parse and extract, either here or in the extraction process pool
+        encoding = detect_encoding(response.headers, body)
+        if self.extract_mode == 'process':
+            result = self._extract_in_pool(body, encoding, url, selectors, fetch_images, fetch_social_embeds)
+        else:
+            result = extract_page(body, encoding, url, profile, fetch_images, fetch_social_embeds)
+        
+        self.validators.put(cache_key, response, result)
+        
+        return result
     
-    def _extract_images(self, soup, base_url):
+    def _fetch(self, url, headers=None, timeout=None):
         """
-        Extract images from the page.
+        Download a page as a bounded stream, rejecting non-HTML content.
         
         Args:
-            soup (BeautifulSoup): The BeautifulSoup object
-            base_url (str): The base URL for resolving relative URLs
+            url (str): The URL to fetch
+            headers (dict): Extra request headers
+            timeout (float): Maximum download time in seconds, if shorter than the default
             
         Returns:
-            list: List of image information (url, alt text, caption)
+            tuple: (response, body bytes); the body is None for a 304 Not Modified
         """
-        images = []
-        for img in soup.find_all('img'):
-            src = img.get('src')
-            data_src = img.get('data-src')  # Some sites use data-src for lazy loading
-            
-            # Skip if no source found
-            if not src and not data_src:
-                continue
-            
-            # Use data-src if src is not available or is a placeholder
-            img_url = src if src and not src.endswith(('placeholder.jpg', 'placeholder.png')) else data_src
-            
-            # Skip if still no valid URL
-            if not img_url:
-                continue
-            
-            # Make relative URLs absolute
-            if not img_url.startswith(('http://', 'https://', 'data:')):
-                img_url = urljoin(base_url, img_url)
-            
-            # Get alt text and potential caption
-            alt_text = img.get('alt', '')
-            
-            # Look for a caption in a figcaption element or nearby paragraph
-            caption = ""
-            if img.parent and img.parent.name == 'figure':
-                figcaption = img.parent.find('figcaption')
-                if figcaption:
-                    caption = figcaption.get_text().strip()
-            
-            images.append({
-                'url': img_url,
-                'alt': alt_text,
-                'caption': caption
-            })
-        
-        return images
+        # Hold the host slot for the whole download, not just the request
+        deadline = min(float(timeout), self.fetch_deadline) if timeout else self.fetch_deadline
+        with self.limiter.slot(url):
+            return fetch_bounded(self.session, url, headers, self.max_bytes, deadline, HTML_CONTENT_TYPES)
+    
+    def _get_pool(self):
+        """Create the extraction process pool on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._pool = ProcessPoolExecutor(max_workers=self.extract_workers, mp_context=context)
+            return self._pool
     
-    def _extract_social_embeds(self, soup):
+    def _extract_in_pool(self, body, encoding, url, selectors, fetch_images, fetch_social_embeds):
         """
-        Extract social media embeds (Twitter, Instagram, etc.).
+        Run parsing and extraction in the process pool.
         
         Args:
-            soup (BeautifulSoup): The BeautifulSoup object
+            body (bytes): The page body
+            encoding (str): The character encoding of the body
+            url (str): The page URL
+            selectors (dict): Request-supplied selectors, if any
+            fetch_images (bool): Whether to collect images
+            fetch_social_embeds (bool): Whether to collect social media embeds
             
         Returns:
-            list: List of social media embeds
-        """
-        embeds = []
-        
-        # Twitter embeds
-        twitter_embeds = soup.select('.twitter-tweet, blockquote.twitter-tweet, [data-tweet-id]')
-        for embed in twitter_embeds:
-            embed_html = str(embed)
-            embeds.append({
-                'type': 'twitter',
-                'html': embed_html
-            })
-        
-        # Instagram embeds
-        instagram_embeds = soup.select('.instagram-media, blockquote.instagram-media, [data-instgrm-permalink]')
-        for embed in instagram_embeds:
-            embed_html = str(embed)
-            embeds.append({
-                'type': 'instagram',
-                'html': embed_html
-            })
-        
-        # YouTube embeds
-        youtube_embeds = soup.select('iframe[src*="youtube.com"], iframe[src*="youtu.be"]')
-        for embed in youtube_embeds:
-            embed_html = str(embed)
-            embeds.append({
-                'type': 'youtube',
-                'html': embed_html
-            })
-        
-        return embeds
+            dict: The extracted content
+        """
+        future = self._get_pool().submit(
+            _extract_in_worker, body, encoding, url, selectors, fetch_images, fetch_social_embeds,
+            self.extract_timeout, self.max_result_bytes
+        )
+        try:
+            # The worker enforces the budget itself; the grace period covers queueing and transfer
+            return future.result(timeout=self.extract_timeout + EXTRACT_GRACE_PERIOD)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ExtractionTimeout(f"Extraction took longer than {self.extract_timeout} seconds")
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next request
+            with self._pool_lock:
+                self._pool = None
+            raise
+    
+    def close(self):
+        """Shut down the extraction process pool, if one was started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def create_session(pool_size):
+    """
+    Create an HTTP session whose connection pool fits the given concurrency.
+    
+    Args:
+        pool_size (int): Maximum number of concurrent connections per host pool
+        
+    Returns:
+        requests.Session: The session
+    """
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    
+    # Size the connection pool so concurrent fetches don't discard connections
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    
+    return session
+
+
+def fetch_bounded(session, url, headers, max_bytes, deadline_seconds, content_types=None):
+    """
+    Download a URL as a bounded stream.
+    
+    Unwanted content types are rejected from the headers alone, and the body is read
+    in chunks so that the size cap and the total-time deadline are enforced while
+    downloading rather than after.
+    
+    Args:
+        session (requests.Session): The session to use
+        url (str): The URL to fetch
+        headers (dict): Extra request headers
+        max_bytes (int): Maximum body size
+        deadline_seconds (float): Maximum total download time
+        content_types (tuple): Accepted content types, or None to accept any
+        
+    Returns:
+        tuple: (response, body bytes); the body is None for a 304 Not Modified
+    """
+    with open_bounded(session, url, headers, max_bytes, deadline_seconds, content_types) as (response, stream):
+        return response, stream.read() if stream is not None else None
+
+
+@contextmanager
+def open_bounded(session, url, headers, max_bytes, deadline_seconds, content_types=None):
+    """
+    Open a URL as a bounded stream, for callers that parse the body as it arrives.
+    
+    The checks are fetch_bounded's: content type and Content-Length up front, then
+    the size cap and the total-time deadline on every read.
+    
+    Args:
+        session (requests.Session): The session to use
+        url (str): The URL to fetch
+        headers (dict): Extra request headers
+        max_bytes (int): Maximum body size
+        deadline_seconds (float): Maximum total download time
+        content_types (tuple): Accepted content types, or None to accept any
+        
+    Yields:
+        tuple: (response, BoundedStream over the body); the stream is None for a
+            304 Not Modified
+    """
+    deadline = time.monotonic() + deadline_seconds
+    # Don't wait on the connection or the first byte for longer than the whole download may take
+    timeout = tuple(min(value, deadline_seconds) for value in FETCH_TIMEOUT)
+    response = session.get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        if response.status_code == 304:
+            yield response, None
+            return
+        
+        response.raise_for_status()
+        
+        # Reject PDFs, videos and other unwanted content before reading the body
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_types and content_type and content_type not in content_types:
+            raise FetchError(f"Unsupported content type: {content_type}")
+        
+        content_length = response.headers.get('Content-Length', '')
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            raise FetchError(f"Response too large: {content_length} bytes (limit {max_bytes})")
+        
+        yield response, BoundedStream(_iter_body(response, deadline, deadline_seconds), max_bytes)
+    finally:
+        response.close()
+
+
+class BoundedStream:
+    """
+    Binary file-like reader over a streamed response body.
+    
+    Raises FetchError as soon as more than max_bytes have been received.
+    """
+    
+    def __init__(self, chunks, max_bytes):
+        self.chunks = chunks
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.buffer = bytearray()
+    
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.size += len(chunk)
+            if self.size > self.max_bytes:
+                raise FetchError(f"Response too large: more than {self.max_bytes} bytes")
+            self.buffer += chunk
+        
+        if size < 0 or size >= len(self.buffer):
+            data = bytes(self.buffer)
+            self.buffer.clear()
+        else:
+            data = bytes(self.buffer[:size])
+            del self.buffer[:size]
+        return data
+
+
+def _iter_body(response, deadline, deadline_seconds):
+    """
+    Read a streamed response body within a total-time deadline.
+    
+    Every read returns as soon as some data arrives and waits on the socket for
+    no longer than the time left, so a server trickling a few bytes at a time
+    can't hold the download (and its host slot) past the deadline.
+    
+    Args:
+        response (requests.Response): The streaming response
+        deadline (float): The time.monotonic() deadline
+        deadline_seconds (float): The deadline in seconds, for the error message
+        
+    Yields:
+        bytes: Decoded body chunks
+    """
+    raw = response.raw
+    sock = _response_socket(raw)
+    # urllib3 1.x has no read1(); its read() returns once the chunk is full
+    read = getattr(raw, 'read1', None) or raw.read
+    
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise FetchError(f"Download took longer than {round(deadline_seconds, 1)} seconds")
+        if sock is not None:
+            try:
+                sock.settimeout(remaining)
+            except OSError:
+                # Released by http.client (Connection: close); reads keep the read timeout
+                sock = None
+        
+        try:
+            chunk = read(FETCH_CHUNK_SIZE, decode_content=True)
+        except (socket.timeout, ReadTimeoutError):
+            raise FetchError(f"Download took longer than {round(deadline_seconds, 1)} seconds")
+        
+        if not chunk:
+            return
+        yield chunk
+
+
+def _response_socket(raw):
+    """Find the socket a urllib3 response is read from, or None."""
+    sock = getattr(getattr(raw, '_connection', None), 'sock', None)
+    if sock is None:
+        fp = getattr(getattr(raw, '_fp', None), 'fp', None)
+        sock = getattr(getattr(fp, 'raw', None), '_sock', None)
+    return sock
+
+
+def detect_encoding(headers, body):
+    """
+    Determine the character encoding of a page without decoding the body.
+    
+    Args:
+        headers (dict): The response headers
+        body (bytes): The page body
+    
+    Returns:
+        str: The encoding name
+    """
+    # Prefer an explicit charset in the Content-Type header
+    match = HEADER_CHARSET_RE.search(headers.get('Content-Type', ''))
+    
+    # Otherwise look for a <meta> declaration near the top of the document
+    if not match:
+        match = META_CHARSET_RE.search(body[:4096])
+    
+    if match:
+        encoding = match.group(1)
+        if isinstance(encoding, bytes):
+            encoding = encoding.decode('ascii', 'ignore')
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            pass
+    
+    return 'utf-8'
+
+
+def parse_html(content, encoding):
+    """
+    Parse raw page bytes into an lxml tree.
+    
+    Args:
+        content (bytes): The page body
+        encoding (str): The character encoding of the body
+    
+    Returns:
+        lxml.html.HtmlElement: The document root
+    """
+    parser = lxml_html.HTMLParser(encoding=encoding)
+    return lxml_html.document_fromstring(content, parser=parser)
+
+
+def extract_media(tree, base_url, profile=None, fetch_images=True, fetch_social_embeds=True):
+    """
+    Extract images (with captions) and social media embeds in one pass over the page.
+    
+    Args:
+        tree (lxml.html.HtmlElement): The parsed document
+        base_url (str): The base URL for resolving relative URLs
+        profile (ExtractionProfile): Profile whose 'images' selectors limit the image search
+        fetch_images (bool): Whether to collect images
+        fetch_social_embeds (bool): Whether to collect social media embeds
+    
+    Returns:
+        tuple: (images, embeds) lists
+    """
+    # Limit the image search to the profile's image containers, if it has any
+    containers = None
+    if fetch_images and profile is not None and profile.has_field('images'):
+        containers = [element for element in profile.match(tree, 'images') if not isinstance(element, str)]
+    
+    visitor = PageVisitor(
+        base_url,
+        collect_images=fetch_images,
+        collect_embeds=fetch_social_embeds,
+        image_containers=containers
+    )
+    return visitor.visit(tree)
+
+
+def extract_page(body, encoding, url, profile, fetch_images=True, fetch_social_embeds=True):
+    """
+    Parse a page once and extract its content.
+    
+    Args:
+        body (bytes): The page body
+        encoding (str): The character encoding of the body
+        url (str): The page URL
+        profile (ExtractionProfile): The extraction profile to use
+        fetch_images (bool): Whether to collect images
+        fetch_social_embeds (bool): Whether to collect social media embeds
+        
+    Returns:
+        dict: The extracted content
+    """
+    # Parse the raw bytes once; this tree serves every extraction stage
+    tree = parse_html(body, encoding)
+    
+    # Extract content based on the approach
+    result = {}
+    result['url'] = url
+    
+    # Read JSON-LD / OpenGraph metadata first; selectors only fill the fields it lacks
+    structured = extract_structured_data(tree)
+    title = structured.get('title') or profile.extract(tree, 'title')
+    author = structured.get('author') or profile.extract(tree, 'author')
+    date = structured.get('date') or profile.extract(tree, 'date')
+    
+    # A complete articleBody makes the content selectors and the trafilatura fallback
+    # unnecessary. It's plain text, and content is HTML on every path
+    if len(structured.get('body', '')) >= MIN_STRUCTURED_BODY:
+        content = text_to_html(structured['body'])
+    else:
+        content = profile.extract(tree, 'content')
+    
+    # Extract images and embeds before the fallback, since trafilatura cleans the tree in place
+    images, social_embeds = [], []
+    if fetch_images or fetch_social_embeds:
+        images, social_embeds = extract_media(tree, url, profile, fetch_images, fetch_social_embeds)
+    
+    # If selectors didn't work well, fall back to trafilatura on the same tree
+    if not content or len(content) < 200:
+        logger.debug("Selector extraction failed or returned limited content, falling back to trafilatura")
+        page_title = tree.findtext('.//title')
+        extracted = trafilatura.bare_extraction(tree, url=url, include_images=fetch_images, include_links=True,
+                                                include_formatting=True, output_format='xml')
+        extracted_html = trafilatura_html(extracted['body'], url) if extracted and extracted.get('body') is not None else ''
+        
+        if extracted_html:
+            # If we didn't get a title from selectors, use trafilatura's or the page title
+            if not title:
+                title = extracted.get('title') or page_title or "No Title Found"
+            
+            # Use the trafilatura content
+            content = extracted_html
+    
+    # Clean and add results
+    result['title'] = title.strip() if title else "No Title Found"
+    result['content'] = content if content else "No Content Found"
+    result['author'] = author.strip() if author else ""
+    result['date'] = date.strip() if date else ""
+    
+    # Add images if requested, with the structured lead image first
+    if fetch_images:
+        if structured.get('image'):
+            images = _with_lead_image(images, urljoin(url, structured['image']))
+        result['images'] = images
+    
+    # Add social media embeds if requested
+    if fetch_social_embeds:
+        result['social_embeds'] = social_embeds
+    
+    return result
+
+
+# trafilatura's XML elements and the HTML elements they stand for
+TRAFILATURA_TAGS = {
+    'p': 'p', 'quote': 'blockquote', 'item': 'li', 'lb': 'br', 'table': 'table', 'row': 'tr',
+    'del': 'del', 'code': 'code'
+}
+TRAFILATURA_HIGHLIGHTS = {'#b': 'strong', '#i': 'em', '#u': 'u', '#t': 'code', '#sub': 'sub', '#sup': 'sup'}
+
+
+def trafilatura_html(body, base_url):
+    """
+    Convert the body trafilatura extracts (its XML format) to HTML.
+    
+    Args:
+        body (lxml.etree._Element): The extracted body element
+        base_url (str): The page URL, for resolving image sources
+        
+    Returns:
+        str: The content HTML, empty if the body holds no text
+    """
+    body = copy.deepcopy(body)
+    for element in body.iter():
+        if element is body or not isinstance(element.tag, str):
+            continue
+        tag, attributes = element.tag, dict(element.attrib)
+        element.attrib.clear()
+        
+        if tag == 'head':
+            rend = attributes.get('rend', '')
+            element.tag = rend if re.fullmatch(r'h[1-6]', rend) else 'h2'
+        elif tag == 'list':
+            element.tag = 'ol' if attributes.get('rend') == 'ol' else 'ul'
+        elif tag == 'hi':
+            element.tag = TRAFILATURA_HIGHLIGHTS.get(attributes.get('rend'), 'span')
+        elif tag == 'ref':
+            element.tag = 'a'
+            if attributes.get('target'):
+                element.set('href', attributes['target'])
+        elif tag == 'graphic':
+            element.tag = 'img'
+            if attributes.get('src'):
+                element.set('src', urljoin(base_url, attributes['src']))
+            element.set('alt', attributes.get('alt', ''))
+        elif tag == 'cell':
+            element.tag = 'th' if attributes.get('role') == 'head' else 'td'
+        elif tag == 'code' and element.getparent() is body:
+            element.tag = 'pre'
+        else:
+            element.tag = TRAFILATURA_TAGS.get(tag, 'span')
+    
+    if not ''.join(body.itertext()).strip():
+        return ''
+    leading = html.escape(body.text, quote=False) if body.text and body.text.strip() else ''
+    return leading + ''.join(lxml_html.tostring(child, encoding='unicode') for child in body)
+
+
+def _with_lead_image(images, lead_url):
+    """
+    Put the lead image first in the image list, adding it if the page body didn't reference it.
+    
+    Args:
+        images (list): Images collected from the page
+        lead_url (str): The absolute lead image URL
+        
+    Returns:
+        list: The reordered image list
+    """
+    for index, image in enumerate(images):
+        if lead_url in image.get('sources', [image['url']]):
+            return [image] + images[:index] + images[index + 1:]
+    
+    return [{'url': lead_url, 'alt': '', 'caption': '', 'sources': [lead_url]}] + images
+
+
+# Extraction profiles used inside pool worker processes
+_worker_profiles = None
+
+
+def _raise_extraction_timeout(signum, frame):
+    raise ExtractionTimeout("Extraction time budget exceeded")
+
+
+def _extract_in_worker(body, encoding, url, selectors, fetch_images, fetch_social_embeds, time_budget, max_result_bytes):
+    """
+    Extraction entry point for pool worker processes.
+    
+    Each worker loads its own profile registry, so the "last matched selector"
+    hints are learned per worker process.
+    
+    Args:
+        body (bytes): The page body
+        encoding (str): The character encoding of the body
+        url (str): The page URL
+        selectors (dict): Request-supplied selectors, if any
+        fetch_images (bool): Whether to collect images
+        fetch_social_embeds (bool): Whether to collect social media embeds
+        time_budget (float): Maximum extraction time in seconds
+        max_result_bytes (int): Maximum size of the serialized result
+        
+    Returns:
+        dict: The extracted content
+    """
+    global _worker_profiles
+    if _worker_profiles is None:
+        _worker_profiles = ProfileRegistry.from_file()
+    
+    profile = _worker_profiles.for_request(urlparse(url).hostname, selectors)
+    
+    # Workers run tasks on their main thread, so an interval timer can interrupt a stuck extraction
+    signal.signal(signal.SIGALRM, _raise_extraction_timeout)
+    signal.setitimer(signal.ITIMER_REAL, time_budget)
+    try:
+        result = extract_page(body, encoding, url, profile, fetch_images, fetch_social_embeds)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    
+    # Don't ship oversized results back through the pipe
+    size = len(json.dumps(result))
+    if size > max_result_bytes:
+        raise ExtractionError(f"Extraction result too large: {size} bytes (limit {max_result_bytes})")
+    
+    return result
 
 
 class RssScraper:
@@ -234,85 +834,318 @@ class RssScraper:
     Scraper for extracting content from RSS feeds.
     """
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, validator_store=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 max_bytes=DEFAULT_FEED_MAX_BYTES, feed_timeout=DEFAULT_FEED_TIMEOUT, max_scan=DEFAULT_FEED_MAX_SCAN,
+                 seen_index=None, web_scraper=None, link_resolver=None):
+        self.session = create_session(max_concurrency)
+        self.limiter = HostLimiter(max_concurrency, per_host)
+        self.validators = validator_store if validator_store is not None else ValidatorStore()
+        self.seen = seen_index if seen_index is not None else SeenIndex()
+        self.web_scraper = web_scraper
+        self.resolver = link_resolver if link_resolver is not None else LinkResolver(self.session, self.limiter)
+        self.max_bytes = max_bytes
+        self.feed_timeout = feed_timeout
+        self.max_scan = max_scan
+    
+    def scrape_feeds(self, feeds, max_workers=None, deadline=None):
+        """
+        Scrape several RSS feeds concurrently.
+        
+        With a deadline, each feed's timeout (including the wait for a fetch slot)
+        is capped at the time left, and feeds whose turn comes after the deadline
+        are not fetched, so the whole batch ends in time.
+        
+        Args:
+            feeds (list): Dicts with a 'feed_url' and optional 'id', 'limit', 'keywords',
+                'timeout' (seconds), 'max_scan', 'only_new', 'record_seen', 'seen_scope',
+                'incremental', 'since', 'resolve_links', 'fetch_full' and 'full_timeout'
+            max_workers (int): Maximum number of worker threads for this batch,
+                capped by the global concurrency limit
+            deadline (float): Maximum time for the whole batch in seconds
+            
+        Returns:
+            dict: One result per feed, keyed by the feed's 'id' (or its URL, or
+                its index if that key is already taken)
+        """
+        if not feeds:
+            return {}
+        
+        workers = min(len(feeds), self.limiter.max_concurrency)
+        if max_workers:
+            workers = max(1, min(workers, int(max_workers)))
+        
+        ends = time.monotonic() + float(deadline) if deadline else None
+        
+        def scrape(feed):
+            if ends is not None and isinstance(feed, dict):
+                remaining = ends - time.monotonic()
+                if remaining <= 0:
+                    return {'error': f"Batch deadline of {deadline} seconds passed before the feed was fetched",
+                            'feed_url': feed.get('feed_url')}
+                timeout = feed.get('timeout')
+                feed = dict(feed, timeout=min(float(timeout), remaining) if timeout else remaining)
+            return self._scrape_feed_item(feed)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(scrape, feeds))
+        
+        keyed = {}
+        for index, (feed, result) in enumerate(zip(feeds, results)):
+            key = (feed.get('id') or feed.get('feed_url')) if isinstance(feed, dict) else None
+            key = str(key or index)
+            # The same feed twice (e.g. with other keywords) mustn't overwrite the first result
+            if key in keyed:
+                key = str(index)
+            keyed[key] = result
+        
+        return keyed
+    
+    def _scrape_feed_item(self, feed):
+        """
+        Scrape a single batch feed.
+        
+        Args:
+            feed (dict): The batch feed
+            
+        Returns:
+            dict: The scraped feed data or an error
+        """
+        feed_url = feed.get('feed_url') if isinstance(feed, dict) else None
+        if not feed_url:
+            return {'error': 'Feed URL is required', 'feed_url': feed_url}
+        
+        return self.scrape_feed(
+            feed_url,
+            feed.get('limit', 10),
+            feed.get('keywords', ''),
+            timeout=feed.get('timeout'),
+            max_scan=feed.get('max_scan'),
+            exclude_keywords=feed.get('exclude_keywords', ''),
+            whole_word=feed.get('whole_word', True),
+            only_new=feed.get('only_new', False),
+            seen_scope=feed.get('seen_scope', ''),
+            record_seen=feed.get('record_seen', True),
+            incremental=feed.get('incremental', False),
+            since=feed.get('since'),
+            resolve_links=feed.get('resolve_links', False),
+            fetch_full=feed.get('fetch_full', False),
+            full_timeout=feed.get('full_timeout')
+        )
     
-    def scrape_feed(self, feed_url, limit=10, keywords=''):
+    def scrape_feed(self, feed_url, limit=10, keywords='', timeout=None, max_scan=None,
+                    exclude_keywords='', whole_word=True, only_new=False, seen_scope='', record_seen=True,
+                    incremental=False, since=None, resolve_links=False, fetch_full=False, full_timeout=None):
         """
         Scrape articles from an RSS feed.
         
+        Entries are filtered as the feed is parsed, and parsing stops as soon as
+        `limit` matching items are collected or `max_scan` entries were looked at.
+        In incremental mode it also stops at the entry the previous poll started
+        with (the high-water mark), so only the entries published since come back.
+        
         Args:
             feed_url (str): The RSS feed URL
-            limit (int): Maximum number of articles to fetch
-            keywords (str): Keywords to filter by (comma-separated)
+            limit (int): Maximum number of articles to return
+            keywords (str|list): Keywords to filter by (comma-separated or a list)
+            timeout (float): Maximum download time in seconds, the scraper default if not given
+            max_scan (int): Maximum number of entries to look at, the scraper default if not given
+            exclude_keywords (str|list): Skip entries containing any of these keywords
+            whole_word (bool): Match keywords as whole words only
+            only_new (bool): Return only items not handed out before, and record them as seen
+            seen_scope (str): Namespace for the seen-item index, e.g. the subscribing site
+            record_seen (bool): With only_new, record the returned items as seen right away.
+                Pass False to record only the items the caller confirms with confirm_seen(),
+                so items it fails to process come back on the next poll
+            incremental (bool): Return only the entries newer than the high-water mark,
+                and the new mark as 'mark'. The mark only moves once the delta is
+                complete, so combine it with only_new when limit or max_scan may cut
+                a delta short
+            since (dict|str|int): The high-water mark: a previous result's 'mark', a
+                GUID, a link or a Unix timestamp; the mark stored for the feed and
+                seen_scope if not given
+            resolve_links (bool): Follow each returned item's redirects and add its
+                'canonical_link' (also used for deduplication)
+            fetch_full (bool): Scrape each returned item's link and attach the article as 'article'
+            full_timeout (float): Maximum download time per article in seconds
             
         Returns:
-            dict: The scraped feed data and items
+            dict: The scraped feed data, items, the number of entries scanned and,
+                when filtering, how many entries each keyword selected or excluded
         """
         try:
-            # Parse the feed
-            feed = feedparser.parse(feed_url)
+            limit = int(limit)
+            max_scan = int(max_scan) if max_scan else self.max_scan
             
-            # Check if parsing was successful
-            if not feed or not feed.entries:
-                return {
-                    'error': 'Failed to parse feed or no entries found',
-                    'feed_url': feed_url
-                }
+            # Send the validators from the previous poll, if any
+            cache_key = ValidatorStore.make_key(
+                feed_url, limit, keywords, max_scan, exclude_keywords, whole_word, only_new, seen_scope,
+                record_seen, incremental, resolve_links
+            )
+            cached = self.validators.get(cache_key)
             
-            # Extract feed information
-            feed_info = {
-                'title': feed.feed.get('title', ''),
-                'description': feed.feed.get('description', ''),
-                'link': feed.feed.get('link', ''),
-                'updated': feed.feed.get('updated', '')
-            }
+            # For new items or a delta, a 304 only means "nothing new" if the last poll got
+            # through every entry (or up to the mark)
+            if (only_new or incremental) and cached and not cached['result'].get('complete'):
+                cached = None
             
-            # Process feed entries
+            # Likewise for a delta, if the last poll ended at the mark we're starting from
+            mark = None
+            if incremental:
+                mark_key = f'{seen_scope}|mark|{feed_url}'
+                mark = self._parse_mark(since) if since is not None else self.seen.get_mark(mark_key)
+                if cached and cached['result'].get('mark') != mark:
+                    cached = None
+            
+            # Download the feed, respecting the global and per-host limits; a timeout
+            # given by the caller also covers the wait for a slot
+            deadline = min(float(timeout), self.feed_timeout) if timeout else self.feed_timeout
+            started = time.monotonic()
+            with self.limiter.slot(feed_url, deadline if timeout else None):
+                remaining = deadline - (time.monotonic() - started) if timeout else deadline
+                if remaining <= 0:
+                    raise FetchError(f"Download took longer than {round(deadline, 1)} seconds")
+                response, body = fetch_bounded(
+                    self.session, feed_url, conditional_headers(cached), self.max_bytes, remaining
+                )
+                
+                # A 304 with no stored result to reuse: fetch the feed in full
+                if body is None and not cached:
+                    logger.debug(f"Feed not modified but nothing cached, fetching {feed_url} again")
+                    remaining = deadline - (time.monotonic() - started)
+                    if remaining <= 0:
+                        raise FetchError(f"Download took longer than {round(deadline, 1)} seconds")
+                    response, body = fetch_bounded(self.session, feed_url, None, self.max_bytes, remaining)
+                    if body is None:
+                        raise FetchError("Got 304 Not Modified for an unconditional request")
+            
+            # Unchanged since the last poll: reuse the previous result
+            if body is None and cached:
+                logger.debug(f"Feed not modified, using cached result for {feed_url}")
+                self.validators.touch(cache_key)
+                if incremental:
+                    return dict(cached['result'], items=[], scanned=0, keyword_hits={}, skipped_seen=0,
+                                reached_mark=True)
+                if only_new:
+                    # Items handed out but never confirmed are still pending
+                    pending = [] if record_seen else self._unseen(cached['result']['items'], seen_scope)
+                    return dict(cached['result'], items=pending, scanned=0, keyword_hits={}, skipped_seen=0)
+                if fetch_full:
+                    return self._with_articles(cached['result'], full_timeout)
+                return cached['result']
+            
+            # Parse the feed, passing the headers for encoding detection
+            # and the final URL for resolving relative links
+            response_headers = {key.lower(): value for key, value in response.headers.items()}
+            response_headers.setdefault('content-location', response.url)
+            feed_info, entries = iter_feed(body or b'', response_headers)
+            
+            # Filter lazily and stop once enough items matched
             items = []
-            keyword_list = [k.strip().lower() for k in keywords.split(',') if k.strip()]
+            item_keys = []
+            scanned = 0
+            skipped_seen = 0
+            complete = True
+            new_mark = None
+            reached_mark = False
+            matcher = get_matcher(keywords, exclude_keywords, whole_word)
+            filtering = bool(matcher.keywords or matcher.exclude)
+            keyword_hits = dict.fromkeys(matcher.keywords + matcher.exclude, 0)
             
-            for entry in feed.entries[:limit]:
-                # Filter by keywords if provided
-                if keyword_list:
-                    title = entry.get('title', '').lower()
-                    description = entry.get('description', '').lower()
+            if limit > 0:
+                for entry in islice(entries, max_scan):
+                    scanned += 1
                     
-                    # Skip if no keywords match
-                    if not any(keyword in title or keyword in description for keyword in keyword_list):
-                        continue
-                
-                # Extract entry information
-                item = {
-                    'title': entry.get('title', ''),
-                    'link': entry.get('link', ''),
-                    'description': entry.get('description', ''),
-                    'published': entry.get('published', ''),
-                    'author': entry.get('author', '')
-                }
-                
-                # Try to extract the publish date in a consistent format
-                published_date = entry.get('published_parsed') or entry.get('updated_parsed')
-                if published_date:
-                    try:
-                        item['date'] = datetime(*published_date[:6]).strftime('%Y-%m-%d %H:%M:%S')
-                    except Exception:
-                        item['date'] = ''
+                    # Newest first: stop at the entry the last poll started with
+                    if incremental:
+                        if new_mark is None:
+                            new_mark = self._entry_mark(entry)
+                        if mark and self._reached_mark(entry, mark):
+                            reached_mark = True
+                            break
+                    
+                    # Skip items handed out before
+                    keys = None
+                    if only_new:
+                        keys = SeenIndex.item_keys(entry.get('link'), entry.get('guid'), seen_scope)
+                        if self.seen.contains(keys):
+                            skipped_seen += 1
+                            continue
+                    
+                    # Skip if no keywords match, or an excluded one does
+                    if filtering:
+                        passed, included, excluded = matcher.match(entry.get('title'), entry.get('description'))
+                        for keyword in excluded if not passed else included:
+                            keyword_hits[keyword] += 1
+                        if not passed:
+                            continue
+                    
+                    items.append(self._feed_item(normalize_entry(entry)))
+                    item_keys.append(keys)
+                    if len(items) >= limit:
+                        complete = False
+                        break
                 
-                # Extract media content if available
-                if 'media_content' in entry:
-                    media_urls = [m.get('url', '') for m in entry.media_content if 'url' in m]
-                    item['media'] = media_urls
+                # Stopped by max_scan: there may be more entries (or, for a delta, more before the mark)
+                if scanned >= max_scan and not reached_mark:
+                    complete = False
                 
-                items.append(item)
+                # Check if parsing was successful
+                if not scanned:
+                    return {
+                        'error': 'Failed to parse feed or no entries found',
+                        'feed_url': feed_url
+                    }
             
-            return {
+            # Extract feed information
+            feed_info = {
+                'title': feed_info.get('title', ''),
+                'description': feed_info.get('description', ''),
+                'link': feed_info.get('link', ''),
+                'updated': feed_info.get('updated') or feed_info.get('published', '')
+            }
+            
+            result = {
                 'feed': feed_info,
-                'items': items
+                'items': items,
+                'scanned': scanned
             }
+            if filtering:
+                result['keyword_hits'] = keyword_hits
+            if incremental:
+                # Only move the mark once every entry above the old one was looked at. After a
+                # truncated delta the next poll starts from the old mark again, and only_new
+                # skips what this one handed out
+                advance = new_mark and (mark is None or reached_mark or complete)
+                result['mark'] = new_mark if advance else mark
+                result['reached_mark'] = reached_mark
+            if only_new or incremental:
+                result['complete'] = complete
+            if only_new:
+                result['skipped_seen'] = skipped_seen
+            
+            # Unwrap aggregator and shortener links, so the same story gets one URL,
+            # within what's left of the caller's timeout
+            if resolve_links and items:
+                remaining = deadline - (time.monotonic() - started) if timeout else None
+                canonical = self.resolver.resolve_many([item['link'] for item in items], remaining)
+                for index, item in enumerate(items):
+                    item['canonical_link'] = canonical.get(item['link'], item['link'])
+                    if only_new:
+                        item_keys[index] += SeenIndex.item_keys(item['canonical_link'], scope=seen_scope)
+            
+            # Record the new items, dropping any that another request claimed first
+            if only_new and record_seen:
+                claimed = self.seen.claim(item_keys)
+                result['items'] = [item for item, new in zip(items, claimed) if new]
+                result['skipped_seen'] = skipped_seen + claimed.count(False)
+            
+            self.validators.put(cache_key, response, result)
+            if incremental and result['mark']:
+                self.seen.set_mark(mark_key, result['mark'])
+            
+            if fetch_full:
+                return self._with_articles(result, full_timeout)
+            return result
             
         except Exception as e:
             logger.exception(f"Error scraping RSS feed {feed_url}: {str(e)}")
@@ -321,6 +1154,174 @@ class RssScraper:
                 'feed_url': feed_url
             }
     
+    def confirm_seen(self, links, seen_scope=''):
+        """
+        Record items returned with record_seen=False as seen.
+        
+        Args:
+            links (list): The item links (or canonical links)
+            seen_scope (str): Namespace for the seen-item index
+            
+        Returns:
+            int: How many of the items weren't recorded yet
+        """
+        claimed = self.seen.claim([SeenIndex.item_keys(link, scope=seen_scope) for link in links if link])
+        return claimed.count(True)
+    
+    def _unseen(self, items, seen_scope):
+        """Keep the response items that haven't been recorded as seen."""
+        items_keys = [
+            SeenIndex.item_keys(item['link'], scope=seen_scope)
+            + SeenIndex.item_keys(item.get('canonical_link'), scope=seen_scope)
+            for item in items
+        ]
+        seen = self.seen.contains_many(items_keys)
+        return [item for item, was_seen in zip(items, seen) if not was_seen]
+    
+    @staticmethod
+    def _entry_mark(entry):
+        """Build the high-water mark for a raw feed entry."""
+        return {
+            'guid': entry.get('guid') or None,
+            'link': canonicalize_url(entry['link']) if entry.get('link') else None,
+            'published': entry_timestamp(entry)
+        }
+    
+    @staticmethod
+    def _parse_mark(since):
+        """
+        Turn a caller-supplied high-water mark into a mark dict.
+        
+        Args:
+            since (dict|str|int): A previous result's 'mark', a GUID, a link, a date or a Unix timestamp
+            
+        Returns:
+            dict: The mark, or None if it's empty
+        """
+        if not since:
+            return None
+        if isinstance(since, dict):
+            published = since.get('published')
+            if isinstance(published, str):
+                parsed = parse_date(published)
+                published = calendar.timegm(parsed) if parsed else None
+            return {
+                'guid': since.get('guid') or None,
+                'link': canonicalize_url(since['link']) if since.get('link') else None,
+                'published': published
+            }
+        if isinstance(since, (int, float)):
+            return {'guid': None, 'link': None, 'published': since}
+        
+        since = str(since).strip()
+        if since.isdigit():
+            return {'guid': None, 'link': None, 'published': int(since)}
+        if since.startswith(('http://', 'https://')):
+            return {'guid': since, 'link': canonicalize_url(since), 'published': None}
+        parsed = parse_date(since)
+        if parsed:
+            return {'guid': None, 'link': None, 'published': calendar.timegm(parsed)}
+        return {'guid': since, 'link': None, 'published': None}
+    
+    @staticmethod
+    def _reached_mark(entry, mark):
+        """
+        Check whether a raw entry is the high-water mark entry or older.
+        
+        Args:
+            entry (dict): The raw entry
+            mark (dict): The mark
+            
+        Returns:
+            bool: True if parsing should stop here
+        """
+        if mark.get('guid') and entry.get('guid') == mark['guid']:
+            return True
+        if mark.get('link') and entry.get('link') and canonicalize_url(entry['link']) == mark['link']:
+            return True
+        
+        # The mark entry may have left the feed: anything published before it is old too
+        # (and, for a bare timestamp, anything published at that time)
+        if mark.get('published') is None:
+            return False
+        published = entry_timestamp(entry)
+        if published is None:
+            return False
+        if mark.get('guid') or mark.get('link'):
+            return published < mark['published']
+        return published <= mark['published']
+    
+    def _with_articles(self, result, timeout=None):
+        """
+        Scrape the items' links concurrently and attach each article to its item.
+        
+        Every unique article (by canonical URL) is scraped once, even when several
+        items link to it. Articles come from the web scraper's result cache where
+        possible, so they are not stored with the feed result.
+        
+        Args:
+            result (dict): The feed result
+            timeout (float): Maximum download time per article in seconds
+            
+        Returns:
+            dict: A copy of the result whose items carry an 'article'
+        """
+        items = result.get('items') or []
+        urls = {}
+        for item in items:
+            link = item.get('canonical_link') or item.get('link')
+            if link:
+                urls.setdefault(canonicalize_url(link), link)
+        
+        if not urls:
+            return result
+        
+        # Share the application's web scraper (and its result cache) if one was given
+        if self.web_scraper is None:
+            self.web_scraper = WebScraper()
+        
+        results = self.web_scraper.scrape_batch([{'url': url, 'timeout': timeout} for url in urls.values()])
+        articles = dict(zip(urls, results))
+        
+        return dict(result, items=[
+            dict(item, article=articles[canonicalize_url(item.get('canonical_link') or item['link'])])
+            if item.get('link') else item
+            for item in items
+        ])
+    
+    @staticmethod
+    def _feed_item(entry):
+        """
+        Build a response item from a normalized feed entry.
+        
+        Args:
+            entry (dict): The normalized entry
+            
+        Returns:
+            dict: The item
+        """
+        item = {
+            'title': entry['title'],
+            'link': entry['link'],
+            'description': entry['description'],
+            'published': entry['published'],
+            'author': entry['author']
+        }
+        
+        # Try to extract the publish date in a consistent format
+        published_date = entry['published_parsed']
+        if published_date:
+            try:
+                item['date'] = datetime(*published_date[:6]).strftime('%Y-%m-%d %H:%M:%S')
+            except Exception:
+                item['date'] = ''
+        
+        # Extract media content if available
+        if entry['media_content']:
+            item['media'] = [m.get('url', '') for m in entry['media_content'] if 'url' in m]
+        
+        return item
+    
     def test_feed(self, feed_url, limit=5):
         """
         Test an RSS feed by fetching a few items.
@@ -334,3 +1335,254 @@ class RssScraper:
         """
         # Simply call scrape_feed with a small limit
         return self.scrape_feed(feed_url, limit)
+
+
+class SitemapScraper:
+    """
+    Scraper for publishers' XML sitemaps and Google News sitemaps.
+    
+    Sitemap indexes are walked level by level, fetching each level's child
+    sitemaps concurrently and skipping those whose lastmod predates `since`.
+    Every sitemap is stream-parsed and only its newest `limit` matching URLs are
+    kept, so memory doesn't grow with the size of the site.
+    """
+    
+    def __init__(self, limiter=None, seen_index=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 per_host=DEFAULT_PER_HOST, max_bytes=DEFAULT_SITEMAP_MAX_BYTES, timeout=DEFAULT_FEED_TIMEOUT,
+                 max_files=DEFAULT_SITEMAP_MAX_FILES):
+        self.session = create_session(max_concurrency)
+        self.limiter = limiter if limiter is not None else HostLimiter(max_concurrency, per_host)
+        self.seen = seen_index if seen_index is not None else SeenIndex()
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_files = max_files
+    
+    def scrape_sitemap(self, sitemap_url, limit=10, since=None, keywords='', exclude_keywords='', whole_word=True,
+                       only_new=False, seen_scope='', timeout=None, max_files=None):
+        """
+        Get the newest URLs from a sitemap or sitemap index, as feed items.
+        
+        Args:
+            sitemap_url (str): The sitemap or sitemap index URL
+            limit (int): Maximum number of items to return
+            since (dict|str|int): Only return URLs changed after this: a date, a Unix
+                timestamp or a previous result's 'mark'
+            keywords (str|list): Keywords to filter by, matched against the news
+                title and keywords and the words of the URL path
+            exclude_keywords (str|list): Skip URLs matching any of these keywords
+            whole_word (bool): Match keywords as whole words only
+            only_new (bool): Return only URLs not handed out before, and record them as seen
+            seen_scope (str): Namespace for the seen-item index, e.g. the subscribing site
+            timeout (float): Maximum download time per sitemap file in seconds
+            max_files (int): Maximum number of sitemap files to fetch, the scraper default if not given
+            
+        Returns:
+            dict: The sitemap info, items (newest first, shaped like scrape_feed's),
+                the number of URLs scanned and the new 'mark'
+        """
+        try:
+            limit = int(limit)
+            max_files = int(max_files) if max_files else self.max_files
+            mark = RssScraper._parse_mark(since) if since is not None else None
+            since_timestamp = mark.get('published') if mark else None
+            matcher = get_matcher(keywords, exclude_keywords, whole_word)
+            options = {
+                'since': since_timestamp,
+                'matcher': matcher if matcher.keywords or matcher.exclude else None,
+                'limit': limit,
+                'seen_scope': seen_scope if only_new else None,
+                'timeout': min(float(timeout), self.timeout) if timeout else self.timeout
+            }
+            
+            newest = []
+            order = count()
+            files = 0
+            scanned = 0
+            skipped_sitemaps = 0
+            errors = {}
+            level = [sitemap_url]
+            visited = {sitemap_url}
+            
+            with ThreadPoolExecutor(max_workers=self.limiter.max_concurrency) as executor:
+                for _ in range(SITEMAP_MAX_DEPTH + 1):
+                    level = level[:max_files - files]
+                    if not level:
+                        break
+                    files += len(level)
+                    
+                    children = []
+                    for url, outcome in zip(level, executor.map(lambda url: self._read_sitemap(url, options), level)):
+                        if 'error' in outcome:
+                            errors[url] = outcome['error']
+                            continue
+                        scanned += outcome['scanned']
+                        skipped_sitemaps += outcome['skipped_sitemaps']
+                        children.extend(outcome['sitemaps'])
+                        for timestamp, entry in outcome['entries']:
+                            heapq.heappush(newest, (timestamp, next(order), entry))
+                            if len(newest) > limit:
+                                heapq.heappop(newest)
+                    
+                    # Newest child sitemaps first, in case max_files cuts the next level short
+                    children.sort(key=lambda child: child[0], reverse=True)
+                    level = [loc for _, loc in children if loc not in visited]
+                    visited.update(level)
+            
+            if sitemap_url in errors:
+                return {
+                    'error': f"Failed to read sitemap: {errors[sitemap_url]}",
+                    'feed_url': sitemap_url
+                }
+            
+            entries = sorted(newest, key=lambda pair: (pair[0], -pair[1]), reverse=True)
+            items = [self._sitemap_item(entry, timestamp) for timestamp, _, entry in entries]
+            
+            # Record the new items, dropping any that another request claimed first
+            if only_new:
+                claimed = self.seen.claim([SeenIndex.item_keys(item['link'], scope=seen_scope) for item in items])
+                items = [item for item, new in zip(items, claimed) if new]
+            
+            latest = max((timestamp for timestamp, _, _ in entries), default=0)
+            result = {
+                'feed': {
+                    'title': '',
+                    'description': '',
+                    'link': sitemap_url,
+                    'updated': ''
+                },
+                'items': items,
+                'scanned': scanned,
+                'sitemaps': files - len(errors),
+                'skipped_sitemaps': skipped_sitemaps,
+                'mark': {'guid': None, 'link': None, 'published': latest} if latest else mark
+            }
+            if errors:
+                result['errors'] = errors
+            
+            return result
+        
+        except Exception as e:
+            logger.exception(f"Error scraping sitemap {sitemap_url}: {str(e)}")
+            return {
+                'error': f"Failed to scrape sitemap: {str(e)}",
+                'feed_url': sitemap_url
+            }
+    
+    def _read_sitemap(self, url, options):
+        """
+        Fetch and stream-parse one sitemap file.
+        
+        Args:
+            url (str): The sitemap URL
+            options (dict): 'since' (timestamp or None), 'matcher' (or None), 'limit',
+                'seen_scope' (None unless only new URLs are wanted) and 'timeout'
+            
+        Returns:
+            dict: 'entries' (the newest matching (timestamp, entry) pairs, at most
+                `limit`), 'sitemaps' ((lastmod timestamp, URL) pairs of child
+                sitemaps), 'scanned' and 'skipped_sitemaps', or 'error'
+        """
+        try:
+            since = options['since']
+            matcher = options['matcher']
+            newest = []
+            order = count()
+            pending = []
+            sitemaps = []
+            scanned = 0
+            skipped_sitemaps = 0
+            
+            def keep(candidates):
+                # Seen URLs are looked up in batches rather than one query per URL
+                if options['seen_scope'] is not None:
+                    seen = self.seen.contains_many([
+                        SeenIndex.item_keys(entry['loc'], scope=options['seen_scope']) for _, entry in candidates
+                    ])
+                    candidates = [candidate for candidate, was_seen in zip(candidates, seen) if not was_seen]
+                for timestamp, entry in candidates:
+                    heapq.heappush(newest, (timestamp, next(order), entry))
+                    if len(newest) > options['limit']:
+                        heapq.heappop(newest)
+            
+            # The sitemap is parsed as it downloads, so neither the compressed nor the
+            # decompressed document is ever held in memory whole
+            with self.limiter.slot(url):
+                with open_bounded(self.session, url, None, self.max_bytes, options['timeout']) as (_, stream):
+                    for entry in iter_sitemap(stream or b'', self.max_bytes):
+                        timestamp = self._entry_timestamp(entry)
+                        
+                        if entry['kind'] == 'sitemap':
+                            # A date-only lastmod covers changes made later that day
+                            if since is not None and timestamp is not None and (
+                                    timestamp + (86399 if len(entry['lastmod'] or '') <= 10 else 0) <= since):
+                                skipped_sitemaps += 1
+                            else:
+                                sitemaps.append((timestamp or 0, urljoin(url, entry['loc'])))
+                            continue
+                        
+                        scanned += 1
+                        
+                        # Without a date there's no telling whether the URL changed since
+                        if since is not None and (timestamp is None or timestamp <= since):
+                            continue
+                        timestamp = timestamp or 0
+                        if len(newest) >= options['limit'] and timestamp <= newest[0][0]:
+                            continue
+                        
+                        if matcher is not None:
+                            slug = re.sub(r'[-_/.]+', ' ', urlparse(entry['loc']).path)
+                            if not matcher.match(entry.get('title'), entry.get('keywords'), slug)[0]:
+                                continue
+                        
+                        if not entry['loc'].startswith(('http://', 'https://')):
+                            entry['loc'] = urljoin(url, entry['loc'])
+                        pending.append((timestamp, entry))
+                        if len(pending) >= SITEMAP_SEEN_BATCH:
+                            keep(pending)
+                            pending = []
+            
+            keep(pending)
+            
+            return {
+                'entries': [(timestamp, entry) for timestamp, _, entry in newest],
+                'sitemaps': sitemaps,
+                'scanned': scanned,
+                'skipped_sitemaps': skipped_sitemaps
+            }
+        
+        except Exception as e:
+            logger.warning(f"Error reading sitemap {url}: {str(e)}")
+            return {'error': str(e)}
+    
+    @staticmethod
+    def _entry_timestamp(entry):
+        """Get a sitemap entry's publication (or last modification) time, in seconds since the epoch."""
+        parsed = parse_date(entry.get('published')) or parse_date(entry.get('lastmod'))
+        return calendar.timegm(parsed) if parsed else None
+    
+    @staticmethod
+    def _sitemap_item(entry, timestamp):
+        """
+        Build a feed-style item from a sitemap entry.
+        
+        Args:
+            entry (dict): The sitemap entry
+            timestamp (int): Its publication or modification time (0 if unknown)
+            
+        Returns:
+            dict: The item
+        """
+        item = RssScraper._feed_item({
+            'title': entry.get('title') or '',
+            'link': entry['loc'],
+            'description': '',
+            'published': entry.get('published') or entry.get('lastmod') or '',
+            'author': '',
+            'published_parsed': time.gmtime(timestamp) if timestamp else None,
+            'media_content': [{'url': image} for image in entry['images']]
+        })
+        if entry.get('publication'):
+            item['source'] = entry['publication']
+        if entry.get('keywords'):
+            item['keywords'] = entry['keywords']
+        return item
@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from http_cache import CACHE_DIR
+from url_utils import canonicalize_url
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Items are forgotten this many seconds after they were first seen (default: 30 days)
+SEEN_TTL = int(os.environ.get('SCRAPER_SEEN_TTL', 30 * 24 * 3600))
+
+
+class SeenIndex:
+    """
+    Persistent index of feed items that were already handed out.
+
+    Items are keyed by their canonical URL (tracking parameters stripped) and by
+    their GUID, so an item counts as seen if either matches. Keys are namespaced
+    by a scope, letting several sites share one API without hiding items from
+    each other.
+
+    It also keeps each feed's high-water mark (the newest entry seen) for
+    incremental polling.
+    """
+
+    def __init__(self, path=None, ttl=SEEN_TTL):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'seen.db')
+
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        # Transactions are managed explicitly so claim() can take the write lock up front
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, expires REAL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS seen_expires ON seen (expires)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS marks (key TEXT PRIMARY KEY, mark TEXT, expires REAL)')
+        self.prune()
+
+    @staticmethod
+    def item_keys(link, guid=None, scope=''):
+        """
+        Build the index keys for a feed item.
+
+        Args:
+            link (str): The item URL
+            guid (str): The item GUID / Atom id, if any
+            scope (str): The namespace, e.g. the subscribing site
+
+        Returns:
+            tuple: The keys
+        """
+        keys = []
+        if link:
+            keys.append(f'{scope}|url|{canonicalize_url(link)}')
+        if guid and guid.strip():
+            keys.append(f'{scope}|guid|{guid.strip()}')
+        return tuple(keys)
+
+    def contains(self, keys):
+        """
+        Check whether any of an item's keys has been seen.
+
+        Args:
+            keys (tuple): The item keys
+
+        Returns:
+            bool: True if the item was seen and hasn't expired
+        """
+        if not keys:
+            return False
+
+        placeholders = ','.join('?' * len(keys))
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT 1 FROM seen WHERE key IN ({placeholders}) AND expires >= ? LIMIT 1',
+                (*keys, time.time())
+            ).fetchone()
+        return row is not None
+
+    def contains_many(self, items_keys):
+        """
+        Check several items at once.
+
+        Args:
+            items_keys (list): The keys of each item
+
+        Returns:
+            list: For each item, True if it was seen and hasn't expired
+        """
+        keys = list({key for keys in items_keys for key in keys})
+        found = set()
+
+        with self._lock:
+            # Stay well below SQLite's limit on query parameters
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(row[0] for row in self._conn.execute(
+                    f'SELECT key FROM seen WHERE key IN ({placeholders}) AND expires >= ?',
+                    (*chunk, time.time())
+                ))
+
+        return [any(key in found for key in keys) for keys in items_keys]
+
+    def claim(self, items_keys):
+        """
+        Record items as seen, atomically.
+
+        All items are checked and recorded in one write transaction, so when two
+        requests race for the same item only one of them gets it.
+
+        Args:
+            items_keys (list): The keys of each item
+
+        Returns:
+            list: For each item, True if it was new (and is now recorded)
+        """
+        now = time.time()
+        claimed = []
+
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                for keys in items_keys:
+                    if not keys:
+                        claimed.append(True)
+                        continue
+
+                    placeholders = ','.join('?' * len(keys))
+                    seen = self._conn.execute(
+                        f'SELECT 1 FROM seen WHERE key IN ({placeholders}) AND expires >= ? LIMIT 1',
+                        (*keys, now)
+                    ).fetchone()
+                    if seen:
+                        claimed.append(False)
+                        continue
+
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO seen (key, expires) VALUES (?, ?)',
+                        [(key, now + self.ttl) for key in keys]
+                    )
+                    claimed.append(True)
+
+                # Expired entries go while the write lock is held anyway
+                self._conn.execute('DELETE FROM seen WHERE expires < ?', (now,))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        return claimed
+
+    def get_mark(self, key):
+        """
+        Look up a stored high-water mark.
+
+        Args:
+            key (str): The mark key, e.g. scope and feed URL
+
+        Returns:
+            dict: The mark, or None if there is none or it expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT mark FROM marks WHERE key = ? AND expires >= ?', (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_mark(self, key, mark):
+        """
+        Store a high-water mark.
+
+        Args:
+            key (str): The mark key
+            mark (dict): The mark (JSON-serializable)
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO marks (key, mark, expires) VALUES (?, ?, ?)',
+                (key, json.dumps(mark), time.time() + self.ttl)
+            )
+
+    def prune(self):
+        """Drop expired entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('DELETE FROM seen WHERE expires < ?', (now,))
+            self._conn.execute('DELETE FROM marks WHERE expires < ?', (now,))
@@ -23,7 +23,10 @@ echo "API सर्वर शुरू करने के लिए:"
 echo "python main.py"
 echo ""
 echo "या उत्पादन वातावरण के लिए:"
-echo "gunicorn --bind 0.0.0.0:5000 --workers 4 main:app"
+echo "gunicorn --bind 0.0.0.0:5000 --workers 4 --threads 8 main:app"
+echo ""
+echo "बैकग्राउंड फ़ीड पोलर को अलग प्रोसेस में चलाएं (सिर्फ एक):"
+echo "python feed_poller.py"
 echo ""
 echo "WordPress प्लगइन सेटिंग्स में API URL सेट करना न भूलें:"
 echo "http://your-server-ip:5000"
\ No newline at end of file
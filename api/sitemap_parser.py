@@ -0,0 +1,153 @@
+import io
+import gzip
+import logging
+from lxml import etree
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+NEWS_NS = 'http://www.google.com/schemas/sitemap-news/0.9'
+IMAGE_NS = 'http://www.google.com/schemas/sitemap-image/1.1'
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Root elements, and the entry element each one holds
+SITEMAP_ROOTS = {'urlset': 'url', 'sitemapindex': 'sitemap'}
+
+
+def iter_sitemap(source, max_bytes=None):
+    """
+    Lazily parse a sitemap or sitemap index.
+    
+    The document (gzip-compressed or not) is streamed through lxml's iterparse
+    as it's read from `source`, and every entry is discarded once it's read, so
+    memory stays flat however many URLs the sitemap lists. Both the standard sitemap namespace and
+    namespace-less sitemaps are accepted; Google News and image extensions are
+    read when present.
+    
+    Args:
+        source (bytes or file): The sitemap document, or a binary file-like
+            object (such as a streamed response body) to read it from
+        max_bytes (int): Maximum size of the (decompressed) document, or None
+        
+    Yields:
+        dict: Entries with 'kind' ('url' or 'sitemap'), 'loc', 'lastmod' and,
+            for news sitemaps, 'title', 'publication', 'published' and
+            'keywords', plus 'images' (a list of image URLs)
+        
+    Raises:
+        etree.XMLSyntaxError: If the document isn't well-formed XML
+        ValueError: If the document isn't a sitemap, or is larger than max_bytes
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    
+    # Sniff for gzip without losing the bytes read
+    head = b''
+    while len(head) < len(GZIP_MAGIC):
+        data = source.read(len(GZIP_MAGIC) - len(head))
+        if not data:
+            break
+        head += data
+    source = _SitemapStream(source, head)
+    if head == GZIP_MAGIC:
+        source = gzip.GzipFile(fileobj=source, mode='rb')
+    if max_bytes is not None:
+        source = _SitemapStream(source, max_bytes=max_bytes)
+    
+    context = etree.iterparse(
+        source, events=('end',), resolve_entities=False, no_network=True,
+        load_dtd=False, remove_comments=True, remove_pis=True
+    )
+    
+    entry_name = None
+    for _, element in context:
+        if entry_name is None:
+            root_name = _local(element.getroottree().getroot().tag)
+            entry_name = SITEMAP_ROOTS.get(root_name)
+            if entry_name is None:
+                raise ValueError(f"Not a sitemap: {root_name}")
+        
+        parent = element.getparent()
+        if parent is None or parent.getparent() is not None or _local(element.tag) != entry_name:
+            continue
+        
+        entry = _read_entry(element)
+        entry['kind'] = entry_name
+        
+        # Entries are done with: free them and everything before them
+        element.clear()
+        while element.getprevious() is not None:
+            del parent[0]
+        
+        if entry['loc']:
+            yield entry
+
+
+class _SitemapStream:
+    """
+    Binary reader over another reader, with bytes already read put back in front
+    and, optionally, a cap on the total size read.
+    """
+    
+    def __init__(self, source, head=b'', max_bytes=None):
+        self.source = source
+        self.head = head
+        self.max_bytes = max_bytes
+        self.size = 0
+    
+    def read(self, size=-1):
+        if self.head:
+            data = self.head if size < 0 else self.head[:size]
+            self.head = self.head[len(data):]
+            if size < 0:
+                data += self.source.read()
+        else:
+            data = self.source.read(size)
+        
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise ValueError(f"Sitemap too large: more than {self.max_bytes} bytes")
+        return data
+
+
+def _read_entry(element):
+    entry = {'loc': '', 'lastmod': None, 'images': []}
+    
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        name = _local(child.tag)
+        if name == 'loc':
+            entry['loc'] = _text(child)
+        elif name == 'lastmod':
+            entry['lastmod'] = _text(child) or None
+        elif name == 'news':
+            for field in child:
+                if not isinstance(field.tag, str):
+                    continue
+                field_name = _local(field.tag)
+                if field_name == 'publication':
+                    entry['publication'] = _text(field.find(f'{{{NEWS_NS}}}name'))
+                elif field_name == 'publication_date':
+                    entry['published'] = _text(field)
+                elif field_name in ('title', 'keywords'):
+                    entry[field_name] = _text(field)
+        elif name == 'image':
+            image = child.find(f'{{{IMAGE_NS}}}loc')
+            if image is not None and _text(image):
+                entry['images'].append(_text(image))
+    
+    return entry
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _text(element):
+    if element is None:
+        return ''
+    return (element.text or '').strip()
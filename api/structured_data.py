@@ -0,0 +1,144 @@
+import re
+import json
+import logging
+from html import escape
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# schema.org types that describe the article itself
+ARTICLE_TYPES = {
+    'article', 'newsarticle', 'reportagenewsarticle', 'analysisnewsarticle', 'opinionnewsarticle',
+    'backgroundnewsarticle', 'reviewnewsarticle', 'blogposting', 'liveblogposting', 'socialmediaposting'
+}
+
+# Meta tags read as fallbacks, in priority order per field
+META_FIELDS = {
+    'title': ('og:title', 'twitter:title'),
+    'author': ('article:author', 'author', 'twitter:creator'),
+    'date': ('article:published_time', 'og:article:published_time', 'datepublished', 'pubdate'),
+    'image': ('og:image', 'og:image:url', 'og:image:secure_url', 'twitter:image')
+}
+
+
+def _load_json(text):
+    if not text:
+        return None
+    try:
+        return json.loads(text.strip(), strict=False)
+    except ValueError:
+        logger.debug("Skipping malformed JSON-LD block")
+        return None
+
+
+def _is_article(node):
+    types = node.get('@type')
+    if isinstance(types, str):
+        types = [types]
+    return any(isinstance(t, str) and t.lower() in ARTICLE_TYPES for t in types or [])
+
+
+def _find_article(node):
+    """Find the first article object in a JSON-LD document (including @graph)."""
+    if isinstance(node, list):
+        for child in node:
+            article = _find_article(child)
+            if article:
+                return article
+    elif isinstance(node, dict):
+        if _is_article(node):
+            return node
+        return _find_article(node.get('@graph'))
+    return None
+
+
+def _names(value):
+    """Flatten a schema.org author value (string, Person or list of them) into a display string."""
+    if isinstance(value, list):
+        return ', '.join(name for name in (_names(item) for item in value) if name)
+    if isinstance(value, dict):
+        return _text(value.get('name'))
+    return _text(value)
+
+
+def _first_url(value):
+    """Pick a URL from a schema.org image value (string, ImageObject or list of them)."""
+    if isinstance(value, list):
+        for item in value:
+            url = _first_url(item)
+            if url:
+                return url
+        return ''
+    if isinstance(value, dict):
+        return _text(value.get('url') or value.get('contentUrl'))
+    return _text(value)
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ''
+
+
+def text_to_html(text):
+    """
+    Turn plain text, such as an articleBody, into escaped HTML paragraphs.
+    
+    Blank lines separate paragraphs; text without any takes each line as one.
+    
+    Args:
+        text (str): The text
+        
+    Returns:
+        str: One <p> element per paragraph
+    """
+    separator = r'\n\s*\n' if re.search(r'\n\s*\n', text) else r'\n'
+    paragraphs = (paragraph.strip() for paragraph in re.split(separator, text))
+    return ''.join(f'<p>{escape(paragraph, quote=False)}</p>' for paragraph in paragraphs if paragraph)
+
+
+def extract_structured_data(tree):
+    """
+    Read article metadata from JSON-LD and OpenGraph / article: meta tags.
+    
+    JSON-LD values win over meta tags. Only fields that were found are returned.
+    
+    Args:
+        tree (lxml.html.HtmlElement): The parsed document
+        
+    Returns:
+        dict: Any of 'title', 'author', 'date', 'image' and 'body' (the articleBody text)
+    """
+    article = None
+    meta = {}
+    
+    for element in tree.iter('script', 'meta'):
+        if element.tag == 'script':
+            if article is None and (element.get('type') or '').strip().lower() == 'application/ld+json':
+                article = _find_article(_load_json(element.text))
+        else:
+            key = element.get('property') or element.get('name') or element.get('itemprop')
+            content = element.get('content')
+            if key and content:
+                meta.setdefault(key.strip().lower(), content.strip())
+    
+    data = {}
+    if article:
+        data['title'] = _text(article.get('headline')) or _text(article.get('name'))
+        data['author'] = _names(article.get('author'))
+        data['date'] = _text(article.get('datePublished')) or _text(article.get('dateCreated'))
+        data['image'] = _first_url(article.get('image')) or _first_url(article.get('thumbnailUrl'))
+        data['body'] = _text(article.get('articleBody'))
+    
+    for field, keys in META_FIELDS.items():
+        if data.get(field):
+            continue
+        for key in keys:
+            value = meta.get(key, '')
+            # article:author is often a profile URL rather than a name
+            if field == 'author' and value.startswith(('http://', 'https://')):
+                continue
+            if value:
+                data[field] = value
+                break
+    
+    return {field: value for field, value in data.items() if value}
@@ -0,0 +1,120 @@
+"""
+Shared test setup and stubs.
+
+The API modules are imported from the parent directory, and every cache and
+index they create by default goes to a temporary directory.
+"""
+import io
+import os
+import sys
+import tempfile
+
+import requests
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+os.environ.setdefault('SCRAPER_CACHE_DIR', tempfile.mkdtemp())
+
+import logging
+logging.disable(logging.WARNING)
+
+FEED_URL = 'https://news.example.com/feed/'
+
+
+class StubRaw:
+    """Just enough of urllib3.HTTPResponse for fetch_bounded."""
+    
+    def __init__(self, body):
+        self.stream = io.BytesIO(body)
+    
+    def read1(self, amt=None, decode_content=None):
+        return self.stream.read1(amt)
+
+
+class StubResponse:
+    """Just enough of requests.Response for fetch_bounded."""
+    
+    def __init__(self, body, url=FEED_URL, content_type='application/rss+xml; charset=utf-8', status_code=200,
+                 location=None):
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        if location:
+            self.headers['Location'] = location
+        self.url = url
+        self.raw = StubRaw(body)
+        self.is_redirect = location is not None
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+    
+    def close(self):
+        pass
+
+
+def rss(items):
+    """Build an RSS 2.0 feed from (title, link, guid, pubDate) tuples."""
+    entries = ''.join(
+        f'<item><title>{title}</title><link>{link}</link><guid>{guid}</guid><pubDate>{published}</pubDate></item>'
+        for title, link, guid, published in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>News</title>{entries}</channel></rss>'.encode()
+
+
+class StubSession:
+    """Serves a feed of stories S1..Sn, newest first."""
+    
+    def __init__(self, count):
+        self.count = count
+        self.requests = 0
+    
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.requests += 1
+        return StubResponse(rss(
+            (f'Story {i}', f'https://news.example.com/s{i}', f'S{i}', f'Mon, 01 Jan 2024 00:{i:02d}:00 +0000')
+            for i in range(self.count, 0, -1)
+        ))
+    
+    def head(self, url, allow_redirects=True, timeout=None):
+        return StubResponse(b'', url, 'text/html')
+
+
+class StubProviderResponse:
+    """Just enough of requests.Response for the AI providers: a JSON body or streamed lines."""
+    
+    def __init__(self, payload=None, lines=(), status_code=200):
+        self.payload = payload
+        self.lines = list(lines)
+        self.status_code = status_code
+        self.encoding = None
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+    
+    def json(self):
+        return self.payload
+    
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class StubProviderTransport:
+    """Records AI provider calls and answers each with respond(url, payload)."""
+    
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+    
+    def post(self, url, timeout=None, headers=None, json=None, stream=False):
+        self.calls.append({'url': url, 'headers': headers, 'json': json, 'stream': stream})
+        return self.respond(url, json)
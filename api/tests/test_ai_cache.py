@@ -0,0 +1,134 @@
+"""
+Tests for the AI provider response cache.
+
+Usage:
+    python -m pytest tests
+"""
+import json
+import unittest
+
+from conftest import StubProviderResponse
+
+import app as api
+from ai_models import OpenAIGenerator, GeminiGenerator, DeepSeekGenerator
+from result_cache import MemoryCache
+
+
+class StubTransport:
+    """
+    Answers rewrite calls with `text` and keyword extraction calls with a tag list,
+    failing with the next queued status if any, and records the rewrite calls.
+    """
+    
+    def __init__(self, text='<h1>Rewritten</h1><p>Body</p>'):
+        self.text = text
+        self.calls = []
+        self.statuses = []
+    
+    def post(self, url, timeout=None, **kwargs):
+        payload = kwargs.get('json')
+        if 'relevant tags/keywords' in json.dumps(payload):
+            text = '["politics", "budget"]'
+        else:
+            self.calls.append((url, payload))
+            text = self.text
+        status = self.statuses.pop(0) if self.statuses else 200
+        return StubProviderResponse({
+            'choices': [{'message': {'content': text}}],
+            'candidates': [{'content': {'parts': [{'text': text}]}}]
+        }, status_code=status)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.transport = StubTransport()
+        self.cache = MemoryCache(60, 100)
+        self.openai = OpenAIGenerator(self.transport, self.cache)
+    
+    def generate(self, generator, api_key='key-1', cache=None, **kwargs):
+        kwargs.setdefault('tone', 'default')
+        return generator.with_api_key(api_key, cache).generate_content('Original body', 'Original title', **kwargs)
+    
+    def test_identical_requests_are_served_from_the_cache(self):
+        first = self.generate(self.openai)
+        second = self.generate(self.openai, api_key='key-2')
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first['suggested_tags'], ['politics', 'budget'])
+        self.assertEqual(len(self.transport.calls), 1)
+        # The rewrite and the keyword extraction
+        self.assertEqual(self.cache.stats()['hits'], 2)
+    
+    def test_the_request_content_is_the_key(self):
+        self.generate(self.openai)
+        self.generate(self.openai, tone='lucknow')
+        self.generate(DeepSeekGenerator(self.transport, self.cache))
+        self.assertEqual(len(self.transport.calls), 3)
+        
+        # Tones without their own instruction render the same prompt, so they share an entry
+        self.generate(self.openai, tone='formal')
+        self.assertEqual(len(self.transport.calls), 3)
+    
+    def test_a_key_in_the_query_string_is_not_part_of_the_cache_key(self):
+        gemini = GeminiGenerator(self.transport, self.cache)
+        self.generate(gemini, api_key='key-1')
+        self.generate(gemini, api_key='key-2')
+        
+        self.assertEqual(len(self.transport.calls), 1)
+        self.assertIn('key=key-1', self.transport.calls[0][0])
+    
+    def test_bypass_and_refresh(self):
+        self.generate(self.openai)
+        
+        self.generate(self.openai, cache='bypass')
+        self.assertEqual(len(self.transport.calls), 2)
+        
+        self.transport.text = '<h1>Updated</h1><p>Body</p>'
+        self.generate(self.openai, cache=False)
+        self.assertEqual(self.generate(self.openai)['title'], 'Rewritten')
+        
+        self.generate(self.openai, cache='refresh')
+        self.assertEqual(self.generate(self.openai)['title'], 'Updated')
+        self.assertEqual(len(self.transport.calls), 4)
+    
+    def test_failed_calls_are_not_cached(self):
+        self.transport.statuses = [429]
+        self.assertIn('error', self.generate(self.openai))
+        
+        self.assertNotIn('error', self.generate(self.openai))
+        self.assertEqual(len(self.transport.calls), 2)
+    
+    def test_unknown_cache_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.openai.with_api_key('key-1', 'sometimes')
+
+
+class ResponseCacheRouteTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = api.app.test_client()
+    
+    def test_generate_uses_the_shared_cache(self):
+        transport = StubTransport()
+        generator = api.ai_generators['openai']
+        original = generator.transport, generator.response_cache
+        generator.transport, generator.response_cache = transport, MemoryCache(60, 100)
+        try:
+            request = {'content': 'Route body', 'title': 'Route title', 'model': 'openai', 'api_key': 'key'}
+            self.assertEqual(self.client.post('/ai/generate', json=request).status_code, 200)
+            self.assertEqual(self.client.post('/ai/generate', json=dict(request, api_key='other')).status_code, 200)
+            self.assertEqual(len(transport.calls), 1)
+            
+            response = self.client.post('/ai/generate', json=dict(request, cache='sometimes'))
+            self.assertEqual(response.status_code, 400)
+        finally:
+            generator.transport, generator.response_cache = original
+    
+    def test_stats(self):
+        stats = self.client.get('/ai/cache/stats').get_json()
+        self.assertEqual(stats['enabled'], api.ai_response_cache is not None)
+
+
+if __name__ == '__main__':
+    unittest.main()
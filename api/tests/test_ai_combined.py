@@ -0,0 +1,128 @@
+"""
+Tests for generating the article, tags and SEO data in one provider call (generate_combined).
+
+Usage:
+    python -m pytest tests
+"""
+import json
+import unittest
+
+from conftest import StubProviderResponse, StubProviderTransport
+
+import app as api
+from ai_models import ClaudeGenerator, OpenAIGenerator, _parse_json_object
+from result_cache import MemoryCache
+
+ARTICLE = {
+    'title': 'River at dawn',
+    'content': '<h1>River at dawn</h1><p>The water rose overnight.</p>',
+    'tags': ['rivers', 'floods'],
+    'seo_title': 'River rises at dawn',
+    'categories': 'News, Weather',
+    'meta_description': 'The river rose overnight.'
+}
+
+
+def answering(text):
+    return StubProviderTransport(lambda url, payload: StubProviderResponse({
+        'choices': [{'message': {'content': text}}],
+        'content': [{'text': text}]
+    }))
+
+
+def bound(generator_class, transport):
+    return generator_class(transport, MemoryCache(60, 100)).with_api_key('key-1')
+
+
+class ParseJsonObjectTest(unittest.TestCase):
+    
+    def test_bare_fenced_and_surrounded_json(self):
+        self.assertEqual(_parse_json_object('{"a": 1}'), {'a': 1})
+        self.assertEqual(_parse_json_object('Here you go:\n```json\n{"a": 1}\n```'), {'a': 1})
+        self.assertEqual(_parse_json_object('Sure! {"a": 1} Hope that helps.'), {'a': 1})
+    
+    def test_raw_newlines_inside_strings(self):
+        self.assertEqual(_parse_json_object('{"content": "<p>One</p>\n<p>Two</p>"}'),
+                         {'content': '<p>One</p>\n<p>Two</p>'})
+    
+    def test_no_object(self):
+        for text in ('', 'No JSON here', '["a", "b"]'):
+            with self.assertRaises(ValueError):
+                _parse_json_object(text)
+
+
+class GenerateCombinedTest(unittest.TestCase):
+    
+    def test_one_provider_call_for_every_field(self):
+        transport = answering(json.dumps(ARTICLE))
+        
+        result = bound(OpenAIGenerator, transport).generate_combined('Body', 'Title')
+        
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual(transport.calls[0]['json']['response_format'], {'type': 'json_object'})
+        self.assertEqual(result, {
+            'title': 'River at dawn',
+            'content': '<h1>River at dawn</h1><p>The water rose overnight.</p>',
+            'word_count': 6,
+            'suggested_tags': ['rivers', 'floods'],
+            'seo_title': 'River rises at dawn',
+            'tags': ['rivers', 'floods'],
+            'categories': ['News', 'Weather'],
+            'meta_description': 'The river rose overnight.'
+        })
+    
+    def test_missing_fields_fall_back(self):
+        answer = '```json\n' + json.dumps({'content': '<h1>From the heading</h1><p>Text.</p>'}) + '\n```'
+        
+        result = bound(ClaudeGenerator, answering(answer)).generate_combined('Body', 'Title')
+        
+        self.assertEqual((result['title'], result['seo_title']), ('From the heading', 'From the heading'))
+        self.assertEqual((result['tags'], result['categories'], result['meta_description']), ([], [], ''))
+    
+    def test_empty_content_is_an_error(self):
+        generator = bound(OpenAIGenerator, answering(json.dumps(dict(ARTICLE, content=' '))))
+        
+        self.assertEqual(generator.generate_combined('Body', 'Title'),
+                         {'error': 'Failed to generate content: The response has no article content'})
+    
+    def test_missing_key(self):
+        transport = answering(json.dumps(ARTICLE))
+        
+        self.assertEqual(OpenAIGenerator(transport, MemoryCache(60, 100)).generate_combined('Body', 'Title'),
+                         {'error': 'OpenAI API key is required'})
+        self.assertEqual(transport.calls, [])
+
+
+class GenerateCombinedRouteTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.generator = api.ai_generators['openai']
+        self.original = self.generator.transport
+        self.generator.transport = answering(json.dumps(ARTICLE))
+        self.client = api.app.test_client()
+    
+    def tearDown(self):
+        self.generator.transport = self.original
+    
+    def post(self, **fields):
+        return self.client.post('/ai/generate_combined', json=dict(
+            {'content': 'Body', 'title': 'Title', 'model': 'openai', 'api_key': 'key-1', 'cache': 'bypass'}, **fields
+        ))
+    
+    def test_returns_the_combined_result(self):
+        response = self.post()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['seo_title'], 'River rises at dawn')
+        self.assertEqual(len(self.generator.transport.calls), 1)
+    
+    def test_bad_requests(self):
+        self.assertEqual(self.post(model='unknown').get_json(), {'error': 'Unknown AI model: unknown'})
+        self.assertEqual(self.post(model='unknown').status_code, 400)
+        response = self.client.post('/ai/generate_combined', json={'title': 'Title', 'model': 'openai', 'api_key': 'k'})
+        self.assertEqual((response.status_code, response.get_json()),
+                         (400, {'error': 'Missing required fields: content'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for binding AI credentials per request (with_api_key) instead of mutating shared generators.
+
+Usage:
+    python -m pytest tests
+"""
+import json
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import StubProviderResponse, StubProviderTransport
+
+import app as api
+from ai_models import ClaudeGenerator, DallEImageGenerator
+from result_cache import MemoryCache
+
+
+def slow_article(url, payload):
+    # Long enough for concurrent requests to overlap
+    time.sleep(0.02)
+    text = 'tags' if 'relevant tags/keywords' in json.dumps(payload) else '<h1>Rewritten</h1>'
+    return StubProviderResponse({
+        'choices': [{'message': {'content': text}}],
+        'content': [{'text': text}],
+        'data': [{'url': 'https://images.example.com/1.png'}]
+    })
+
+
+class WithApiKeyTest(unittest.TestCase):
+    
+    def test_copies_share_the_transport_and_cache_but_not_the_key(self):
+        transport = StubProviderTransport(slow_article)
+        cache = MemoryCache(60, 100)
+        template = ClaudeGenerator(transport, cache)
+        
+        bound = template.with_api_key('key-1', 'refresh')
+        
+        self.assertIsNone(template.api_key)
+        self.assertEqual(template.cache_mode, 'use')
+        self.assertEqual((bound.api_key, bound.cache_mode), ('key-1', 'refresh'))
+        self.assertIs(bound.transport, transport)
+        self.assertIs(bound.response_cache, cache)
+    
+    def test_calls_send_the_bound_key(self):
+        transport = StubProviderTransport(slow_article)
+        template = ClaudeGenerator(transport, MemoryCache(60, 100))
+        
+        template.with_api_key('key-1').generate_content('Body', 'Title')
+        self.assertEqual(template.generate_content('Body', 'Title'), {'error': 'Claude API key is required'})
+        
+        self.assertEqual({call['headers']['x-api-key'] for call in transport.calls}, {'key-1'})
+    
+    def test_image_generator(self):
+        transport = StubProviderTransport(slow_article)
+        template = DallEImageGenerator(transport)
+        
+        result = template.with_api_key('key-1').generate_image('A river at dawn')
+        
+        self.assertEqual(result['url'], 'https://images.example.com/1.png')
+        self.assertEqual(transport.calls[0]['headers']['Authorization'], 'Bearer key-1')
+        self.assertIsNone(template.api_key)
+
+
+class ConcurrentKeysRouteTest(unittest.TestCase):
+    
+    def test_concurrent_requests_keep_their_own_keys(self):
+        transport = StubProviderTransport(slow_article)
+        generator = api.ai_generators['openai']
+        original = generator.transport
+        generator.transport = transport
+        client = api.app.test_client()
+        
+        def generate(index):
+            return client.post('/ai/generate', json={
+                'content': f'Body for caller {index}', 'title': 'Title', 'model': 'openai',
+                'api_key': f'key-{index}', 'cache': 'bypass'
+            }).status_code
+        
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                statuses = list(executor.map(generate, range(8)))
+        finally:
+            generator.transport = original
+        
+        self.assertEqual(statuses, [200] * 8)
+        self.assertIsNone(generator.api_key)
+        rewrites = [call for call in transport.calls if 'Body for caller' in json.dumps(call['json'])]
+        self.assertEqual(len(rewrites), 8)
+        for call in rewrites:
+            index = json.dumps(call['json']).split('Body for caller ')[1][0]
+            self.assertEqual(call['headers']['Authorization'], f'Bearer key-{index}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Tests for streaming AI generation (stream_content, iter_sse and /ai/generate/stream).
+
+Usage:
+    python -m pytest tests
+"""
+import json
+import unittest
+
+from conftest import StubProviderResponse, StubProviderTransport
+
+import app as api
+from ai_models import ClaudeGenerator, OpenAIGenerator
+from ai_transport import iter_sse
+from result_cache import MemoryCache
+
+
+def chat_deltas(*texts):
+    lines = []
+    for text in texts:
+        lines += ['data: ' + json.dumps({'choices': [{'delta': {'content': text}}]}), '']
+    return lines + ['data: [DONE]', '']
+
+
+def claude_events(*texts, error=None):
+    lines = ['event: message_start', 'data: {"type": "message_start"}', '']
+    for text in texts:
+        lines += ['event: content_block_delta', 'data: ' + json.dumps({'delta': {'text': text}}), '']
+    if error:
+        lines += ['event: error', 'data: ' + json.dumps({'error': {'message': error}}), '']
+    return lines + ['event: message_stop', 'data: {}', '']
+
+
+def provider(stream_lines):
+    """Streams the article, and answers the follow-up tag request with a JSON list."""
+    def respond(url, payload):
+        if payload.get('stream'):
+            return StubProviderResponse(lines=stream_lines)
+        return StubProviderResponse({
+            'choices': [{'message': {'content': '["rivers", "dawn"]'}}],
+            'content': [{'text': '["rivers", "dawn"]'}]
+        })
+    return StubProviderTransport(respond)
+
+
+class IterSseTest(unittest.TestCase):
+    
+    def test_events_and_multiline_data(self):
+        response = StubProviderResponse(lines=[
+            ': keep-alive', 'event: update', 'data: first', 'data:second', '', 'data: {"a": 1}', '', 'data: tail'
+        ])
+        
+        self.assertEqual(list(iter_sse(response)), [('update', 'first\nsecond'), (None, '{"a": 1}'), (None, 'tail')])
+        self.assertEqual(response.encoding, 'utf-8')
+
+
+class StreamContentTest(unittest.TestCase):
+    
+    def test_openai_tokens_then_done(self):
+        transport = provider(chat_deltas('<h1>River', '</h1><p>At dawn.</p>'))
+        generator = OpenAIGenerator(transport, MemoryCache(60, 100)).with_api_key('key-1')
+        
+        events = list(generator.stream_content('Body', 'Title'))
+        
+        self.assertEqual([event['type'] for event in events], ['token', 'token', 'done'])
+        self.assertEqual(''.join(event['text'] for event in events[:-1]), '<h1>River</h1><p>At dawn.</p>')
+        self.assertEqual(events[-1]['title'], 'River')
+        self.assertEqual(events[-1]['content'], '<h1>River</h1><p>At dawn.</p>')
+        self.assertTrue(transport.calls[0]['stream'])
+    
+    def test_claude_tokens_then_done(self):
+        generator = ClaudeGenerator(provider(claude_events('<h1>River</h1>', '<p>At dawn.</p>')), MemoryCache(60, 100))
+        
+        events = list(generator.with_api_key('key-1').stream_content('Body', 'Title'))
+        
+        self.assertEqual([event['type'] for event in events], ['token', 'token', 'done'])
+        self.assertEqual(events[-1]['content'], '<h1>River</h1><p>At dawn.</p>')
+    
+    def test_errors_mid_stream_keep_the_partial_content(self):
+        generator = ClaudeGenerator(provider(claude_events('<h1>River</h1>', error='Overloaded')), MemoryCache(60, 100))
+        
+        events = list(generator.with_api_key('key-1').stream_content('Body', 'Title'))
+        
+        self.assertEqual(events[-1]['type'], 'error')
+        self.assertIn('Overloaded', events[-1]['error'])
+        self.assertEqual(events[-1]['content'], '<h1>River</h1>')
+    
+    def test_missing_key_is_an_error_event(self):
+        events = list(OpenAIGenerator(provider([]), MemoryCache(60, 100)).stream_content('Body', 'Title'))
+        
+        self.assertEqual(events, [{'type': 'error', 'error': 'OpenAI API key is required'}])
+
+
+class StreamRouteTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.generator = api.ai_generators['openai']
+        self.original = self.generator.transport
+        self.generator.transport = provider(chat_deltas('<h1>River</h1>', '<p>At dawn.</p>'))
+        self.client = api.app.test_client()
+    
+    def tearDown(self):
+        self.generator.transport = self.original
+    
+    def stream(self, **fields):
+        return self.client.post('/ai/generate/stream', json=dict(
+            {'content': 'Body', 'title': 'Title', 'model': 'openai', 'api_key': 'key-1'}, **fields
+        ))
+    
+    def test_server_sent_events(self):
+        response = self.stream()
+        
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        blocks = response.get_data(as_text=True).strip().split('\n\n')
+        self.assertEqual(blocks[0], 'event: token\ndata: {"text": "<h1>River</h1>"}')
+        self.assertTrue(blocks[-1].startswith('event: done\ndata: '))
+        self.assertEqual(json.loads(blocks[-1].split('data: ', 1)[1])['title'], 'River')
+    
+    def test_ndjson(self):
+        response = self.stream(format='ndjson')
+        
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([event['type'] for event in events], ['token', 'token', 'done'])
+    
+    def test_bad_requests(self):
+        self.assertIn('Unknown stream format', self.stream(format='xml').get_json()['error'])
+        self.assertEqual(self.stream(format='xml').status_code, 400)
+        self.assertEqual(self.stream(model='unknown').status_code, 400)
+        response = self.client.post('/ai/generate/stream', json={
+            'content': 'Body', 'title': 'Title', 'model': 'openai'
+        })
+        self.assertEqual(response.get_json(), {'error': 'Missing required fields: api_key'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the pooled AI provider transport.
+
+Usage:
+    python -m pytest tests
+"""
+import threading
+import unittest
+
+import app as api
+from ai_transport import ProviderTransport
+
+
+class RecordingSession:
+    """Stands in for requests.Session, recording posts."""
+    
+    def __init__(self):
+        self.posts = []
+        self.closed = False
+    
+    def post(self, url, **kwargs):
+        self.posts.append((url, kwargs))
+        return 'response'
+    
+    def close(self):
+        self.closed = True
+
+
+class RecordingTransport(ProviderTransport):
+    
+    def _create_session(self):
+        return RecordingSession()
+
+
+class ProviderTransportTest(unittest.TestCase):
+    
+    def test_one_pooled_session_per_host(self):
+        transport = ProviderTransport(pool_size=3, connect_retries=2)
+        
+        openai = transport.session('https://api.openai.com/v1/chat/completions')
+        self.assertIs(transport.session('https://API.openai.com/v1/images/generations'), openai)
+        self.assertIsNot(transport.session('https://api.anthropic.com/v1/messages'), openai)
+        
+        adapter = openai.get_adapter('https://api.openai.com')
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 3)
+        # Only connection failures are retried: a POST that reached the provider is never sent twice
+        self.assertEqual((adapter.max_retries.connect, adapter.max_retries.read, adapter.max_retries.status), (2, 0, 0))
+    
+    def test_concurrent_callers_share_the_session(self):
+        transport = ProviderTransport()
+        sessions = []
+        barrier = threading.Barrier(8)
+        
+        def get_session():
+            barrier.wait()
+            sessions.append(transport.session('https://api.deepseek.com/v1/chat/completions'))
+        
+        threads = [threading.Thread(target=get_session) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len({id(session) for session in sessions}), 1)
+    
+    def test_post_sets_timeouts(self):
+        transport = RecordingTransport(connect_timeout=5, read_timeout=90)
+        url = 'https://api.openai.com/v1/chat/completions'
+        
+        transport.post(url, json={'model': 'gpt-4o'})
+        transport.post(url, timeout=3, stream=True)
+        
+        posts = transport.session(url).posts
+        self.assertEqual(posts[0], (url, {'timeout': (5, 90), 'json': {'model': 'gpt-4o'}}))
+        self.assertEqual(posts[1], (url, {'timeout': 3, 'stream': True}))
+    
+    def test_close_drops_every_session(self):
+        transport = RecordingTransport()
+        session = transport.session('https://api.openai.com/')
+        
+        transport.close()
+        
+        self.assertTrue(session.closed)
+        self.assertIsNot(transport.session('https://api.openai.com/'), session)
+    
+    def test_the_application_shares_one_transport(self):
+        transports = {generator.transport for generator in api.ai_generators.values()}
+        transports.add(api.image_generator.transport)
+        self.assertEqual(transports, {api.ai_transport})
+
+
+if __name__ == '__main__':
+    unittest.main()
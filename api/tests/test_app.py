@@ -0,0 +1,37 @@
+"""
+Tests for the API routes' request handling.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+import app as api
+
+
+class ConfirmSeenRouteTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = api.app.test_client()
+    
+    def post(self, data):
+        return self.client.post('/scrape/rss/seen', json=data)
+    
+    def test_records_links(self):
+        response = self.post({'links': ['https://news.example.com/a?utm_source=x'], 'seen_scope': 'route-test'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'recorded': 1})
+    
+    def test_rejects_links_that_are_not_strings(self):
+        for links in ([1], ['https://news.example.com/b', None], [''], ['  '], [{'link': 'x'}]):
+            response = self.post({'links': links})
+            self.assertEqual(response.status_code, 400, links)
+            self.assertIn('error', response.get_json())
+    
+    def test_rejects_a_scope_that_is_not_a_string(self):
+        response = self.post({'links': ['https://news.example.com/c'], 'seen_scope': ['site']})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
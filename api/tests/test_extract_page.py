@@ -0,0 +1,70 @@
+"""
+Tests for single-parse page extraction (WebScraper's extraction stages).
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from lxml import html as lxml_html
+
+from extraction_profiles import ProfileRegistry
+from scraper import extract_page, detect_encoding, parse_html
+
+URL = 'https://news.example.com/2024/story'
+
+PARAGRAPHS = ''.join(
+    f'<p>Paragraph {index} with a <a href="/related/{index}">related link</a> &amp; <b>bold</b> text, '
+    'long enough for the extractor to take it as the main content of the page.</p>'
+    for index in range(6)
+)
+
+
+class EncodingTest(unittest.TestCase):
+    
+    def test_header_charset_wins(self):
+        self.assertEqual(detect_encoding({'Content-Type': 'text/html; charset=ISO-8859-1'}, b'<meta charset="utf-8">'),
+                         'iso8859-1')
+    
+    def test_meta_charset_is_used_without_a_header(self):
+        body = '<html><head><meta http-equiv="Content-Type" content="text/html; charset=windows-1252"></head>'.encode()
+        self.assertEqual(detect_encoding({'Content-Type': 'text/html'}, body), 'cp1252')
+    
+    def test_bytes_are_parsed_in_their_encoding(self):
+        body = '<html><body><h1>समाचार</h1></body></html>'.encode('utf-16')
+        tree = parse_html(body, 'utf-16')
+        self.assertEqual(tree.findtext('.//h1'), 'समाचार')
+
+
+class ExtractPageTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.profile = ProfileRegistry().default
+    
+    def extract(self, markup):
+        return extract_page(markup.encode(), 'utf-8', URL, self.profile, fetch_images=False, fetch_social_embeds=False)
+    
+    def test_selector_content_is_html(self):
+        result = self.extract(
+            '<html><body><h1>Title</h1><span class="author">Writer</span><time>2024-05-01</time>'
+            f'<div class="entry-content">{PARAGRAPHS}</div></body></html>'
+        )
+        self.assertEqual((result['title'], result['author'], result['date']), ('Title', 'Writer', '2024-05-01'))
+        self.assertTrue(result['content'].startswith('<div class="entry-content"><p>Paragraph 0'))
+    
+    def test_trafilatura_fallback_content_is_html(self):
+        # No selector matches this layout, so the trafilatura fallback extracts it
+        result = self.extract(
+            '<html><head><title>Page Title</title></head><body>'
+            f'<div class="story-body"><h2>Section</h2>{PARAGRAPHS}</div></body></html>'
+        )
+        content = lxml_html.fragment_fromstring(result['content'], create_parent='div')
+        
+        self.assertEqual(len(content.findall('p')), 6)
+        self.assertEqual(content.find('p/a').get('href'), 'https://news.example.com/related/0')
+        self.assertEqual(content.findtext('p/strong'), 'bold')
+        self.assertNotIn('](', result['content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for running extraction in the process pool (WebScraper with extract_mode='process').
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+from conftest import StubResponse
+
+from extraction_profiles import ProfileRegistry
+from http_cache import ValidatorStore
+from result_cache import MemoryCache
+from scraper import WebScraper
+
+PAGE = (
+    '<html><body><h1>Headline</h1><span class="author">Reporter</span><div class="entry-content">'
+    + ''.join(f'<p>Paragraph {index}, long enough to be taken as the main content of the page.</p>' for index in range(6))
+    + '<figure><img src="/photo.jpg"><figcaption>Photo</figcaption></figure></div></body></html>'
+).encode()
+
+
+class PageSession:
+    
+    def get(self, url, headers=None, timeout=None, stream=False):
+        return StubResponse(PAGE, url, 'text/html; charset=utf-8')
+
+
+def create_scraper(**options):
+    scraper = WebScraper(
+        validator_store=ValidatorStore(os.path.join(tempfile.mkdtemp(), 'validators.db')),
+        profiles=ProfileRegistry(), result_cache=MemoryCache(60, 100), **options
+    )
+    scraper.session = PageSession()
+    return scraper
+
+
+class ProcessPoolTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.pooled = create_scraper(extract_mode='process', extract_workers=1)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.pooled.close()
+    
+    def test_matches_extraction_on_the_request_thread(self):
+        url = 'https://news.example.com/story'
+        
+        pooled = self.pooled.scrape(url, cache='bypass')
+        
+        self.assertNotIn('error', pooled)
+        self.assertEqual(pooled, create_scraper().scrape(url, cache='bypass'))
+        self.assertEqual(pooled['images'][0]['caption'], 'Photo')
+    
+    def test_oversized_results_are_rejected_in_the_worker(self):
+        limit = self.pooled.max_result_bytes
+        self.pooled.max_result_bytes = 100
+        try:
+            result = self.pooled.scrape('https://news.example.com/large', cache='bypass')
+        finally:
+            self.pooled.max_result_bytes = limit
+        
+        self.assertIn('Extraction result too large', result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for extraction profile selection.
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import json
+import tempfile
+import unittest
+
+from lxml import html as lxml_html
+from extraction_profiles import ProfileRegistry, ExtractionProfile, DEFAULT_SELECTORS
+
+# The default selectors as the WordPress client sends them
+CLIENT_DEFAULTS = {
+    'title': 'h1, .entry-title, .article-title',
+    'content': '.entry-content, article, .post-content',
+    'author': '.author, .byline',
+    'date': '.published, .post-date, time',
+}
+
+BYLINE_ONLY = '<html><body><h1>A</h1><div class="byline">By Someone</div></body></html>'
+AUTHOR_AND_BYLINE = (
+    '<html><body><h1>B</h1><div class="byline">By Real Author | 2 min read | Share</div>'
+    '<span class="author">Real Author</span></body></html>'
+)
+
+
+class ProfileSelectionTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.registry = ProfileRegistry([
+            ExtractionProfile('example', {'author': '.writer'}, domains=['example.com'])
+        ])
+    
+    def test_default_selectors_use_the_host_profile(self):
+        self.assertIs(self.registry.for_request('www.example.com', CLIENT_DEFAULTS), self.registry.for_host('example.com'))
+        self.assertIs(self.registry.for_request('other.org', CLIENT_DEFAULTS), self.registry.default)
+        self.assertIs(self.registry.for_request('other.org', DEFAULT_SELECTORS), self.registry.default)
+    
+    def test_custom_selectors_are_used(self):
+        profile = self.registry.for_request('example.com', {'author': '.by'})
+        self.assertEqual(profile.name, 'custom')
+    
+    def test_custom_profiles_do_not_learn_across_sites(self):
+        selectors = dict(CLIENT_DEFAULTS, title='h1')
+        self.registry.for_request('a.com', selectors).extract(lxml_html.fromstring(BYLINE_ONLY), 'author')
+        author = self.registry.for_request('b.com', selectors).extract(lxml_html.fromstring(AUTHOR_AND_BYLINE), 'author')
+        self.assertEqual(author, 'Real Author')
+
+
+
+class ProfileLearningTest(unittest.TestCase):
+    
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), 'profiles.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'profiles': [{
+                'name': 'publisher',
+                'domains': ['publisher.example'],
+                'selectors': {'title': ['.headline', 'h1.story-title']}
+            }]}, f)
+        self.profile = ProfileRegistry.from_file(path).for_host('www.publisher.example')
+    
+    def title(self, markup):
+        return self.profile.extract(lxml_html.fromstring(markup), 'title')
+    
+    def test_domain_profile_tries_the_last_matched_selector_first(self):
+        self.assertEqual(self.profile.name, 'publisher')
+        self.assertEqual(self.title('<html><body><h1 class="story-title">Story</h1></body></html>'), 'Story')
+        self.assertEqual(self.profile.last_matched['title'], 1)
+        
+        # Both match now: the learned selector wins over priority order
+        both = '<html><body><p class="headline">Teaser</p><h1 class="story-title">Story</h1></body></html>'
+        self.assertEqual(self.title(both), 'Story')
+    
+    def test_falls_back_when_the_learned_selector_stops_matching(self):
+        self.title('<html><body><h1 class="story-title">Story</h1></body></html>')
+        self.assertEqual(self.title('<html><body><p class="headline">Redesign</p></body></html>'), 'Redesign')
+        self.assertEqual(self.profile.last_matched['title'], 0)
+    
+    def test_shipped_file_loads(self):
+        registry = ProfileRegistry.from_file()
+        self.assertEqual(registry.default.name, 'default')
+        self.assertFalse(registry.default.learn)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests for concurrent multi-feed polling (RssScraper.scrape_feeds and /scrape/rss/batch).
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import time
+import tempfile
+import unittest
+
+from conftest import StubSession
+
+import app as api
+from http_cache import ValidatorStore
+from link_resolver import LinkResolver
+from result_cache import MemoryCache
+from seen_index import SeenIndex
+from scraper import RssScraper
+
+
+class SlowSession(StubSession):
+    """A feed server that takes `delay` seconds per request."""
+    
+    def __init__(self, count, delay):
+        super().__init__(count)
+        self.delay = delay
+    
+    def get(self, url, headers=None, timeout=None, stream=False):
+        time.sleep(self.delay)
+        return super().get(url, headers, timeout, stream)
+
+
+class ScrapeFeedsTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.session = StubSession(5)
+        self.scraper = RssScraper(
+            validator_store=ValidatorStore(os.path.join(tmp, 'validators.db')),
+            seen_index=SeenIndex(os.path.join(tmp, 'seen.db')),
+            max_concurrency=4, per_host=1,
+            link_resolver=LinkResolver(self.session, cache=MemoryCache(60, 100))
+        )
+        self.scraper.session = self.session
+    
+    def test_results_are_keyed_by_id_url_or_index(self):
+        results = self.scraper.scrape_feeds([
+            {'id': 'politics', 'feed_url': 'https://a.example.com/feed/', 'limit': 2},
+            {'feed_url': 'https://b.example.com/feed/', 'limit': 1},
+            {'limit': 1}
+        ])
+        
+        self.assertEqual(set(results), {'politics', 'https://b.example.com/feed/', '2'})
+        self.assertEqual([item['title'] for item in results['politics']['items']], ['Story 5', 'Story 4'])
+        self.assertEqual(len(results['https://b.example.com/feed/']['items']), 1)
+        self.assertEqual(results['2']['error'], 'Feed URL is required')
+    
+    def test_the_same_feed_twice_keeps_both_results(self):
+        results = self.scraper.scrape_feeds([
+            {'feed_url': 'https://a.example.com/feed/', 'keywords': 'Story 5'},
+            {'feed_url': 'https://a.example.com/feed/', 'keywords': 'Story 3'}
+        ])
+        
+        self.assertEqual(set(results), {'https://a.example.com/feed/', '1'})
+        self.assertEqual([item['title'] for item in results['https://a.example.com/feed/']['items']], ['Story 5'])
+        self.assertEqual([item['title'] for item in results['1']['items']], ['Story 3'])
+    
+    def test_deadline_bounds_the_whole_batch(self):
+        self.scraper.session = SlowSession(5, delay=0.3)
+        # One slot per host, so these feeds are fetched one after another
+        feeds = [{'id': str(index), 'feed_url': f'https://a.example.com/feed/{index}'} for index in range(6)]
+        
+        started = time.monotonic()
+        results = self.scraper.scrape_feeds(feeds, deadline=0.5)
+        elapsed = time.monotonic() - started
+        
+        self.assertLess(elapsed, 1.5)
+        fetched = [key for key, result in results.items() if 'error' not in result]
+        self.assertTrue(1 <= len(fetched) < 6, fetched)
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(results[key]['feed_url'].startswith('https://a.example.com/feed/')
+                            for key in results if key not in fetched))
+
+
+class ScrapeFeedsRouteTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = api.app.test_client()
+    
+    def test_rejects_empty_oversized_and_ambiguous_batches(self):
+        self.assertEqual(self.client.post('/scrape/rss/batch', json={'feeds': []}).status_code, 400)
+        
+        feeds = [f'https://a.example.com/feed/{index}' for index in range(api.MAX_BATCH_FEEDS + 1)]
+        response = self.client.post('/scrape/rss/batch', json={'feeds': feeds})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Too many feeds', response.get_json()['error'])
+        
+        response = self.client.post('/scrape/rss/batch', json={'feeds': [
+            {'id': 'x', 'feed_url': 'https://a.example.com/feed/'},
+            {'id': 'x', 'feed_url': 'https://b.example.com/feed/'}
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('unique', response.get_json()['error'])
+    
+    def test_returns_one_result_per_feed(self):
+        session = api.rss_scraper.session
+        api.rss_scraper.session = StubSession(3)
+        try:
+            response = self.client.post('/scrape/rss/batch', json={
+                'feeds': ['https://route.example.com/feed/', {'id': 'second', 'feed_url': 'https://route.example.com/other/'}],
+                'timeout': 5
+            })
+        finally:
+            api.rss_scraper.session = session
+        
+        self.assertEqual(response.status_code, 200)
+        feeds = response.get_json()['feeds']
+        self.assertEqual(set(feeds), {'https://route.example.com/feed/', 'second'})
+        self.assertEqual(len(feeds['second']['items']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
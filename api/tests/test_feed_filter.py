@@ -0,0 +1,66 @@
+"""
+Tests for lazy keyword-filtered feed iteration (RssScraper.scrape_feed with keywords).
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+from conftest import FEED_URL, StubSession
+
+from http_cache import ValidatorStore
+from link_resolver import LinkResolver
+from result_cache import MemoryCache
+from seen_index import SeenIndex
+from scraper import RssScraper
+
+
+class FeedFilterTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        session = StubSession(10)
+        self.scraper = RssScraper(
+            validator_store=ValidatorStore(os.path.join(tmp, 'validators.db')),
+            seen_index=SeenIndex(os.path.join(tmp, 'seen.db')),
+            link_resolver=LinkResolver(session, cache=MemoryCache(60, 100))
+        )
+        self.scraper.session = session
+    
+    def scrape(self, limit, keywords='', **options):
+        result = self.scraper.scrape_feed(FEED_URL, limit, keywords, **options)
+        self.assertNotIn('error', result)
+        return [item['title'] for item in result['items']], result
+    
+    def test_limit_is_filled_after_filtering(self):
+        titles, result = self.scrape(2, 'Story 9, Story 7, Story 5')
+        
+        self.assertEqual(titles, ['Story 9', 'Story 7'])
+        # Story 10 to Story 7: nothing past the second match is looked at
+        self.assertEqual(result['scanned'], 4)
+        self.assertEqual(result['keyword_hits'], {'Story 9': 1, 'Story 7': 1, 'Story 5': 0})
+    
+    def test_max_scan_bounds_the_entries_looked_at(self):
+        titles, result = self.scrape(3, 'Story 9, Story 2', max_scan=5)
+        
+        self.assertEqual(titles, ['Story 9'])
+        self.assertEqual(result['scanned'], 5)
+    
+    def test_excluded_entries_do_not_count_towards_the_limit(self):
+        titles, result = self.scrape(2, exclude_keywords='Story 10, Story 9')
+        
+        self.assertEqual(titles, ['Story 8', 'Story 7'])
+        self.assertEqual(result['keyword_hits'], {'Story 10': 1, 'Story 9': 1})
+    
+    def test_unfiltered_feeds_report_no_keyword_hits(self):
+        titles, result = self.scrape(3)
+        
+        self.assertEqual(titles, ['Story 10', 'Story 9', 'Story 8'])
+        self.assertEqual(result['scanned'], 3)
+        self.assertNotIn('keyword_hits', result)
+
+
+if __name__ == '__main__':
+    unittest.main()
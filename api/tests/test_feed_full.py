@@ -0,0 +1,100 @@
+"""
+Tests for full-article prefetch of feed items (RssScraper.scrape_feed with fetch_full=True).
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import tempfile
+import threading
+import unittest
+
+from conftest import FEED_URL, StubResponse, rss
+
+from extraction_profiles import ProfileRegistry
+from http_cache import ValidatorStore
+from link_resolver import LinkResolver
+from result_cache import MemoryCache
+from seen_index import SeenIndex
+from scraper import RssScraper, WebScraper
+
+PARAGRAPHS = ''.join(
+    f'<p>Paragraph {index} of the article, long enough for the extractor to take it as the main content.</p>'
+    for index in range(6)
+)
+
+ITEMS = [
+    ('Budget passed', 'https://news.example.com/budget?utm_source=rss', 'B1', 'Mon, 01 Jan 2024 00:03:00 +0000'),
+    ('Budget passed (update)', 'https://news.example.com/budget', 'B2', 'Mon, 01 Jan 2024 00:02:00 +0000'),
+    ('Cup final', 'https://news.example.com/final', 'C1', 'Mon, 01 Jan 2024 00:01:00 +0000')
+]
+
+
+class SiteSession:
+    """Serves the feed and its articles, counting article requests by path."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}
+    
+    def get(self, url, headers=None, timeout=None, stream=False):
+        if url == FEED_URL:
+            return StubResponse(rss(ITEMS))
+        path = url.split('?')[0].rsplit('/', 1)[-1]
+        with self.lock:
+            self.pages[path] = self.pages.get(path, 0) + 1
+        body = f'<html><body><h1>Article {path}</h1><div class="entry-content">{PARAGRAPHS}</div></body></html>'
+        return StubResponse(body.encode(), url, 'text/html; charset=utf-8')
+    
+    def head(self, url, allow_redirects=True, timeout=None):
+        return StubResponse(b'', url, 'text/html')
+
+
+class FetchFullTest(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.session = SiteSession()
+        web_scraper = WebScraper(
+            validator_store=ValidatorStore(os.path.join(tmp, 'pages.db')),
+            profiles=ProfileRegistry(), result_cache=MemoryCache(60, 100)
+        )
+        web_scraper.session = self.session
+        self.scraper = RssScraper(
+            validator_store=ValidatorStore(os.path.join(tmp, 'validators.db')),
+            seen_index=SeenIndex(os.path.join(tmp, 'seen.db')),
+            web_scraper=web_scraper,
+            link_resolver=LinkResolver(self.session, cache=MemoryCache(60, 100))
+        )
+        self.scraper.session = self.session
+    
+    def test_items_carry_their_article(self):
+        result = self.scraper.scrape_feed(FEED_URL, 10, fetch_full=True)
+        
+        self.assertNotIn('error', result)
+        items = {item['title']: item for item in result['items']}
+        self.assertEqual(items['Budget passed']['article']['title'], 'Article budget')
+        self.assertEqual(items['Cup final']['article']['title'], 'Article final')
+        self.assertIn('<p>Paragraph 0', items['Cup final']['article']['content'])
+    
+    def test_each_article_is_scraped_once(self):
+        result = self.scraper.scrape_feed(FEED_URL, 10, fetch_full=True)
+        items = {item['title']: item for item in result['items']}
+        
+        # Two items link to the same article, once with a tracking parameter
+        self.assertEqual(self.session.pages, {'budget': 1, 'final': 1})
+        self.assertEqual(items['Budget passed']['article'], items['Budget passed (update)']['article'])
+        
+        # Polling again serves the articles from the web scraper's result cache
+        self.scraper.scrape_feed(FEED_URL, 10, fetch_full=True)
+        self.assertEqual(self.session.pages, {'budget': 1, 'final': 1})
+    
+    def test_articles_are_only_fetched_when_asked_for(self):
+        result = self.scraper.scrape_feed(FEED_URL, 10)
+        
+        self.assertFalse(any('article' in item for item in result['items']))
+        self.assertEqual(self.session.pages, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
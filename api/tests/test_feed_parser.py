@@ -0,0 +1,101 @@
+"""
+Tests for the streaming RSS / Atom parser and description sanitizing.
+
+Usage:
+    python -m pytest tests
+"""
+import time
+import unittest
+
+from feed_parser import iter_feed, normalize_entry, sanitize_html
+
+HEADERS = {'content-location': 'https://news.example.com/feed/'}
+
+RSS = b'''<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel>
+  <title>News</title><link>https://news.example.com/</link><description>Latest</description>
+  <item>
+    <title>First</title><link>/2024/first</link><guid isPermaLink="false">id-1</guid>
+    <description>&lt;p onclick="x()"&gt;Body&lt;/p&gt;&lt;script&gt;bad()&lt;/script&gt;</description>
+    <pubDate>Wed, 01 May 2024 10:30:00 +0530</pubDate><dc:creator>Writer</dc:creator>
+    <media:content url="https://cdn.example/1.jpg" medium="image"/>
+  </item>
+  <item><guid>https://news.example.com/2024/second</guid><title>Second</title></item>
+</channel>
+</rss>'''
+
+ATOM = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xml:base="https://blog.example.com/">
+  <title>Blog</title><subtitle>Posts</subtitle><updated>2024-05-01T00:00:00Z</updated>
+  <entry>
+    <title>Post</title><id>tag:blog,1</id><link rel="alternate" href="posts/1"/>
+    <author><name>Author</name></author><summary>Summary</summary>
+    <published>2024-05-01T05:00:00Z</published>
+  </entry>
+</feed>'''
+
+RDF = b'''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/">
+  <channel rdf:about="https://old.example.com/"><title>Old</title><link>https://old.example.com/</link></channel>
+  <item rdf:about="https://old.example.com/1"><title>RDF item</title><link>https://old.example.com/1</link></item>
+</rdf:RDF>'''
+
+
+class FeedParserTest(unittest.TestCase):
+    
+    def test_rss_fields(self):
+        feed_info, entries = iter_feed(RSS, HEADERS)
+        first, second = [normalize_entry(entry) for entry in entries]
+        
+        self.assertEqual(feed_info['title'], 'News')
+        self.assertEqual(first['link'], 'https://news.example.com/2024/first')
+        self.assertEqual(first['author'], 'Writer')
+        self.assertEqual(first['description'], '<p>Body</p>')
+        self.assertEqual(time.strftime('%Y-%m-%d %H:%M', first['published_parsed']), '2024-05-01 05:00')
+        self.assertEqual(first['media_content'][0]['url'], 'https://cdn.example/1.jpg')
+        # A permalink GUID stands in for a missing link
+        self.assertEqual(second['link'], 'https://news.example.com/2024/second')
+    
+    def test_atom_fields(self):
+        feed_info, entries = iter_feed(ATOM, HEADERS)
+        entry = next(entries)
+        
+        self.assertEqual(feed_info['description'], 'Posts')
+        self.assertEqual(entry['link'], 'https://blog.example.com/posts/1')
+        self.assertEqual(entry['guid'], 'tag:blog,1')
+        self.assertEqual(entry['author'], 'Author')
+    
+    def test_other_formats_go_through_feedparser(self):
+        feed_info, entries = iter_feed(RDF, HEADERS)
+        entries = list(entries)
+        self.assertEqual([entry['title'] for entry in entries], ['RDF item'])
+        self.assertEqual(feed_info['title'], 'Old')
+    
+    def test_stopping_early_leaves_the_rest_unparsed(self):
+        # Everything after the first item is malformed; stopping at the first entry never reaches it
+        body = RSS.replace(b'<item><guid>', b'<item><broken attr=></item><guid>')
+        _, entries = iter_feed(body, HEADERS)
+        self.assertEqual(next(entries)['title'], 'First')
+
+
+class SanitizeHtmlTest(unittest.TestCase):
+    
+    def test_removes_active_content(self):
+        cleaned = sanitize_html('<p style="x" onmouseover="y()">Text</p><iframe src="https://x"></iframe>')
+        self.assertEqual(cleaned, '<p>Text</p>')
+    
+    def test_removes_script_urls_whatever_their_spelling(self):
+        for url in ('javascript:alert(1)', ' javascript:alert(1)', 'java\tscript:alert(1)', 'JaVaScRiPt:alert(1)',
+                    'java\nscript:alert(1)', '\x01javascript:alert(1)', 'java&#x09;script:alert(1)',
+                    'vbscript:msgbox(1)', 'data:text/html,<script>x</script>'):
+            cleaned = sanitize_html(f'<a href="{url}">link</a><img src="{url}">')
+            self.assertEqual(cleaned, '<a>link</a><img>', url)
+    
+    def test_keeps_safe_urls_and_plain_text(self):
+        self.assertEqual(sanitize_html('<a href="https://x.example/a">a</a>'), '<a href="https://x.example/a">a</a>')
+        self.assertEqual(sanitize_html('Plain & simple'), 'Plain & simple')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests for the background feed poller: its cadence and its subscriber queues.
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+from conftest import FEED_URL, StubSession
+
+from http_cache import ValidatorStore
+from seen_index import SeenIndex
+from scraper import RssScraper
+from link_resolver import LinkResolver
+from result_cache import MemoryCache
+from feed_poller import FeedPoller, next_interval
+
+
+class CadenceTest(unittest.TestCase):
+    
+    def test_polls_twice_per_typical_gap(self):
+        timestamps = [0, 600, 1200, 1800, 2400]
+        self.assertEqual(next_interval(timestamps, 900, True, min_interval=60, max_interval=3600), 300)
+    
+    def test_backs_off_when_nothing_is_new(self):
+        self.assertEqual(next_interval([], 600, False, min_interval=60, max_interval=3600), 900)
+    
+    def test_backs_off_faster_after_failures(self):
+        self.assertEqual(next_interval([], 600, False, failed=True, min_interval=60, max_interval=3600), 1200)
+    
+    def test_stays_within_bounds(self):
+        self.assertEqual(next_interval([0, 10], 900, True, min_interval=60, max_interval=3600), 60)
+        self.assertEqual(next_interval([], 3000, False, min_interval=60, max_interval=3600), 3600)
+
+
+class FeedPollerTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        session = StubSession(10)
+        self.scraper = RssScraper(
+            validator_store=ValidatorStore(os.path.join(self.tmp, 'validators.db')),
+            seen_index=SeenIndex(os.path.join(self.tmp, 'seen.db')),
+            link_resolver=LinkResolver(session, cache=MemoryCache(60, 100))
+        )
+        self.scraper.session = session
+        self.poller = self.new_poller()
+    
+    def new_poller(self):
+        return FeedPoller(self.scraper, os.path.join(self.tmp, 'poller.db'), first_poll_max=3)
+    
+    def poll(self):
+        # Make every feed due, whatever its learned interval
+        self.poller._conn.execute('UPDATE feeds SET next_poll = 0')
+        return self.poller.poll_due()
+    
+    def drained(self, subscriber):
+        return [entry['item']['title'] for entry in self.poller.drain(subscriber)]
+    
+    def test_first_poll_queues_only_the_latest_items(self):
+        self.poller.subscribe('site-a', [{'feed_url': FEED_URL}])
+        self.assertEqual(self.poll(), 1)
+        self.assertEqual(self.drained('site-a'), ['Story 10', 'Story 9', 'Story 8'])
+        
+        # Later polls queue everything new
+        self.scraper.session.count = 15
+        self.poll()
+        self.assertEqual(self.drained('site-a'), ['Story 15', 'Story 14', 'Story 13', 'Story 12', 'Story 11'])
+        self.poll()
+        self.assertEqual(self.drained('site-a'), [])
+    
+    def test_subscribers_share_one_fetch(self):
+        self.poller.subscribe('site-a', [{'feed_url': FEED_URL}])
+        self.poller.subscribe('site-b', [{'feed_url': FEED_URL, 'keywords': 'Story 9'}])
+        self.poll()
+        
+        self.assertEqual(self.scraper.session.requests, 1)
+        self.assertEqual(self.drained('site-a'), ['Story 10', 'Story 9', 'Story 8'])
+        self.assertEqual(self.drained('site-b'), ['Story 9'])
+    
+    def test_failed_queue_insert_loses_nothing(self):
+        self.poller.subscribe('site-a', [{'feed_url': FEED_URL}])
+        self.poll()
+        self.drained('site-a')
+        self.scraper.session.count = 12
+        
+        self.poller._conn.execute('DROP TABLE queue')
+        with self.assertRaises(Exception):
+            self.poll()
+        
+        # The items weren't recorded anywhere, so the next poll queues them
+        self.poller = self.new_poller()
+        self.poll()
+        self.assertEqual(self.drained('site-a'), ['Story 12', 'Story 11'])
+    
+    def test_items_taken_by_only_new_requests_are_not_queued(self):
+        self.poller.subscribe('site-a', [{'feed_url': FEED_URL}])
+        self.poll()
+        self.drained('site-a')
+        
+        self.scraper.session.count = 12
+        self.scraper.confirm_seen(['https://news.example.com/s12'], 'site-a')
+        self.poll()
+        self.assertEqual(self.drained('site-a'), ['Story 11'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests for bounded streaming downloads (fetch_bounded and open_bounded).
+
+Usage:
+    python -m pytest tests
+"""
+import time
+import unittest
+
+import requests
+
+from conftest import StubResponse
+
+from scraper import fetch_bounded, open_bounded, FetchError, HTML_CONTENT_TYPES
+
+URL = 'https://news.example.com/story'
+
+
+class TrickleRaw:
+    """A urllib3 response body that sends one byte every `delay` seconds."""
+    
+    def __init__(self, size, delay):
+        self.left = size
+        self.delay = delay
+    
+    def read1(self, amt=None, decode_content=None):
+        if not self.left:
+            return b''
+        time.sleep(self.delay)
+        self.left -= 1
+        return b'x'
+
+
+class OneResponseSession:
+    """Hands out one prepared response, recording whether it was requested as a stream."""
+    
+    def __init__(self, response):
+        self.response = response
+    
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.stream = stream
+        return self.response
+
+
+def session(body=b'<html></html>', content_type='text/html', headers=None, status_code=200):
+    response = StubResponse(body, URL, content_type, status_code)
+    response.headers.update(headers or {})
+    return OneResponseSession(response)
+
+
+class FetchBoundedTest(unittest.TestCase):
+    
+    def test_reads_the_body_as_a_stream(self):
+        stub = session(b'<html>' + b'x' * 100000 + b'</html>')
+        
+        response, body = fetch_bounded(stub, URL, None, 200000, 5, HTML_CONTENT_TYPES)
+        
+        self.assertTrue(stub.stream)
+        self.assertEqual(len(body), 100013)
+        self.assertIs(response, stub.response)
+    
+    def test_rejects_unwanted_content_types_before_reading(self):
+        stub = session(b'%PDF-1.7', 'application/pdf')
+        
+        with self.assertRaisesRegex(FetchError, 'Unsupported content type: application/pdf'):
+            fetch_bounded(stub, URL, None, 1000, 5, HTML_CONTENT_TYPES)
+        self.assertEqual(stub.response.raw.stream.tell(), 0)
+        
+        # Without a content type list anything goes
+        self.assertEqual(fetch_bounded(session(b'%PDF', 'application/pdf'), URL, None, 1000, 5)[1], b'%PDF')
+    
+    def test_rejects_a_declared_length_over_the_cap_before_reading(self):
+        stub = session(b'<html></html>', headers={'Content-Length': '5000'})
+        
+        with self.assertRaisesRegex(FetchError, 'Response too large: 5000 bytes'):
+            fetch_bounded(stub, URL, None, 1000, 5)
+        self.assertEqual(stub.response.raw.stream.tell(), 0)
+    
+    def test_stops_reading_once_the_cap_is_passed(self):
+        stub = session(b'x' * 1000000)
+        
+        with self.assertRaisesRegex(FetchError, 'more than 100000 bytes'):
+            fetch_bounded(stub, URL, None, 100000, 5)
+        self.assertLess(stub.response.raw.stream.tell(), 1000000)
+    
+    def test_deadline_covers_a_trickling_server(self):
+        stub = session()
+        stub.response.raw = TrickleRaw(100, 0.05)
+        
+        started = time.monotonic()
+        with self.assertRaisesRegex(FetchError, 'longer than 0.3 seconds'):
+            fetch_bounded(stub, URL, None, 1000, 0.3)
+        self.assertLess(time.monotonic() - started, 1)
+    
+    def test_not_modified_has_no_body(self):
+        response, body = fetch_bounded(session(b'', status_code=304), URL, {'If-None-Match': '"v1"'}, 1000, 5)
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertIsNone(body)
+    
+    def test_http_errors_raise(self):
+        with self.assertRaises(requests.HTTPError):
+            fetch_bounded(session(status_code=404), URL, None, 1000, 5)
+
+
+class OpenBoundedTest(unittest.TestCase):
+    
+    def test_reads_in_pieces_under_the_cap(self):
+        with open_bounded(session(b'0123456789'), URL, None, 100, 5) as (_, stream):
+            self.assertEqual(stream.read(3), b'012')
+            self.assertEqual(stream.read(4), b'3456')
+            self.assertEqual(stream.read(), b'789')
+            self.assertEqual(stream.read(5), b'')
+    
+    def test_cap_applies_while_reading(self):
+        with open_bounded(session(b'x' * 1000000), URL, None, 100000, 5) as (_, stream):
+            self.assertEqual(len(stream.read(10)), 10)
+            with self.assertRaisesRegex(FetchError, 'more than 100000 bytes'):
+                while stream.read(65536):
+                    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Tests for the conditional-GET validator store.
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import time
+import tempfile
+import unittest
+
+from http_cache import ValidatorStore
+
+
+class StubResponse:
+    headers = {'ETag': '"v1"'}
+
+
+class ValidatorStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'validators.db')
+
+    def test_put_prunes_stale_entries(self):
+        store = ValidatorStore(self.path, max_age=1, prune_interval=0)
+        store.put('old', StubResponse, {'title': 'Old'})
+        time.sleep(1.1)
+        store.put('new', StubResponse, {'title': 'New'})
+
+        self.assertIsNone(store.get('old'))
+        self.assertEqual(store.get('new')['result'], {'title': 'New'})
+
+    def test_put_prunes_at_most_once_per_interval(self):
+        store = ValidatorStore(self.path, max_age=1, prune_interval=3600)
+        store.put('old', StubResponse, {'title': 'Old'})
+        time.sleep(1.1)
+        store.put('new', StubResponse, {'title': 'New'})
+
+        self.assertIsNotNone(store.get('old'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for the compiled multi-keyword matcher.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from keyword_matcher import KeywordMatcher, get_matcher, parse_keywords
+
+
+class ParseKeywordsTest(unittest.TestCase):
+    
+    def test_splits_trims_and_deduplicates(self):
+        self.assertEqual(parse_keywords(' Modi , BJP,,modi,  Lok   Sabha '), ('Modi', 'BJP', 'Lok Sabha'))
+        self.assertEqual(parse_keywords(['Cricket', 'CRICKET', 'IPL']), ('Cricket', 'IPL'))
+        self.assertEqual(parse_keywords(''), ())
+        self.assertEqual(parse_keywords(None), ())
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    
+    def test_matches_whole_words_case_insensitively(self):
+        matcher = KeywordMatcher('india, test')
+        
+        self.assertEqual(matcher.scan('INDIA wins the Test series'), ({'india', 'test'}, set()))
+        self.assertEqual(matcher.scan('Indians protest'), (set(), set()))
+        self.assertEqual(KeywordMatcher('india', whole_word=False).scan('Indians'), ({'india'}, set()))
+    
+    def test_devanagari_words_are_not_matched_inside_longer_words(self):
+        matcher = KeywordMatcher('भारत')
+        
+        self.assertTrue(matcher.match('भारत की जीत')[0])
+        self.assertFalse(matcher.match('भारतीय टीम')[0])
+        self.assertTrue(matcher.match('जीता भारत।')[0])
+    
+    def test_longest_overlapping_keyword_wins(self):
+        matcher = KeywordMatcher('new, new delhi')
+        
+        self.assertEqual(matcher.scan('Rain in New  Delhi')[0], {'new delhi'})
+        self.assertEqual(matcher.scan('A new bridge')[0], {'new'})
+    
+    def test_excludes_veto_includes(self):
+        matcher = KeywordMatcher('election', exclude='opinion')
+        
+        self.assertEqual(matcher.match('Election results'), (True, {'election'}, set()))
+        self.assertEqual(matcher.match('Election results', 'Opinion: what they mean'),
+                         (False, {'election'}, {'opinion'}))
+        self.assertTrue(KeywordMatcher(exclude='opinion').match('Anything else')[0])
+        self.assertFalse(KeywordMatcher(exclude='opinion').match('Opinion piece')[0])
+    
+    def test_html_is_matched_as_text(self):
+        matcher = KeywordMatcher('budget')
+        
+        self.assertTrue(matcher.match('<p>The <b>Budget</b> &amp; taxes</p>')[0])
+        self.assertFalse(matcher.match('<a href="/budget">Read more</a>')[0])
+    
+    def test_regex_characters_are_literal(self):
+        matcher = KeywordMatcher('c++, a.b')
+        
+        self.assertEqual(matcher.scan('Learn C++ today')[0], {'c++'})
+        self.assertEqual(matcher.scan('axb')[0], set())
+    
+    def test_no_keywords_passes_everything(self):
+        self.assertEqual(KeywordMatcher().match('Anything'), (True, set(), set()))
+    
+    def test_matchers_are_compiled_once_per_keyword_set(self):
+        self.assertIs(get_matcher('a, b'), get_matcher([' a', 'b ']))
+        self.assertIsNot(get_matcher('a, b'), get_matcher('a, b', whole_word=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for redirect unwrapping of feed links.
+
+Usage:
+    python -m pytest tests
+"""
+import time
+import threading
+import unittest
+
+from conftest import StubResponse
+
+from link_resolver import LinkResolver
+from result_cache import MemoryCache
+from scraper import HostLimiter
+
+REDIRECTS = {
+    'https://news.google.example/articles/1': 'https://feeds.example/~r/story',
+    'https://feeds.example/~r/story': '/publisher/story?utm_source=feed',
+    'https://short.example/loop': 'https://short.example/loop2',
+    'https://short.example/loop2': 'https://short.example/loop',
+}
+
+
+class RedirectSession:
+    """Answers HEAD from the REDIRECTS table; hosts in no_head reject HEAD."""
+    
+    def __init__(self, no_head=()):
+        self.no_head = set(no_head)
+        self.requests = []
+        self.lock = threading.Lock()
+    
+    def head(self, url, allow_redirects=True, timeout=None):
+        with self.lock:
+            self.requests.append(('HEAD', url))
+        if any(host in url for host in self.no_head):
+            return StubResponse(b'', url, 'text/html', status_code=405)
+        return self.respond(url)
+    
+    def get(self, url, headers=None, allow_redirects=True, timeout=None, stream=False):
+        with self.lock:
+            self.requests.append(('GET', url))
+        return self.respond(url)
+    
+    @staticmethod
+    def respond(url):
+        if url in REDIRECTS:
+            return StubResponse(b'', url, 'text/html', status_code=301, location=REDIRECTS[url])
+        return StubResponse(b'', url, 'text/html')
+
+
+class LinkResolverTest(unittest.TestCase):
+    
+    def test_follows_the_chain_and_caches_every_hop(self):
+        session = RedirectSession()
+        resolver = LinkResolver(session, cache=MemoryCache(60, 100))
+        
+        canonical = resolver.resolve('https://news.google.example/articles/1')
+        self.assertEqual(canonical, 'https://feeds.example/publisher/story')
+        self.assertEqual(len(session.requests), 3)
+        
+        # Any hop of the chain now resolves from the cache
+        self.assertEqual(resolver.resolve('https://feeds.example/~r/story'), canonical)
+        self.assertEqual(len(session.requests), 3)
+    
+    def test_falls_back_to_a_ranged_get_when_head_is_rejected(self):
+        session = RedirectSession(no_head=['news.google.example'])
+        resolver = LinkResolver(session, cache=MemoryCache(60, 100))
+        
+        self.assertEqual(resolver.resolve('https://news.google.example/articles/1'),
+                         'https://feeds.example/publisher/story')
+        self.assertIn(('GET', 'https://news.google.example/articles/1'), session.requests)
+    
+    def test_loops_resolve_to_the_link_itself(self):
+        resolver = LinkResolver(RedirectSession(), cache=MemoryCache(60, 100))
+        self.assertEqual(resolver.resolve('https://short.example/loop'), 'https://short.example/loop')
+    
+    def test_resolve_many_maps_each_link(self):
+        resolver = LinkResolver(RedirectSession(), cache=MemoryCache(60, 100))
+        resolved = resolver.resolve_many([
+            'https://news.google.example/articles/1', 'https://publisher.example/a', 'https://publisher.example/a'
+        ])
+        self.assertEqual(resolved, {
+            'https://news.google.example/articles/1': 'https://feeds.example/publisher/story',
+            'https://publisher.example/a': 'https://publisher.example/a'
+        })
+    
+    def test_waiting_for_a_busy_host_respects_the_timeout(self):
+        limiter = HostLimiter(max_concurrency=4, per_host=1)
+        resolver = LinkResolver(RedirectSession(), limiter, cache=MemoryCache(60, 100))
+        
+        with limiter.slot('https://news.google.example/'):
+            started = time.monotonic()
+            resolved = resolver.resolve_many(['https://news.google.example/articles/1'], timeout=0.3)
+            elapsed = time.monotonic() - started
+        
+        self.assertLess(elapsed, 1)
+        self.assertEqual(resolved['https://news.google.example/articles/1'], 'https://news.google.example/articles/1')
+    
+    def test_pool_is_sized_from_the_limiter(self):
+        limiter = HostLimiter(max_concurrency=3, per_host=1)
+        self.assertEqual(LinkResolver(RedirectSession(), limiter, cache=MemoryCache(60, 100)).max_workers, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the single-pass image, caption and embed collector.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from lxml import html as lxml_html
+
+from page_visitor import PageVisitor, parse_srcset, register_embed_detector, EMBED_DETECTORS
+
+URL = 'https://news.example.com/2024/story'
+
+
+def visit(markup, **options):
+    tree = lxml_html.fromstring(markup)
+    return PageVisitor(URL, **options).visit(tree)
+
+
+class ParseSrcsetTest(unittest.TestCase):
+    
+    def test_largest_candidate_first(self):
+        self.assertEqual(parse_srcset('small.jpg 320w, large.jpg 1280w, medium.jpg 640w'),
+                         ['large.jpg', 'medium.jpg', 'small.jpg'])
+        self.assertEqual(parse_srcset('a.jpg 1x, b.jpg 2x'), ['b.jpg', 'a.jpg'])
+        self.assertEqual(parse_srcset(''), [])
+
+
+class ImageTest(unittest.TestCase):
+    
+    def test_figure_captions_and_absolute_urls(self):
+        images, _ = visit(
+            '<div><figure><img src="/img/a.jpg" alt="A"><figcaption> The caption </figcaption></figure>'
+            '<img src="https://cdn.example.com/b.jpg"></div>'
+        )
+        
+        self.assertEqual(images[0], {
+            'url': 'https://news.example.com/img/a.jpg', 'alt': 'A', 'caption': 'The caption',
+            'sources': ['https://news.example.com/img/a.jpg']
+        })
+        self.assertEqual((images[1]['url'], images[1]['caption']), ('https://cdn.example.com/b.jpg', ''))
+    
+    def test_lazy_loaded_images_use_the_real_source(self):
+        images, _ = visit(
+            '<div><img src="data:image/gif;base64,R0lGOD" data-src="/img/real.jpg">'
+            '<img src="/img/placeholder.png" data-srcset="/img/s.jpg 300w, /img/l.jpg 900w">'
+            '<img src="data:image/png;base64,iVBOR"></div>'
+        )
+        
+        self.assertEqual([image['url'] for image in images], [
+            'https://news.example.com/img/real.jpg',
+            'https://news.example.com/img/l.jpg',
+            'data:image/png;base64,iVBOR'
+        ])
+    
+    def test_picture_sources_are_candidates(self):
+        images, _ = visit(
+            '<picture><source srcset="/img/wide.webp 1200w"><img src="/img/narrow.jpg"></picture>'
+        )
+        
+        self.assertEqual(images[0]['sources'],
+                         ['https://news.example.com/img/narrow.jpg', 'https://news.example.com/img/wide.webp'])
+    
+    def test_image_containers_limit_collection(self):
+        tree = lxml_html.fromstring(
+            '<div><header><img src="/logo.png"></header><article><img src="/story.jpg"></article></div>'
+        )
+        
+        images, _ = PageVisitor(URL, image_containers=tree.xpath('//article')).visit(tree)
+        
+        self.assertEqual([image['url'] for image in images], ['https://news.example.com/story.jpg'])
+
+
+class EmbedTest(unittest.TestCase):
+    
+    def test_detects_each_embed_once(self):
+        _, embeds = visit(
+            '<div><blockquote class="twitter-tweet"><p>Tweet <a href="https://twitter.com/x">link</a></p></blockquote>'
+            '<iframe src="https://www.youtube.com/embed/abc"></iframe>'
+            '<blockquote class="instagram-media"><div class="fb-post"></div></blockquote>'
+            '<blockquote class="tiktok-embed"></blockquote>'
+            '<iframe src="https://example.com/video"></iframe></div>'
+        )
+        
+        self.assertEqual([embed['type'] for embed in embeds], ['twitter', 'youtube', 'instagram', 'tiktok'])
+        self.assertTrue(embeds[0]['html'].startswith('<blockquote class="twitter-tweet">'))
+    
+    def test_collection_can_be_switched_off(self):
+        markup = '<div><img src="/a.jpg"><blockquote class="twitter-tweet"></blockquote></div>'
+        
+        self.assertEqual(visit(markup, collect_images=False, collect_embeds=False), ([], []))
+    
+    def test_registered_detectors_are_used(self):
+        @register_embed_detector('podcast', tags=('audio',))
+        def detect_podcast(element):
+            return 'podcasts.example.com' in (element.get('src') or '')
+        try:
+            _, embeds = visit('<div><audio src="https://podcasts.example.com/1.mp3"></audio></div>')
+        finally:
+            EMBED_DETECTORS.pop()
+        
+        self.assertEqual([embed['type'] for embed in embeds], ['podcast'])
+
+
+if __name__ == '__main__':
+    unittest.main()
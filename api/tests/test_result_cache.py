@@ -0,0 +1,161 @@
+"""
+Tests for the result caches and WebScraper's extraction-result cache.
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import time
+import tempfile
+import unittest
+
+from conftest import StubResponse
+
+from extraction_profiles import ProfileRegistry
+from http_cache import ValidatorStore
+from result_cache import MemoryCache, DiskCache, create_cache, cache_mode, make_key
+from scraper import WebScraper
+
+PAGE = (
+    '<html><body><h1>Headline</h1><span class="byline">Reporter</span><div class="entry-content">'
+    + ''.join(f'<p>Paragraph {index}, long enough to be taken as the main content of the page.</p>' for index in range(6))
+    + '</div></body></html>'
+).encode()
+
+
+class MemoryCacheTest(unittest.TestCase):
+    
+    def create(self, ttl=60, max_entries=3):
+        return MemoryCache(ttl, max_entries)
+    
+    def test_values_round_trip_as_copies(self):
+        cache = self.create()
+        value = {'title': 'A', 'images': ['x.jpg']}
+        cache.set('a', value)
+        value['images'].append('y.jpg')
+        
+        cached = cache.get('a')
+        self.assertEqual(cached, {'title': 'A', 'images': ['x.jpg']})
+        cached['title'] = 'changed'
+        self.assertEqual(cache.get('a')['title'], 'A')
+    
+    def test_entries_expire(self):
+        cache = self.create(ttl=0.05)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=60)
+        time.sleep(0.1)
+        
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+    
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.create(max_entries=3)
+        for key in 'abc':
+            cache.set(key, key)
+            time.sleep(0.01)
+        cache.get('a')
+        time.sleep(0.01)
+        cache.set('d', 'd')
+        
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual([cache.get(key) for key in 'acd'], ['a', 'c', 'd'])
+        self.assertEqual(len(cache), 3)
+    
+    def test_stats(self):
+        cache = self.create(max_entries=1)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('missing')
+        cache.set('b', 2)
+        
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['entries']), (1, 1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertEqual(stats['backend'], cache.backend)
+
+
+class DiskCacheTest(MemoryCacheTest):
+    
+    def create(self, ttl=60, max_entries=3):
+        return DiskCache(os.path.join(tempfile.mkdtemp(), 'cache.db'), ttl, max_entries)
+    
+    def test_entries_are_shared_through_the_file(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+        DiskCache(path).set('a', {'title': 'A'})
+        
+        self.assertEqual(DiskCache(path).get('a'), {'title': 'A'})
+
+
+class CacheHelpersTest(unittest.TestCase):
+    
+    def test_cache_mode(self):
+        self.assertEqual(cache_mode(None), 'use')
+        self.assertEqual(cache_mode(True), 'use')
+        self.assertEqual(cache_mode(False), 'bypass')
+        self.assertEqual(cache_mode(' Refresh '), 'refresh')
+        with self.assertRaises(ValueError):
+            cache_mode('sometimes')
+    
+    def test_make_key_ignores_dict_order(self):
+        self.assertEqual(make_key('u', {'title': 'h1', 'content': 'div'}), make_key('u', {'content': 'div', 'title': 'h1'}))
+        self.assertNotEqual(make_key('u', True), make_key('u', False))
+    
+    def test_create_cache(self):
+        self.assertIsNone(create_cache('off', 'test', 60, 10))
+        self.assertIsInstance(create_cache('memory', 'test', 60, 10), MemoryCache)
+        with self.assertRaises(ValueError):
+            create_cache('redis', 'test', 60, 10)
+
+
+class PageSession:
+    """Serves PAGE, failing the first `failures` requests."""
+    
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.requests = 0
+    
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.requests += 1
+        if self.requests <= self.failures:
+            return StubResponse(b'', url, 'text/html', status_code=503)
+        return StubResponse(PAGE, url, 'text/html; charset=utf-8')
+
+
+class ScraperResultCacheTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scraper = WebScraper(
+            validator_store=ValidatorStore(os.path.join(tempfile.mkdtemp(), 'validators.db')),
+            profiles=ProfileRegistry(), result_cache=MemoryCache(60, 100)
+        )
+        self.session = self.scraper.session = PageSession()
+    
+    def test_key_covers_selectors_and_flags(self):
+        url = 'https://news.example.com/story'
+        self.scraper.scrape(url)
+        self.scraper.scrape(url, fetch_images=False)
+        self.scraper.scrape(url, {'title': 'h1', 'content': '.entry-content', 'author': '.byline'})
+        self.assertEqual(self.session.requests, 3)
+        
+        self.scraper.scrape('https://NEWS.example.com/story#comments', fetch_images=False)
+        self.scraper.scrape(url, {'author': '.byline', 'content': '.entry-content', 'title': 'h1'})
+        self.assertEqual(self.session.requests, 3)
+    
+    def test_failures_are_not_cached(self):
+        self.session.failures = 1
+        url = 'https://news.example.com/story'
+        
+        self.assertIn('503 Error', self.scraper.scrape(url)['error'])
+        self.assertEqual(self.scraper.scrape(url)['title'], 'Headline')
+        self.assertEqual(self.session.requests, 2)
+    
+    def test_bypass_neither_reads_nor_writes(self):
+        url = 'https://news.example.com/story'
+        self.scraper.scrape(url, cache='bypass')
+        self.scraper.scrape(url)
+        self.assertEqual(self.session.requests, 2)
+        self.assertEqual(self.scraper.result_cache.stats()['hits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
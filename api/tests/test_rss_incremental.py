@@ -0,0 +1,61 @@
+"""
+Regression tests for incremental feed polling (RssScraper.scrape_feed with incremental=True).
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+from conftest import FEED_URL, StubSession
+
+from http_cache import ValidatorStore
+from seen_index import SeenIndex
+from scraper import RssScraper
+
+
+class IncrementalFeedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.scraper = RssScraper(
+            validator_store=ValidatorStore(os.path.join(self.tmp, 'validators.db')),
+            seen_index=SeenIndex(os.path.join(self.tmp, 'seen.db'))
+        )
+        self.scraper.session = StubSession(10)
+
+    def poll(self, **options):
+        result = self.scraper.scrape_feed(FEED_URL, limit=3, incremental=True, only_new=True, **options)
+        self.assertNotIn('error', result)
+        return [item['title'] for item in result['items']], result
+
+    def test_truncated_delta_is_not_dropped(self):
+        titles, _ = self.poll()
+        self.assertEqual(titles, ['Story 10', 'Story 9', 'Story 8'])
+
+        # Six new stories: more than one poll's limit
+        self.scraper.session.count = 16
+        titles, result = self.poll()
+        self.assertEqual(titles, ['Story 16', 'Story 15', 'Story 14'])
+        self.assertFalse(result['reached_mark'])
+
+        titles, result = self.poll()
+        self.assertEqual(titles, ['Story 13', 'Story 12', 'Story 11'])
+
+        titles, result = self.poll()
+        self.assertEqual(titles, [])
+        self.assertTrue(result['reached_mark'])
+        self.assertEqual(result['mark']['guid'], 'S16')
+
+    def test_complete_delta_moves_the_mark(self):
+        self.poll()
+        self.scraper.session.count = 12
+        titles, result = self.poll()
+        self.assertEqual(titles, ['Story 12', 'Story 11'])
+        self.assertTrue(result['reached_mark'])
+        self.assertEqual(result['mark']['guid'], 'S12')
+
+
+if __name__ == '__main__':
+    unittest.main()
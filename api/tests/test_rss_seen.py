@@ -0,0 +1,49 @@
+"""
+Tests for only_new feed polling with deferred recording (record_seen=False).
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+from conftest import FEED_URL, StubSession
+
+from http_cache import ValidatorStore
+from seen_index import SeenIndex
+from scraper import RssScraper
+
+
+class DeferredSeenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.scraper = RssScraper(
+            validator_store=ValidatorStore(os.path.join(self.tmp, 'validators.db')),
+            seen_index=SeenIndex(os.path.join(self.tmp, 'seen.db'))
+        )
+        self.scraper.session = StubSession(5)
+
+    def poll(self):
+        result = self.scraper.scrape_feed(FEED_URL, limit=3, only_new=True, record_seen=False, seen_scope='site')
+        self.assertNotIn('error', result)
+        return [item['link'] for item in result['items']]
+
+    def test_unconfirmed_items_come_back(self):
+        links = self.poll()
+        self.assertEqual(len(links), 3)
+        self.assertEqual(self.poll(), links)
+
+        # Only the first item was processed
+        self.assertEqual(self.scraper.confirm_seen(links[:1], 'site'), 1)
+        self.assertEqual(self.poll(), links[1:] + ['https://news.example.com/s2'])
+
+    def test_confirm_is_scoped(self):
+        links = self.poll()
+        self.scraper.confirm_seen(links, 'other-site')
+        self.assertEqual(self.poll(), links)
+
+
+if __name__ == '__main__':
+    unittest.main()
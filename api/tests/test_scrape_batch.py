@@ -0,0 +1,142 @@
+"""
+Tests for concurrent batch scraping (WebScraper.scrape_batch and /scrape/batch).
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import time
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from urllib.parse import urlparse
+
+from conftest import StubResponse
+
+import app as api
+from http_cache import ValidatorStore
+from extraction_profiles import ProfileRegistry
+from result_cache import MemoryCache
+from scraper import WebScraper
+
+PARAGRAPHS = ''.join(
+    f'<p>Paragraph {index} of the story, long enough for the extractor to take it as the main content.</p>'
+    for index in range(6)
+)
+
+
+def page(title):
+    return (
+        f'<html><head><title>{title}</title></head><body><h1>{title}</h1>'
+        f'<div class="entry-content">{PARAGRAPHS}</div></body></html>'
+    ).encode()
+
+
+class PageSession:
+    """Serves an article per URL, slowly, recording the peak number of requests per host in flight."""
+    
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = Counter()
+        self.peak = Counter()
+        self.requests = 0
+    
+    def get(self, url, headers=None, timeout=None, stream=False):
+        host = urlparse(url).netloc
+        with self.lock:
+            self.requests += 1
+            self.active[host] += 1
+            self.peak[host] = max(self.peak[host], self.active[host])
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[host] -= 1
+        if url.endswith('.pdf'):
+            return StubResponse(b'%PDF', url, 'application/pdf')
+        return StubResponse(page(f'Story at {urlparse(url).path}'), url, 'text/html; charset=utf-8')
+
+
+class ScrapeBatchTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scraper = WebScraper(
+            max_concurrency=6, per_host=2,
+            validator_store=ValidatorStore(os.path.join(tempfile.mkdtemp(), 'validators.db')),
+            profiles=ProfileRegistry(), result_cache=MemoryCache(60, 100)
+        )
+        self.session = self.scraper.session = PageSession()
+    
+    def test_results_keep_input_order(self):
+        urls = [f'https://site{index % 3}.example.com/story-{index}' for index in range(9)]
+        
+        results = self.scraper.scrape_batch([{'url': url, 'fetch_images': False} for url in urls])
+        
+        self.assertEqual([result['title'] for result in results],
+                         [f'Story at {urlparse(url).path}' for url in urls])
+    
+    def test_per_host_limit_holds_across_the_batch(self):
+        items = [{'url': f'https://one.example.com/story-{index}'} for index in range(6)]
+        items += [{'url': f'https://two.example.com/story-{index}'} for index in range(6)]
+        
+        started = time.monotonic()
+        self.scraper.scrape_batch(items)
+        elapsed = time.monotonic() - started
+        
+        self.assertEqual(self.session.peak['one.example.com'], 2)
+        self.assertEqual(self.session.peak['two.example.com'], 2)
+        # Two hosts with two slots each: three rounds, not twelve
+        self.assertLess(elapsed, 12 * self.session.delay)
+    
+    def test_bad_items_fail_alone(self):
+        results = self.scraper.scrape_batch([
+            {'url': 'https://one.example.com/story'},
+            {'selectors': {}},
+            'https://one.example.com/plain-string',
+            {'url': 'https://one.example.com/file.pdf'}
+        ])
+        
+        self.assertNotIn('error', results[0])
+        self.assertEqual(results[1]['error'], 'URL is required')
+        self.assertEqual(results[2]['error'], 'URL is required')
+        self.assertIn('Unsupported content type', results[3]['error'])
+    
+    def test_repeated_items_come_from_the_result_cache(self):
+        self.scraper.scrape_batch([{'url': 'https://one.example.com/story'}])
+        self.scraper.scrape_batch([{'url': 'https://one.example.com/story'}, {'url': 'HTTPS://One.Example.com:443/story#top'}])
+        self.assertEqual(self.session.requests, 1)
+        
+        self.scraper.scrape_batch([{'url': 'https://one.example.com/story', 'cache': 'refresh'}])
+        self.assertEqual(self.session.requests, 2)
+
+
+class ScrapeBatchRouteTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = api.app.test_client()
+    
+    def test_rejects_empty_and_oversized_batches(self):
+        self.assertEqual(self.client.post('/scrape/batch', json={'items': []}).status_code, 400)
+        
+        items = [f'https://one.example.com/{index}' for index in range(api.MAX_BATCH_ITEMS + 1)]
+        response = self.client.post('/scrape/batch', json={'items': items})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Too many items', response.get_json()['error'])
+    
+    def test_returns_one_result_per_item(self):
+        session = api.web_scraper.session
+        api.web_scraper.session = PageSession(delay=0)
+        try:
+            response = self.client.post('/scrape/batch', json={
+                'items': ['https://one.example.com/route-a', {'url': 'https://two.example.com/route-b', 'cache': 'bypass'}]
+            })
+        finally:
+            api.web_scraper.session = session
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()['results']
+        self.assertEqual([result['title'] for result in results], ['Story at /route-a', 'Story at /route-b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
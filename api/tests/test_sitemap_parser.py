@@ -0,0 +1,178 @@
+"""
+Tests for the streaming sitemap parser and SitemapScraper.
+
+Usage:
+    python -m pytest tests
+"""
+import io
+import gzip
+import os
+import tempfile
+import unittest
+
+from lxml import etree
+
+from conftest import StubResponse
+
+from seen_index import SeenIndex
+from scraper import SitemapScraper
+from sitemap_parser import iter_sitemap
+
+SITE = 'https://news.example.com'
+
+
+def urlset(entries):
+    """Build a news sitemap from (loc, lastmod, title) tuples."""
+    urls = ''.join(
+        f'<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod>'
+        f'<news:news><news:publication><news:name>Example News</news:name></news:publication>'
+        f'<news:publication_date>{lastmod}</news:publication_date><news:title>{title}</news:title></news:news>'
+        f'<image:image><image:loc>{loc}.jpg</image:loc></image:image></url>'
+        for loc, lastmod, title in entries
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+        'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9" '
+        'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">'
+        f'{urls}</urlset>'
+    ).encode()
+
+
+def sitemap_index(children):
+    """Build a sitemap index from (loc, lastmod) pairs."""
+    sitemaps = ''.join(f'<sitemap><loc>{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>' for loc, lastmod in children)
+    return (
+        f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{sitemaps}'
+        '</sitemapindex>'
+    ).encode()
+
+
+class TrickleReader:
+    """A file-like object returning at most a few bytes per read, like a slow network stream."""
+    
+    def __init__(self, body, step=3):
+        self.stream = io.BytesIO(body)
+        self.step = step
+    
+    def read(self, size=-1):
+        return self.stream.read(self.step if size < 0 else min(size, self.step))
+
+
+class SitemapSession:
+    """Serves sitemap bodies by URL and records which URLs were requested."""
+    
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.requested = []
+    
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.requested.append(url)
+        return StubResponse(self.bodies[url], url, 'application/xml')
+
+
+class IterSitemapTest(unittest.TestCase):
+    
+    def test_reads_news_and_image_fields(self):
+        entries = list(iter_sitemap(urlset([(f'{SITE}/a', '2024-01-02T10:00:00+00:00', 'Budget passed')])))
+        
+        self.assertEqual(len(entries), 1)
+        entry = entries[0]
+        self.assertEqual(entry['kind'], 'url')
+        self.assertEqual(entry['loc'], f'{SITE}/a')
+        self.assertEqual(entry['lastmod'], '2024-01-02T10:00:00+00:00')
+        self.assertEqual(entry['title'], 'Budget passed')
+        self.assertEqual(entry['publication'], 'Example News')
+        self.assertEqual(entry['published'], '2024-01-02T10:00:00+00:00')
+        self.assertEqual(entry['images'], [f'{SITE}/a.jpg'])
+    
+    def test_reads_index_and_namespace_less_sitemaps(self):
+        index = list(iter_sitemap(sitemap_index([(f'{SITE}/s1.xml', '2024-01-02')])))
+        self.assertEqual([(entry['kind'], entry['loc']) for entry in index], [('sitemap', f'{SITE}/s1.xml')])
+        
+        plain = b'<urlset><url><loc>https://news.example.com/b</loc></url><url><loc></loc></url></urlset>'
+        self.assertEqual([entry['loc'] for entry in iter_sitemap(plain)], [f'{SITE}/b'])
+    
+    def test_rejects_other_documents(self):
+        with self.assertRaises(ValueError):
+            list(iter_sitemap(b'<rss version="2.0"><channel></channel></rss>'))
+        with self.assertRaises(etree.XMLSyntaxError):
+            list(iter_sitemap(b'<urlset><url><loc>'))
+    
+    def test_parses_gzip_from_a_stream(self):
+        body = urlset([(f'{SITE}/{i}', '2024-01-02', f'Story {i}') for i in range(5000)])
+        source = TrickleReader(gzip.compress(body), step=1000)
+        
+        entries = iter_sitemap(source)
+        self.assertEqual(next(entries)['loc'], f'{SITE}/0')
+        # Parsing started before the document was read to the end
+        self.assertLess(source.stream.tell(), len(source.stream.getvalue()))
+        self.assertEqual(len(list(entries)), 4999)
+    
+    def test_caps_the_decompressed_size(self):
+        body = urlset([(f'{SITE}/{i}', '2024-01-02', 'x' * 200) for i in range(500)])
+        compressed = gzip.compress(body)
+        self.assertLess(len(compressed), 20000)
+        
+        with self.assertRaises(ValueError):
+            list(iter_sitemap(io.BytesIO(compressed), max_bytes=20000))
+        self.assertEqual(len(list(iter_sitemap(io.BytesIO(compressed), max_bytes=len(body)))), 500)
+
+
+class SitemapScraperTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.scraper = SitemapScraper(seen_index=SeenIndex(os.path.join(tempfile.mkdtemp(), 'seen.db')))
+    
+    def scrape(self, bodies, **options):
+        self.scraper.session = SitemapSession(bodies)
+        return self.scraper.scrape_sitemap(f'{SITE}/sitemap.xml', **options)
+    
+    def test_walks_the_index_and_skips_old_sitemaps(self):
+        bodies = {
+            f'{SITE}/sitemap.xml': sitemap_index([(f'{SITE}/new.xml.gz', '2024-01-03'), (f'{SITE}/old.xml', '2023-01-01')]),
+            f'{SITE}/new.xml.gz': gzip.compress(urlset([
+                (f'{SITE}/{i}', f'2024-01-03T0{i}:00:00+00:00', f'Story {i}') for i in range(5)
+            ]))
+        }
+        
+        result = self.scrape(bodies, limit=3, since='2023-06-01')
+        
+        self.assertNotIn('error', result)
+        self.assertEqual([item['link'] for item in result['items']], [f'{SITE}/4', f'{SITE}/3', f'{SITE}/2'])
+        self.assertEqual(result['skipped_sitemaps'], 1)
+        self.assertNotIn(f'{SITE}/old.xml', self.scraper.session.requested)
+        self.assertEqual(result['scanned'], 5)
+    
+    def test_keyword_filter_and_only_new(self):
+        bodies = {f'{SITE}/sitemap.xml': urlset([
+            (f'{SITE}/politics/budget-vote', '2024-01-03T01:00:00+00:00', 'Budget vote'),
+            (f'{SITE}/sport/final', '2024-01-03T02:00:00+00:00', 'Cup final')
+        ])}
+        
+        result = self.scrape(bodies, keywords='budget', only_new=True, seen_scope='site')
+        self.assertEqual([item['link'] for item in result['items']], [f'{SITE}/politics/budget-vote'])
+        
+        result = self.scrape(bodies, keywords='budget', only_new=True, seen_scope='site')
+        self.assertEqual(result['items'], [])
+    
+    def test_oversized_sitemap_is_an_error(self):
+        self.scraper.max_bytes = 2000
+        body = gzip.compress(urlset([(f'{SITE}/{i}', '2024-01-03', 'x' * 100) for i in range(100)]))
+        self.assertLess(len(body), 2000)
+        
+        result = self.scrape({f'{SITE}/sitemap.xml': body})
+        
+        self.assertIn('error', result)
+        self.assertIn('too large', result['error'])
+    
+    def test_compressed_stream_is_capped_while_downloading(self):
+        self.scraper.max_bytes = 100
+        result = self.scrape({f'{SITE}/sitemap.xml': urlset([(f'{SITE}/a', '2024-01-03', 'A')])})
+        
+        self.assertIn('error', result)
+        self.assertIn('more than 100 bytes', result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
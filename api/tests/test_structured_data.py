@@ -0,0 +1,84 @@
+"""
+Tests for the JSON-LD / OpenGraph fast path of page extraction.
+
+Usage:
+    python -m pytest tests
+"""
+import json
+import unittest
+
+from lxml import html as lxml_html
+
+from extraction_profiles import ProfileRegistry
+from structured_data import extract_structured_data, text_to_html
+from scraper import extract_page
+
+URL = 'https://news.example.com/2024/story'
+
+BODY = 'First paragraph & a <tag> that is text.\n\n' + 'Second paragraph. ' * 40
+
+
+def page(article, meta=''):
+    return (
+        '<html><head><title>Page</title>'
+        f'<script type="application/ld+json">{json.dumps(article)}</script>{meta}</head>'
+        '<body><h1>Selector Title</h1><div class="byline">Selector Author</div>'
+        f'<div class="entry-content"><p>{"Selector content. " * 20}</p></div></body></html>'
+    ).encode()
+
+
+class StructuredDataTest(unittest.TestCase):
+    
+    def test_reads_news_article_json_ld(self):
+        tree = lxml_html.fromstring(page({
+            '@context': 'https://schema.org',
+            '@graph': [{'@type': 'WebPage'}, {
+                '@type': 'NewsArticle', 'headline': 'Headline', 'datePublished': '2024-05-01T10:00:00+05:30',
+                'author': [{'@type': 'Person', 'name': 'A. Writer'}], 'image': {'url': 'https://cdn.example/lead.jpg'}
+            }]
+        }))
+        data = extract_structured_data(tree)
+        self.assertEqual(data['title'], 'Headline')
+        self.assertEqual(data['author'], 'A. Writer')
+        self.assertEqual(data['date'], '2024-05-01T10:00:00+05:30')
+        self.assertEqual(data['image'], 'https://cdn.example/lead.jpg')
+    
+    def test_meta_tags_fill_missing_fields(self):
+        tree = lxml_html.fromstring(page(
+            {'@type': 'Article', 'headline': 'Headline'},
+            '<meta property="article:published_time" content="2024-05-01">'
+            '<meta property="article:author" content="https://news.example.com/authors/x">'
+        ))
+        data = extract_structured_data(tree)
+        self.assertEqual(data['date'], '2024-05-01')
+        self.assertNotIn('author', data)
+    
+    def test_text_to_html_escapes_and_wraps_paragraphs(self):
+        self.assertEqual(text_to_html('A & <b>\n\nB\nC'), '<p>A &amp; &lt;b&gt;</p><p>B\nC</p>')
+        self.assertEqual(text_to_html('One\nTwo'), '<p>One</p><p>Two</p>')
+
+
+class StructuredFastPathTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.profile = ProfileRegistry().default
+    
+    def test_article_body_is_returned_as_html(self):
+        article = {'@type': 'NewsArticle', 'headline': 'Headline', 'articleBody': BODY}
+        result = extract_page(page(article), 'utf-8', URL, self.profile, fetch_images=False, fetch_social_embeds=False)
+        
+        self.assertEqual(result['title'], 'Headline')
+        self.assertTrue(result['content'].startswith('<p>First paragraph &amp; a &lt;tag&gt; that is text.</p><p>'))
+        self.assertEqual(lxml_html.fromstring(result['content']).text_content().count('Second paragraph.'), 40)
+        # Fields the structured data lacks still come from the selectors
+        self.assertEqual(result['author'], 'Selector Author')
+    
+    def test_short_article_body_falls_back_to_selectors(self):
+        article = {'@type': 'NewsArticle', 'headline': 'Headline', 'articleBody': 'Teaser only.'}
+        result = extract_page(page(article), 'utf-8', URL, self.profile, fetch_images=False, fetch_social_embeds=False)
+        self.assertNotIn('Teaser only.', result['content'])
+        self.assertIn('<p>Selector content.', result['content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Query parameters that only track the visit and never change the page
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid', 'twclid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref_src', 'cmpid', 'ocid', 'spm', 'ito', 'at_medium', 'at_campaign'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_', 'hsa_', '__twitter')
+
+
+def normalize_url(url):
+    """
+    Normalize a URL so that trivially different spellings compare equal.
+
+    Lowercases the scheme and host, drops default ports and the fragment,
+    and sorts query parameters.
+
+    Args:
+        url (str): The URL
+
+    Returns:
+        str: The normalized URL
+    """
+    parts = urlsplit((url or '').strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def canonicalize_url(url):
+    """
+    Canonicalize an article URL for deduplication.
+
+    Normalizes the URL and strips tracking parameters (utm_*, fbclid, gclid, ...),
+    so the same story shared through different campaigns gets one key.
+
+    Args:
+        url (str): The URL
+
+    Returns:
+        str: The canonical URL
+    """
+    parts = urlsplit(normalize_url(url))
+    query = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
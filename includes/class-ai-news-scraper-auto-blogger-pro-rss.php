@@ -47,16 +47,35 @@ class AI_News_Scraper_Auto_Blogger_Pro_RSS {
         $scheduler = new AI_News_Scraper_Auto_Blogger_Pro_Scheduler();
         $scraper = new AI_News_Scraper_Auto_Blogger_Pro_Scraper();
         
+        // Move the URLs processed by older versions into the API's seen-item index. Until that
+        // succeeds they are still checked here
+        $legacy_urls = $this->migrate_processed_urls($scraper);
+        
+        // Fetch every feed concurrently in one request; feeds missing from the batch are fetched one by one
+        // The API only returns items this site hasn't processed yet; scheduled items are confirmed below
+        $batch_results = $scraper->scrape_from_rss_batch($feeds, true);
+        if (is_wp_error($batch_results)) {
+            $batch_results = array();
+        }
+        
         // Process each feed
-        foreach ($feeds as $feed) {
+        foreach ($feeds as $feed_id => $feed) {
+            $processed_links = array();
             try {
                 $feed_url = $feed['url'];
                 $feed_name = isset($feed['name']) ? $feed['name'] : '';
                 $keywords = isset($feed['keywords']) ? $feed['keywords'] : '';
                 $fetch_limit = isset($feed['fetch_limit']) ? intval($feed['fetch_limit']) : 10;
                 
-                // Scrape the RSS feed
-                $rss_items = $scraper->scrape_from_rss($feed_url, $fetch_limit, $keywords);
+                // Use the batch result, or scrape the RSS feed on its own
+                if (isset($batch_results[(string) $feed_id])) {
+                    $rss_items = $batch_results[(string) $feed_id];
+                    if (isset($rss_items['error'])) {
+                        $rss_items = new WP_Error('api_error', $rss_items['error']);
+                    }
+                } else {
+                    $rss_items = $scraper->scrape_from_rss($feed_url, $fetch_limit, $keywords, true);
+                }
                 
                 if (is_wp_error($rss_items)) {
                     $this->log_action('rss', $feed_url, null, 'error', 'Failed to process RSS feed: ' . $rss_items->get_error_message());
@@ -68,9 +87,6 @@ class AI_News_Scraper_Auto_Blogger_Pro_RSS {
                     continue;
                 }
                 
-                // Get already processed URLs to avoid duplicates
-                $processed_urls = $this->get_processed_urls();
-                
                 // Prepare post data
                 $post_data = array(
                     'ai_model' => isset($options['ai_settings']['ai_model']) ? $options['ai_settings']['ai_model'] : 'openai',
@@ -85,8 +101,9 @@ class AI_News_Scraper_Auto_Blogger_Pro_RSS {
                 // Schedule processing for each item
                 $scheduled_count = 0;
                 foreach ($rss_items['items'] as $item) {
-                    // Skip already processed URLs
-                    if (in_array($item['link'], $processed_urls)) {
+                    // Skip URLs processed before the seen-item index took over
+                    if (isset($legacy_urls[$item['link']])) {
+                        $processed_links[] = $item['link'];
                         continue;
                     }
                     
@@ -119,15 +136,21 @@ class AI_News_Scraper_Auto_Blogger_Pro_RSS {
                     
                     if (!is_wp_error($result)) {
                         $scheduled_count++;
-                        
-                        // Store the URL as processed
-                        $this->mark_url_as_processed($item['link']);
+                        $processed_links[] = $item['link'];
                     }
                 }
                 
                 $this->log_action('rss', $feed_url, null, 'success', "Processed RSS feed. Scheduled $scheduled_count new items.");
             } catch (Exception $e) {
                 $this->log_action('rss', $feed_url, null, 'error', 'Exception while processing RSS feed: ' . $e->getMessage());
+            } finally {
+                // Confirm only what was scheduled; the rest is returned again on the next run
+                if (!empty($processed_links)) {
+                    $marked = $scraper->mark_rss_items_seen($processed_links);
+                    if (is_wp_error($marked)) {
+                        $this->log_action('rss', $feed['url'], null, 'error', 'Failed to record processed RSS items: ' . $marked->get_error_message());
+                    }
+                }
             }
         }
     }
@@ -305,15 +328,22 @@ class AI_News_Scraper_Auto_Blogger_Pro_RSS {
     }
 
     /**
-     * Get a list of already processed URLs.
+     * Move the URLs processed by older versions into the API's seen-item index.
+     *
+     * Older versions kept processed URLs in the ai_news_scraper_processed_urls
+     * option. They are sent to the API once and the option is deleted.
      *
      * @since    1.0.0
-     * @return   array    The list of processed URLs.
+     * @param    AI_News_Scraper_Auto_Blogger_Pro_Scraper    $scraper    The scraper.
+     * @return   array    The URLs still to be skipped locally (as keys), empty once migrated.
      */
-    private function get_processed_urls() {
-        $processed_urls = get_option('ai_news_scraper_processed_urls', array());
+    private function migrate_processed_urls($scraper) {
+        $processed_urls = get_option('ai_news_scraper_processed_urls', false);
+        if (!is_array($processed_urls)) {
+            return array();
+        }
         
-        // Clean up old URLs (older than 30 days)
+        // Only URLs from the last 30 days were ever checked
         $current_time = current_time('timestamp');
         foreach ($processed_urls as $url => $timestamp) {
             if ($current_time - $timestamp > 30 * DAY_IN_SECONDS) {
@@ -321,21 +351,17 @@ class AI_News_Scraper_Auto_Blogger_Pro_RSS {
             }
         }
         
-        update_option('ai_news_scraper_processed_urls', $processed_urls);
+        if (!empty($processed_urls)) {
+            $result = $scraper->mark_rss_items_seen(array_keys($processed_urls));
+            if (is_wp_error($result)) {
+                $this->log_action('rss', '', null, 'error', 'Failed to migrate processed RSS URLs: ' . $result->get_error_message());
+                return $processed_urls;
+            }
+        }
         
-        return array_keys($processed_urls);
-    }
-
-    /**
-     * Mark a URL as processed.
-     *
-     * @since    1.0.0
-     * @param    string    $url    The URL to mark as processed.
-     */
-    private function mark_url_as_processed($url) {
-        $processed_urls = get_option('ai_news_scraper_processed_urls', array());
-        $processed_urls[$url] = current_time('timestamp');
-        update_option('ai_news_scraper_processed_urls', $processed_urls);
+        delete_option('ai_news_scraper_processed_urls');
+        
+        return array();
     }
 
     /**
@@ -143,9 +143,11 @@ class AI_News_Scraper_Auto_Blogger_Pro_Scraper {
      * @param    string    $feed_url    The RSS feed URL.
      * @param    int       $limit       The maximum number of articles to fetch.
      * @param    string    $keywords    Optional. Keywords to filter by.
+     * @param    bool      $only_new    Optional. Return only items this site hasn't processed yet.
+     *                                   Confirm the processed ones with mark_rss_items_seen().
      * @return   array|WP_Error    The scraped articles or error.
      */
-    public function scrape_from_rss($feed_url, $limit = 10, $keywords = '') {
+    public function scrape_from_rss($feed_url, $limit = 10, $keywords = '', $only_new = false) {
         // Check if URL is valid
         if (!filter_var($feed_url, FILTER_VALIDATE_URL)) {
             return new WP_Error('invalid_url', 'The provided RSS feed URL is not valid.');
@@ -158,6 +160,14 @@ class AI_News_Scraper_Auto_Blogger_Pro_Scraper {
             'keywords' => $keywords,
         );
 
+        // Let the API track which items this site has already processed; items are
+        // only recorded once they are confirmed, so failed ones come back next time
+        if ($only_new) {
+            $api_data['only_new'] = true;
+            $api_data['record_seen'] = false;
+            $api_data['seen_scope'] = get_site_url();
+        }
+
         // Make API request
         $response = $this->make_api_request('/scrape/rss', 'POST', $api_data);
 
@@ -169,6 +179,70 @@ class AI_News_Scraper_Auto_Blogger_Pro_Scraper {
         return $response;
     }
 
+    /**
+     * Scrape several RSS feeds in a single concurrent API request.
+     *
+     * @since    1.0.0
+     * @param    array     $feeds       The feeds, keyed by an ID, each with 'url', 'fetch_limit' and 'keywords'.
+     * @param    bool      $only_new    Optional. Return only items this site hasn't processed yet.
+     *                                   Confirm the processed ones with mark_rss_items_seen().
+     * @return   array|WP_Error    The feed results keyed by the same IDs, or error.
+     */
+    public function scrape_from_rss_batch($feeds, $only_new = false) {
+        // Prepare data for API request
+        $api_feeds = array();
+        foreach ($feeds as $id => $feed) {
+            $api_feeds[] = array(
+                'id' => (string) $id,
+                'feed_url' => $feed['url'],
+                'limit' => isset($feed['fetch_limit']) ? intval($feed['fetch_limit']) : 10,
+                'keywords' => isset($feed['keywords']) ? $feed['keywords'] : '',
+                'only_new' => (bool) $only_new,
+                'record_seen' => false,
+                'seen_scope' => $only_new ? get_site_url() : '',
+            );
+        }
+
+        // Make API request. Each feed gets at most 20 seconds and the whole batch 45, so the API
+        // answers (leaving unfinished feeds for the next run) well within the 60 second request timeout
+        $response = $this->make_api_request('/scrape/rss/batch', 'POST', array(
+            'feeds' => $api_feeds,
+            'timeout' => 20,
+            'deadline' => 45,
+        ), 60);
+
+        if (is_wp_error($response)) {
+            $this->log_error('rss', '', null, $response->get_error_message());
+            return $response;
+        }
+
+        return isset($response['feeds']) ? $response['feeds'] : array();
+    }
+
+    /**
+     * Record RSS items as processed, so only_new requests stop returning them.
+     *
+     * @since    1.0.0
+     * @param    array     $links    The item links.
+     * @return   true|WP_Error    True on success, or error.
+     */
+    public function mark_rss_items_seen($links) {
+        // The API accepts a limited number of links per request
+        foreach (array_chunk(array_values(array_unique($links)), 500) as $chunk) {
+            $response = $this->make_api_request('/scrape/rss/seen', 'POST', array(
+                'links' => $chunk,
+                'seen_scope' => get_site_url(),
+            ));
+
+            if (is_wp_error($response)) {
+                $this->log_error('rss', '', null, $response->get_error_message());
+                return $response;
+            }
+        }
+
+        return true;
+    }
+
     /**
      * Test an RSS feed by fetching a few items.
      *
@@ -206,14 +280,15 @@ class AI_News_Scraper_Auto_Blogger_Pro_Scraper {
      * @param    string    $endpoint    The API endpoint.
      * @param    string    $method      The HTTP method (GET, POST, etc.).
      * @param    array     $data        The data to send with the request.
+     * @param    int       $timeout     Optional. The request timeout in seconds.
      * @return   array|WP_Error    The API response or error.
      */
-    private function make_api_request($endpoint, $method = 'GET', $data = array()) {
+    private function make_api_request($endpoint, $method = 'GET', $data = array(), $timeout = 60) {
         $url = $this->api_url . $endpoint;
         
         $args = array(
             'method'    => $method,
-            'timeout'   => 60,
+            'timeout'   => $timeout,
             'headers'   => array(
                 'Content-Type' => 'application/json',
             ),